@@ -1,14 +1,23 @@
 """Application entry-point."""
 from __future__ import annotations
 import os
+import signal
 
 from game.core.emulator import EmulatorSession
 from game.core.loop import EmulatorLoop
+from game.mqtt.broker import LOCAL_BROKER, BrokerTCPServer
 from game.mqtt.client import MQTTClient
+from game.mqtt.codecs import get_codec
 from game.mqtt.topics import BASE_TOPIC
 from game.services.autosave_service import AutosaveService
 from game.services.battle_service import BattleService
+from game.services.lookahead_service import LookaheadService
+from game.services.metrics_service import MetricsService
+from game.services.profiler_service import ProfilerService
 from game.services.scene_manger_service import SceneManagerService
+from game.services.screen_stream_service import ScreenStreamService
+from game.services.shm_channel_service import ShmChannelService
+from game.services.state_catalog_service import StateCatalogService
 from game.utils.logging_config import setup_logging
 
 SAVE_STATE_PATH = os.getenv("SAVE_STATE_PATH", "games/red_test.gb.state")
@@ -16,20 +25,101 @@ SAVE_STATE_PATH = os.getenv("SAVE_STATE_PATH", "games/red_test.gb.state")
 def main() -> None:
     logger = setup_logging()
 
-    game = EmulatorSession.from_choice("red", logger=logger, save_state_path = SAVE_STATE_PATH)
+    game = EmulatorSession.from_choice(
+        "red",
+        logger=logger,
+        save_state_path=SAVE_STATE_PATH,
+        save_state_codec=os.getenv("SAVE_STATE_CODEC", "raw"),
+        save_state_level=int(os.getenv("SAVE_STATE_LEVEL", "0")) or None,
+        rom_table_cache_dir=os.getenv("ROM_TABLE_CACHE_DIR") or None,
+    )
+
+    # MQTT_TRANSPORT=local keeps everything in-process; MQTT_LOCAL_BROKER_PORT lets
+    # external processes reach that broker over loopback TCP.
+    local_broker_server = None
+    local_broker_port = int(os.getenv("MQTT_LOCAL_BROKER_PORT", "0"))
+    if os.getenv("MQTT_TRANSPORT", "paho") == "local" and local_broker_port:
+        local_broker_server = BrokerTCPServer(LOCAL_BROKER, "127.0.0.1", local_broker_port)
+        local_broker_server.start()
+        logger.info("Local MQTT broker listening on 127.0.0.1:{}", local_broker_server.port)
 
     mqtt_client = MQTTClient(
-        host="test.mosquitto.org",
-        port=1883,
+        host=os.getenv("MQTT_BROKER", "test.mosquitto.org"),
+        port=int(os.getenv("MQTT_PORT", "1883")),
         base_topic=BASE_TOPIC,
         logger=logger,
+        max_pending=int(os.getenv("MQTT_MAX_PENDING", "1000")),
+        max_publish_rate=float(os.getenv("MQTT_MAX_PUBLISH_RATE", "0")) or None,
     )
+    codec = get_codec(os.getenv("MQTT_CODEC", "json"))
     services = []
     if os.getenv("AUTOLOAD_STATE", "true").lower() == "true":
         services.append(AutosaveService(game, logger,int(os.getenv("AUTOSAVE_INTERVAL_SECONDS","120"))))
-    services.append(SceneManagerService(game, mqtt_client, logger))
-    services.append(BattleService(mqtt_client, logger, services[-1]))
+    services.append(SceneManagerService(
+        game,
+        mqtt_client,
+        logger,
+        delta_publishing=os.getenv("BATTLE_DELTA_ENABLED", "true").lower() == "true",
+        codec=codec,
+    ))
+    services.append(BattleService(
+        mqtt_client,
+        logger,
+        services[-1],
+        codec=codec,
+        workers=int(os.getenv("BATTLE_COMMAND_WORKERS", "1")),
+        max_pending=int(os.getenv("BATTLE_COMMAND_MAX_PENDING", "64")),
+    ))
+    if os.getenv("SHM_CHANNEL_ENABLED", "false").lower() == "true":
+        services.append(ShmChannelService(
+            game,
+            logger,
+            services[-1],
+            directory=os.getenv("SHM_CHANNEL_DIR") or None,
+            name=os.getenv("SHM_CHANNEL_NAME", "pkm"),
+            every_n_frames=int(os.getenv("SHM_STATE_EVERY_N_FRAMES", "1")),
+        ))
+    if os.getenv("STATE_CATALOG_ENABLED", "false").lower() == "true":
+        services.append(StateCatalogService(
+            game,
+            logger,
+            db_path=os.getenv("STATE_CATALOG_PATH", "games/states.sqlite3"),
+            scan_dirs=[d for d in os.getenv("STATE_CATALOG_DIRS", "games").split(",") if d.strip()],
+        ))
+    if os.getenv("LOOKAHEAD_ENABLED", "false").lower() == "true":
+        services.append(LookaheadService(
+            game,
+            mqtt_client,
+            logger,
+            codec=codec,
+            workers=int(os.getenv("LOOKAHEAD_WORKERS", "0")) or None,
+            max_frames=int(os.getenv("LOOKAHEAD_MAX_FRAMES", "3600")),
+        ))
+    if os.getenv("SCREEN_STREAM_ENABLED", "false").lower() == "true":
+        services.append(ScreenStreamService(
+            game,
+            mqtt_client,
+            logger,
+            every_n_frames=int(os.getenv("SCREEN_STREAM_EVERY_N_FRAMES", "4")),
+            keyframe_interval=int(os.getenv("SCREEN_STREAM_KEYFRAME_INTERVAL", "60")),
+            publish_mqtt=os.getenv("SCREEN_STREAM_MQTT", "true").lower() == "true",
+            socket_port=int(os.getenv("SCREEN_STREAM_PORT", "0")),
+        ))
+    if os.getenv("METRICS_ENABLED", "true").lower() == "true":
+        services.append(MetricsService(
+            mqtt_client,
+            logger,
+            status_interval=float(os.getenv("STATUS_INTERVAL_SECONDS", "10")),
+            http_host=os.getenv("METRICS_HOST", "127.0.0.1"),
+            http_port=int(os.getenv("METRICS_PORT", "9108")),
+        ))
+    profiler_service = ProfilerService(mqtt_client, logger)
+    services.append(profiler_service)
 
+    # `kill -USR1 <pid>` opens a profiling window without going through MQTT
+    if hasattr(signal, "SIGUSR1"):
+        profile_seconds = float(os.getenv("PROFILE_SIGNAL_DURATION_SECONDS", "30"))
+        signal.signal(signal.SIGUSR1, lambda *_: profiler_service.start_window(profile_seconds))
 
     loop = EmulatorLoop(game, services=services)
 
@@ -39,6 +129,8 @@ def main() -> None:
         logger.info("Game stopped manually.")
     finally:
         mqtt_client.disconnect()
+        if local_broker_server is not None:
+            local_broker_server.stop()
         logger.info("Goodbye!")
 
 
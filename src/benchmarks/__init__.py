@@ -0,0 +1 @@
+"""Stand-alone micro-benchmarks (run from ``src/`` with ``python -m benchmarks.<name>``)."""
@@ -0,0 +1,107 @@
+"""Representative battle payloads built from the static data tables (no ROM needed)."""
+from __future__ import annotations
+
+import time
+from typing import Any, Dict
+
+from game.data.data import FUNCTION_CODE_EFFECT, POKDX_ID_TO_NAME, POKEMON_TYPES
+
+_MOVES = [
+    # id, name, effect, power, type, accuracy byte, pp
+    (33, "TACKLE", 0x00, 35, 0, 242, 35),
+    (45, "GROWL", 0x12, 0, 0, 255, 40),
+    (55, "WATER GUN", 0x00, 40, 21, 255, 25),
+    (22, "VINE WHIP", 0x00, 35, 22, 255, 10),
+    (52, "EMBER", 0x04, 40, 20, 255, 25),
+    (84, "THUNDERSHOCK", 0x06, 40, 23, 255, 30),
+    (16, "GUST", 0x00, 40, 2, 255, 35),
+    (98, "QUICK ATTACK", 0x00, 40, 0, 255, 30),
+]
+
+
+def sample_move(i: int, used: int = 0) -> Dict[str, Any]:
+    mid, name, effect, power, type_id, acc, pp = _MOVES[i % len(_MOVES)]
+    return {
+        "id": mid,
+        "name": name,
+        "effect": FUNCTION_CODE_EFFECT[effect],
+        "power": power,
+        "type": POKEMON_TYPES[type_id],
+        "accuracy": acc / 255 * 100,
+        "pp": (pp - used, pp),
+    }
+
+
+def sample_pokemon(dex: int, level: int, hp: int, seed: int = 0) -> Dict[str, Any]:
+    return {
+        "dex": dex,
+        "name": POKDX_ID_TO_NAME[dex]["en"],
+        "level": level,
+        "hp": (hp, level * 3),
+        "types": ("Water", "Water") if dex in (7, 8, 9) else ("Normal", "Flying"),
+        "status": ["Healty"],
+        "moves": [sample_move(seed + k, used=k) for k in range(4)],
+    }
+
+
+def sample_battle_payload(turn: int = 3) -> Dict[str, Any]:
+    return {
+        "battle_id": 1,
+        "turn": turn,
+        "timestamp": time.time(),
+        "scene": {
+            "enemy": sample_pokemon(16, 12, 30 - turn, seed=5),
+            "on_battle": sample_pokemon(8, 18, 50, seed=2),
+            "party": [sample_pokemon(dex, 10 + i, 30, seed=i) for i, dex in enumerate((8, 25, 16, 19, 1, 4))],
+        },
+    }
+
+
+# ----------------------------------------------------------------------
+# Synthetic emulator memory (RAM + move ROM tables) for RAM-level benches
+# ----------------------------------------------------------------------
+class SyntheticSession:
+    """Stand-in exposing ``memory``/``read_memory``/``version`` over a plain bytearray."""
+
+    def __init__(self) -> None:
+        self.memory = bytearray(0x10000)
+        self.version = type("Version", (), {"is_yellow": False})()
+        self.logger = None
+
+    def read_memory(self, md):
+        return self.memory[md.start_address:md.end_address + 1]
+
+
+def synthetic_session(seed: int = 1) -> SyntheticSession:
+    """Fill a :class:`SyntheticSession` with a plausible battle and register it globally."""
+    import random
+
+    from game.data.ram_reader import MemoryData, MoveROMBank
+
+    rnd = random.Random(seed)
+    session = SyntheticSession()
+    MemoryData.set_game(session)
+
+    bank = object.__new__(MoveROMBank)
+    moves = bytearray()
+    for move_id in range(1, 166):
+        moves += bytes([move_id, rnd.randrange(0, 0x56), rnd.randrange(0, 120),
+                        rnd.choice([0, 1, 2, 20, 21, 22, 23]), rnd.randrange(100, 256), rnd.choice(range(5, 45, 5))])
+    bank.moves_data = bytes(moves)
+    bank.names_blob = b"\x50".join(bytes([0x80 + i % 26, 0x80 + i * 7 % 26, 0x7F, 0x81]) for i in range(1, 170))
+    bank._names_list = bank.names_blob.split(b"\x50")
+    MoveROMBank._instance = bank
+
+    mem = session.memory
+    for addr in range(0xCFE5, 0xD273):
+        mem[addr] = rnd.randrange(0, 256)
+    for base, moves_at, type_at in [(0xCFE5, 8, 5), (0xD009, 19, 16)] + [(0xD16B + 44 * i, 8, 5) for i in range(6)]:
+        for k in range(4):
+            mem[base + moves_at + k] = rnd.randrange(1, 166)
+        mem[base + type_at] = rnd.choice([0, 20, 21, 22])
+        mem[base + type_at + 1] = rnd.choice([0, 2, 3])
+    mem[0xD009:0xD014] = bytes([0x8F, 0x88, 0x8A, 0x80, 0x82, 0x87, 0x94, 0x50, 0, 0, 0])  # "PIKACHU"
+    return session
+
+
+__all__ = ["sample_battle_payload", "sample_pokemon", "sample_move", "SyntheticSession", "synthetic_session"]
@@ -0,0 +1,27 @@
+"""Encode time and payload size per MQTT codec for a full battle keyframe.
+
+Run from ``src/``::
+
+    python -m benchmarks.bench_codecs
+"""
+from __future__ import annotations
+
+import timeit
+
+from benchmarks._sample import sample_battle_payload
+from game.mqtt.codecs import CODECS
+
+
+def main(number: int = 2000) -> None:
+    payload = sample_battle_payload()
+    print(f"{'codec':<14} {'bytes':>7} {'encode us':>10} {'decode us':>10}")
+    for name, codec in CODECS.items():
+        encoded = codec.encode(payload)
+        size = len(encoded.encode("utf-8")) if isinstance(encoded, str) else len(encoded)
+        enc = timeit.timeit(lambda: codec.encode(payload), number=number) / number * 1e6
+        dec = timeit.timeit(lambda: codec.decode(encoded), number=number) / number * 1e6
+        print(f"{name:<14} {size:>7} {enc:>10.1f} {dec:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
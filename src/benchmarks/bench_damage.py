@@ -0,0 +1,90 @@
+"""Vectorised damage table vs the same formula as a per-roll Python loop.
+
+Random attackers (4 moves) against ``--targets`` random defenders: the
+reference loop computes every (move, target, crit, roll) damage one at a
+time and must match :func:`~game.data.damage.damage_table` exactly.
+
+Run from ``src/``::
+
+    python -m benchmarks.bench_damage [--targets 6]
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+
+import numpy as np
+
+from game.data.damage import ROLLS, Combatant, MoveArrays, damage_table, default_type_matrices
+
+TYPES = (0, 1, 2, 3, 4, 5, 7, 8, 0x14, 0x15, 0x16, 0x17, 0x18, 0x19, 0x1A)
+
+
+def _reference(attacker: Combatant, moves: MoveArrays, targets: Combatant) -> np.ndarray:
+    eff, order = default_type_matrices()
+    out = np.zeros((len(moves.power), len(targets.hp), 2, len(ROLLS)), dtype=np.int32)
+    for m in range(len(moves.power)):
+        power, mtype = int(moves.power[m]), int(moves.type[m])
+        for n in range(len(targets.hp)):
+            t1, t2 = int(targets.type1[n]), int(targets.type2[n])
+            special = mtype >= 20
+            a = int(attacker.special if special else attacker.attack)
+            d = int(targets.special[n] if special else targets.defense[n])
+            if a > 255 or d > 255:
+                a, d = a // 4, d // 4
+            d = max(d, 1)
+            for crit in (0, 1):
+                level = int(attacker.level) * (2 if crit else 1)
+                dmg = min((2 * level // 5 + 2) * power * a // d // 50, 997) + 2
+                if mtype in (int(attacker.type1), int(attacker.type2)):
+                    dmg += dmg // 2
+                entries = sorted((int(order[mtype, t]), int(eff[mtype, t])) for t in {t1, t2})
+                for _, multiplier in entries:
+                    dmg = dmg * multiplier // 10
+                if power == 0:
+                    dmg = 0
+                for r, roll in enumerate(ROLLS.tolist()):
+                    out[m, n, crit, r] = dmg * roll // 255 if dmg > 1 else dmg
+    return out
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--targets", type=int, default=6)
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    n = args.targets
+    attacker = Combatant.of(
+        level=50, hp=150, attack=120, defense=95, speed=110, special=130, type1=0x15, type2=0x19, base_speed=90
+    )
+    targets = Combatant.of(
+        level=rng.integers(5, 101, n), hp=rng.integers(20, 400, n),
+        attack=rng.integers(10, 400, n), defense=rng.integers(10, 400, n),
+        speed=rng.integers(10, 400, n), special=rng.integers(10, 400, n),
+        type1=rng.choice(TYPES, n), type2=rng.choice(TYPES, n),
+    )
+    moves = MoveArrays.from_rows([
+        [57, 0x00, 95, 0x15, 255, 15],   # Surf
+        [58, 0x05, 95, 0x19, 255, 10],   # Ice Beam
+        [34, 0x24, 85, 0x00, 255, 15],   # Body Slam
+        [89, 0x00, 100, 0x04, 255, 10],  # Earthquake
+    ])
+
+    table = damage_table(attacker, moves, targets)
+    assert np.array_equal(table.rolls, _reference(attacker, moves, targets)), "vectorised result differs"
+
+    t_vec = min(timeit.repeat(lambda: damage_table(attacker, moves, targets).expected, number=args.number, repeat=5))
+    t_ref = min(timeit.repeat(lambda: _reference(attacker, moves, targets), number=1, repeat=3))
+    t_vec /= args.number
+    print(f"4 moves x {n} targets x 2 x {len(ROLLS)} rolls = {table.rolls.size} damages")
+    print(f"vectorised (with expected/KO) {t_vec * 1e6:8.0f} us")
+    print(f"per-roll loop                 {t_ref * 1e6:8.0f} us  ({t_ref / t_vec:.0f}x)")
+    print("expected damage per move/target:")
+    print(np.round(table.expected, 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Per-publish cost: ``to_json(NormalBattle.to_dict())`` vs the compiled serializer.
+
+Run from ``src/``::
+
+    python -m benchmarks.bench_scene_serializer
+"""
+from __future__ import annotations
+
+import timeit
+
+from benchmarks._sample import synthetic_session
+from game.data.pokemon import EnemyPokemon, PartyPokemon, PlayerPokemonBattle
+from game.scenes.serializer import SCENE_BLOCK, SceneSerializer
+from game.utils.json_utils import to_json
+
+
+def main(number: int = 500) -> None:
+    session = synthetic_session()
+    enemy = EnemyPokemon(session, False)
+    active = PlayerPokemonBattle(session, False)
+    party = [PartyPokemon(session, slot, False) for slot in range(1, 7)]
+
+    def legacy() -> str:
+        return to_json({
+            "enemy": enemy.to_dict(),
+            "on_battle": active.to_dict(),
+            "party": [p.to_dict() for p in party],
+        })
+
+    serializer = SceneSerializer(lambda: list(session.read_memory(SCENE_BLOCK)))
+    assert legacy() == serializer.to_json(), "compiled output diverged from to_dict()+to_json()"
+
+    records = serializer.snapshot()
+    t_legacy = timeit.timeit(legacy, number=number) / number * 1e6
+    t_compiled = timeit.timeit(serializer.to_json, number=number) / number * 1e6
+    t_write = timeit.timeit(lambda: serializer.to_json(records), number=number) / number * 1e6
+    print(f"to_dict + to_json        {t_legacy:8.1f} us")
+    print(f"compiled (read + write)  {t_compiled:8.1f} us  ({t_legacy / t_compiled:.1f}x)")
+    print(f"compiled (write only)    {t_write:8.1f} us  ({t_legacy / t_write:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
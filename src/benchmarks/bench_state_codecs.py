@@ -0,0 +1,102 @@
+"""Save-state codecs: compression ratio vs save/load latency on the repo's states.
+
+"save" is :meth:`SaveStateManager.write_state` of each state into memory
+(header, buffering, compression, CRC; no fsync), "load" is
+:func:`split_state` + decompression, both averaged over every state under
+``--states``.  PyBoy's own ``save_state``/``load_state`` (bundled ROM) are
+printed first for scale.
+
+Run from ``src/``::
+
+    python -m benchmarks.bench_state_codecs [--codecs raw,zlib,lzma]
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import tempfile
+import timeit
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from game.core.state import SaveStateManager, split_state
+from game.core.state_codecs import STATE_CODECS, get_state_codec
+from game.offline.state_file import find_states
+
+LEVELS = {"zlib": (1, 6, 9), "gzip": (6,), "bz2": (1, 9), "lzma": (0, 6), "zstd": (1, 3, 10, 19)}
+
+
+class _Payload:
+    """Emulator stand-in whose ``save_state`` writes a fixed PyBoy state."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    def save_state(self, fh) -> None:
+        for i in range(0, len(self.data), 1 << 16):
+            fh.write(self.data[i:i + (1 << 16)])
+
+
+def _best_ms(fn, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e3
+
+
+def _pyboy_baseline(number: int, repeat: int) -> Tuple[float, float]:
+    import pyboy
+    from pyboy import PyBoy
+
+    emulator = PyBoy(os.path.join(os.path.dirname(pyboy.__file__), "default_rom.gb"), window="null")
+    emulator.tick(60, False)
+    buf = io.BytesIO()
+    emulator.save_state(buf)
+    state = buf.getvalue()
+    t_save = _best_ms(lambda: emulator.save_state(io.BytesIO()), number, repeat)
+    t_load = _best_ms(lambda: emulator.load_state(io.BytesIO(state)), number, repeat)
+    emulator.stop(save=False)
+    return t_save, t_load
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--states", default="../games")
+    parser.add_argument("--codecs", default=",".join(STATE_CODECS))
+    parser.add_argument("--number", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    states = [Path(p).read_bytes() for p in find_states(args.states)]
+    raw_bytes = sum(len(s) for s in states)
+    t_save, t_load = _pyboy_baseline(args.number, args.repeat)
+    print(f"{len(states)} states, {raw_bytes / len(states) / 1024:.0f} KiB each on average")
+    print(f"PyBoy save_state {t_save:.2f} ms, load_state {t_load:.2f} ms (for scale)\n")
+    print(f"{'codec':<6} {'level':>5} {'ratio':>7} {'KiB':>7} {'save ms':>8} {'load ms':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rom = Path(tmp, "rom.gb")
+        rom.write_bytes(b"\0" * 0x8000)
+        for name in args.codecs.split(","):
+            codec = get_state_codec(name)
+            for level in LEVELS.get(codec.name, (None,)):
+                manager = SaveStateManager(str(rom), codec=codec.name, level=level)
+                files = []
+                save_ms = 0.0
+                for state in states:
+                    emulator = _Payload(state)
+                    out = io.BytesIO()
+                    manager.write_state(emulator, out)
+                    files.append(out.getvalue())
+                    save_ms += _best_ms(lambda: manager.write_state(emulator, io.BytesIO()), args.number, args.repeat)
+                load_ms = sum(
+                    _best_ms(lambda: codec.decompress(split_state(f, manager.rom_digest)[1]), args.number, args.repeat)
+                    for f in files
+                )
+                stored = sum(len(f) for f in files)
+                print(
+                    f"{codec.name:<6} {level if level is not None else '-':>5} {raw_bytes / stored:6.1f}x"
+                    f" {stored / len(files) / 1024:7.1f} {save_ms / len(files):8.2f} {load_ms / len(files):8.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Cost of verifying a save state on load, next to the load itself.
+
+Each repo state is rewritten with a :class:`~game.core.state.StateHeader`
+in a temp directory; "read" is a plain ``read()`` of the headerless file,
+"verify" is :meth:`SaveStateManager.read_verified` (read + size + CRC +
+ROM digest).  The PyBoy load is timed on PyBoy's bundled ROM, or on
+``--rom`` (whose states are then also loaded) when given.
+
+Run from ``src/``::
+
+    python -m benchmarks.bench_state_verify [--rom ../games/PokemonRouge.gb]
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import tempfile
+import timeit
+import zlib
+from pathlib import Path
+
+from game.core.state import SaveStateManager, StateHeader
+from game.core.state_codecs import RAW_CODEC
+from game.offline.state_file import find_states
+
+
+def _best_us(fn, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def _load_us(pyboy, payload: bytes, number: int, repeat: int) -> float:
+    return _best_us(lambda: pyboy.load_state(io.BytesIO(payload)), number, repeat)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--states", default="../games")
+    parser.add_argument("--rom", help="ROM the states were saved from (default: PyBoy's bundled ROM)")
+    parser.add_argument("--number", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    import pyboy
+    from pyboy import PyBoy
+
+    rom = args.rom or os.path.join(os.path.dirname(pyboy.__file__), "default_rom.gb")
+    emulator = PyBoy(rom, window="null", sound_emulated=False)
+    emulator.tick(60, False)
+    own = io.BytesIO()
+    emulator.save_state(own)
+    t_load_own = _load_us(emulator, own.getvalue(), args.number, args.repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = SaveStateManager(rom, os.path.join(tmp, "x.state"))
+        print(f"{'state':<36} {'bytes':>7} {'read':>8} {'verify':>8} {'load':>9}  overhead")
+        for path in find_states(args.states):
+            raw = Path(path).read_bytes()
+            plain, headed = Path(tmp, "plain"), Path(tmp, "headed")
+            plain.write_bytes(raw)
+            header = StateHeader(RAW_CODEC.id, zlib.crc32(raw), len(raw), manager.rom_digest)
+            headed.write_bytes(header.pack() + raw)
+
+            t_read = _best_us(plain.read_bytes, args.number, args.repeat)
+            t_verify = _best_us(lambda: manager.read_verified(headed), args.number, args.repeat)
+            t_load = _load_us(emulator, raw, args.number, args.repeat) if args.rom else t_load_own
+            print(
+                f"{os.path.relpath(path, args.states)[:36]:<36} {len(raw):7d} {t_read:6.0f}us {t_verify:6.0f}us"
+                f" {t_load:7.0f}us  {(t_verify - t_read) / (t_load + t_read) * 100:5.2f}%"
+            )
+    emulator.stop(save=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Per-call cost of decoding 11-byte names: byte loop vs table-driven vs cached.
+
+Run from ``src/``::
+
+    python -m benchmarks.bench_text_decoder
+"""
+from __future__ import annotations
+
+import timeit
+
+from game.data.decoder import PKM_GEN1_TABLE, TEXT_CACHE, decode_pkm_name, decode_pkm_text, encode_pkm_text
+
+
+def legacy_decode(bytes_, table=PKM_GEN1_TABLE, stop_at_terminator=True):
+    """The previous implementation: one dict lookup (and f-string for unknowns) per byte."""
+    out = []
+    for b in bytes_:
+        if stop_at_terminator and b == 0x50:
+            break
+        if b in table:
+            out.append(table[b])
+        else:
+            out.append(f"<?{b:02X}>")
+    return "".join(out)
+
+
+SAMPLES = {
+    # name field as read from RAM (list of ints, 0x50 padded)
+    "short name (list)": list(encode_pkm_text("ABRA", 11)),
+    "typical name (list)": list(encode_pkm_text("PIKACHU", 11)),
+    "full name (list)": list(encode_pkm_text("BUTTERFREE", 11)),
+    "full name (bytes)": encode_pkm_text("BUTTERFREE", 11),
+    "ligature (list)": list(encode_pkm_text("PkMn é", 11)),
+}
+
+
+def _best_ns(fn, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e9
+
+
+def main(number: int = 50_000, repeat: int = 9) -> None:
+    for label, raw in SAMPLES.items():
+        assert legacy_decode(raw) == decode_pkm_text(raw) == decode_pkm_name(raw), label
+        t_legacy = _best_ns(lambda: legacy_decode(raw), number, repeat)
+        t_table = _best_ns(lambda: decode_pkm_text(raw), number, repeat)
+        t_cached = _best_ns(lambda: decode_pkm_name(raw), number, repeat)
+        print(
+            f"{label:<20} legacy {t_legacy:7.0f} ns   table {t_table:7.0f} ns ({t_legacy / t_table:.2f}x)"
+            f"   cached {t_cached:7.0f} ns ({t_legacy / t_cached:.2f}x)"
+        )
+    print("text cache:", TEXT_CACHE.stats())
+
+
+if __name__ == "__main__":
+    main()
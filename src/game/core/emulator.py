@@ -1,7 +1,10 @@
 """PyBoy wrapper used by the modernised game loop."""
 from __future__ import annotations
 
-from typing import Iterable, Optional
+import io
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Iterable, List, Optional
 
 from loguru import logger as _loguru_logger
 from pyboy import PyBoy
@@ -11,33 +14,74 @@ from game.core.state import SaveStateManager
 from game.core.version import GameVersion, ROM_PATHS, version_from_choice
 from game.data.data import GBAButton
 from game.data.ram_reader import MemoryData, MoveROMBank, SavedPokemonData
+from game.utils.metrics import REGISTRY
+from game.utils.profiler import LOCK_WAIT_TAG, set_thread_tag
 
 from threading import RLock
 
 
+_TICK_SECONDS = REGISTRY.histogram("pkm_emulator_tick_seconds", "Duration of one PyBoy tick")
+_TICK_LOCK_WAIT_SECONDS = REGISTRY.histogram(
+    "pkm_tick_lock_wait_seconds", "Time spent waiting for the emulator tick lock", label_names=("caller",)
+)
+_SAVE_STATE_SECONDS = REGISTRY.histogram(
+    "pkm_save_state_seconds", "Duration of a save-state write", buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+_LOAD_STATE_SECONDS = REGISTRY.histogram(
+    "pkm_load_state_seconds",
+    "Duration of a save-state load, verification included",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+_BUTTON_QUEUE_DEPTH = REGISTRY.gauge("pkm_button_queue_depth", "Buttons waiting to be pressed")
+_LOCK_WAIT_TICK = _TICK_LOCK_WAIT_SECONDS.labels("tick")
+_LOCK_WAIT_READ = _TICK_LOCK_WAIT_SECONDS.labels("read_memory")
+
+
 class EmulatorSession(PyBoy):
     """Thin wrapper around :class:`pyboy.PyBoy` adding project specific helpers."""
 
-    def __init__(self, version: GameVersion, *, logger=_loguru_logger, save_state_path: str | None = None):
-        super().__init__(ROM_PATHS[version], window="SDL2", log_level="INFO", sound_emulated=True)
+    def __init__(
+        self,
+        version: GameVersion,
+        *,
+        logger=_loguru_logger,
+        save_state_path: str | None = None,
+        save_state_codec: str = "raw",
+        save_state_level: int | None = None,
+        window: str = "SDL2",
+        sound_emulated: bool = True,
+        rom_table_cache_dir: str | None = None,
+    ):
+        super().__init__(ROM_PATHS[version], window=window, log_level="INFO", sound_emulated=sound_emulated)
         self.version = version
         self.logger = logger
-        self.save_state_ma = SaveStateManager(ROM_PATHS[version], save_state_path)
+        self.save_state_ma = SaveStateManager(
+            ROM_PATHS[version], save_state_path, codec=save_state_codec, level=save_state_level
+        )
         self.buttons: ThreadSafeQueue[GBAButton] = ThreadSafeQueue()
+        _BUTTON_QUEUE_DEPTH.set_function(self.buttons.__len__)
         MemoryData.set_shift(0x0)
         MemoryData.set_game(self)
-        MoveROMBank(self)
+        MoveROMBank(
+            self,
+            rom_digest=self.save_state_ma.rom_digest if rom_table_cache_dir else None,
+            cache_dir=rom_table_cache_dir,
+        )
         self.is_running = False
 
         self._tick_lock = RLock()
+        # called on the emulator thread after every frame (keep them cheap)
+        self._frame_listeners: List[Callable[["EmulatorSession"], None]] = []
+        # called with the saved path after every successful save, tick lock held
+        self._save_listeners: List[Callable[["EmulatorSession", Path], None]] = []
 
     # ------------------------------------------------------------------
     # Construction helpers
     # ------------------------------------------------------------------
     @classmethod
-    def from_choice(cls, choice: str, *, logger=_loguru_logger, save_state_path: str | None = None) -> "EmulatorSession":
+    def from_choice(cls, choice: str, *, logger=_loguru_logger, save_state_path: str | None = None, **kwargs) -> "EmulatorSession":
         version = version_from_choice(choice)
-        return cls(version, logger=logger,save_state_path= save_state_path)
+        return cls(version, logger=logger,save_state_path= save_state_path, **kwargs)
 
     # ------------------------------------------------------------------
     # Button queue helpers
@@ -66,10 +110,12 @@ class EmulatorSession(PyBoy):
     def load_state_from_disk(self) -> bool:
         try:
             with self._tick_lock:
-                loaded = self.save_state_ma.load(self)
-                if loaded:
-                    self.logger.info("Save state loaded from {}", self.save_state_ma.path)
-                return loaded
+                started = perf_counter()
+                loaded = self.save_state_ma.load(self, self.logger)
+                if loaded is not None:
+                    _LOAD_STATE_SECONDS.observe(perf_counter() - started)
+                    self.logger.info("Save state loaded from {}", loaded)
+                return loaded is not None
         except Exception as exc:  # pragma: no cover - defensive logging
             self.logger.exception("Failed to load save state: {}", exc)
             return False
@@ -77,26 +123,75 @@ class EmulatorSession(PyBoy):
     def save_state_to_disk(self) -> None:
         try:
             with self._tick_lock:
+                started = perf_counter()
                 self.save_state_ma.save(self)
+                _SAVE_STATE_SECONDS.observe(perf_counter() - started)
+                for listener in self._save_listeners:
+                    try:
+                        listener(self, self.save_state_ma.path)
+                    except Exception as exc:  # pragma: no cover - the state is already on disk
+                        self.logger.exception("Save listener {!r} failed: {}", listener, exc)
         except Exception as exc:  # pragma: no cover - defensive logging
             self.logger.exception("Failed to save state: {}", exc)
             raise
 
+    def snapshot(self) -> bytes:
+        """The complete emulator state, in memory (same format as ``save_state``)."""
+        with self._tick_lock:
+            buf = io.BytesIO()
+            self.save_state(buf)
+            return buf.getvalue()
+
+    def add_save_listener(self, listener: Callable[["EmulatorSession", Path], None]) -> None:
+        self._save_listeners.append(listener)
+
+    def remove_save_listener(self, listener: Callable[["EmulatorSession", Path], None]) -> None:
+        if listener in self._save_listeners:
+            self._save_listeners.remove(listener)
+
     # ------------------------------------------------------------------
     # Memory helpers
     # ------------------------------------------------------------------
     def read_memory(self, elem: MemoryData) -> bytes:
+        waited = perf_counter()
         with self._tick_lock:
+            _LOCK_WAIT_READ.observe(perf_counter() - waited)
             elem = MemoryData.get_pkm_yellow_addresses(elem)
             return SavedPokemonData.get_data(self, elem)
 
+    def read_sram(self, bank: int, elem: MemoryData) -> bytes:
+        """Read a cartridge RAM region (0xA000-0xBFFF) from ``bank``, whichever bank is mapped."""
+        waited = perf_counter()
+        with self._tick_lock:
+            _LOCK_WAIT_READ.observe(perf_counter() - waited)
+            return bytes(self.memory[bank, elem.start_address : elem.end_address + 1])
+
     # ------------------------------------------------------------------
     # Loop helpers
     # ------------------------------------------------------------------
+    def add_frame_listener(self, listener: Callable[["EmulatorSession"], None]) -> None:
+        self._frame_listeners.append(listener)
+
+    def remove_frame_listener(self, listener: Callable[["EmulatorSession"], None]) -> None:
+        if listener in self._frame_listeners:
+            self._frame_listeners.remove(listener)
+
     def tick_once(self) -> bool:
+        waited = perf_counter()
+        tag = set_thread_tag(LOCK_WAIT_TAG)  # blocked here is not PyBoy time
         with self._tick_lock:
+            set_thread_tag(tag)
+            started = perf_counter()
             self.is_running = self.tick()
-            return self.is_running
+            ended = perf_counter()
+        _LOCK_WAIT_TICK.observe(started - waited)
+        _TICK_SECONDS.observe(ended - started)
+        for listener in self._frame_listeners:
+            try:
+                listener(self)
+            except Exception as exc:  # pragma: no cover - a listener must not stop the emulator
+                self.logger.exception("Frame listener {!r} failed: {}", listener, exc)
+        return self.is_running
 
 
 __all__ = ["EmulatorSession"]
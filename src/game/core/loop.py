@@ -7,9 +7,18 @@ import time  # pour sleep léger dans le thread services
 
 from game.core.emulator import EmulatorSession
 from game.services.service import Service
+from game.utils.metrics import REGISTRY
+from game.utils.profiler import register_thread, set_thread_tag, unregister_thread
 from game.utils.time_utils import has_expired, monotonic, seconds_from_now
 
 
+_FRAMES_TOTAL = REGISTRY.counter("pkm_emulator_frames_total", "Frames emulated since start")
+_EMULATOR_FPS = REGISTRY.gauge("pkm_emulator_fps", "Emulated frames per second (averaged over ~1 s)")
+_SERVICE_TICK_SECONDS = REGISTRY.histogram(
+    "pkm_service_tick_seconds", "Duration of Service.tick", label_names=("service",)
+)
+
+
 class EmulatorLoop:
     def __init__(
         self,
@@ -35,12 +44,19 @@ class EmulatorLoop:
     def _services_loop(self) -> None:
         """ Loop to run services in a separate thread. """
         self.session.logger.info("Starting services loop")
+        register_thread("services")
+        timed_services = [
+            (service, type(service).__name__, _SERVICE_TICK_SECONDS.labels(type(service).__name__))
+            for service in self.services
+        ]
         try:
             next_tick = self.clock()
             while not self._stop_services.is_set():
                 now = self.clock()
                 if now >= next_tick:
-                    for service in self.services:
+                    for service, service_name, tick_hist in timed_services:
+                        set_thread_tag(service_name)
+                        started = time.perf_counter()
                         try:
                             service.tick(now)
                         except Exception:
@@ -48,11 +64,14 @@ class EmulatorLoop:
                             self.session.logger.exception(
                                 "Error in service.tick for %r", service
                             )
+                        tick_hist.observe(time.perf_counter() - started)
                     next_tick = now + self.service_tick_interval
+                    set_thread_tag("idle")
 
                 #small sleep to avoid busy-waiting
                 time.sleep(0.001)
         finally:
+            unregister_thread()
             self.session.logger.info("Services loop stopped")
 
     # ------------------------------------------------------------------
@@ -69,13 +88,23 @@ class EmulatorLoop:
         )
         self._services_thread.start()
         frame = 0
+        fps_window_start = self.clock()
+        register_thread("emulator")
         try:
             while True:
                 frame += 1
 
                 now = self.clock()
                 if frame % 60 == 0:
+                    set_thread_tag("buttons")
                     self._maybe_pop_button(now)
+                    # FPS is refreshed once per 60 frames to keep the hot path cheap
+                    elapsed = now - fps_window_start
+                    if elapsed > 0:
+                        _EMULATOR_FPS.set(60 / elapsed)
+                    fps_window_start = now
+                    _FRAMES_TOTAL.inc(60)
+                set_thread_tag("frame")
                 running = self.session.tick_once()
 
                 if not running:
@@ -84,6 +113,7 @@ class EmulatorLoop:
 
 
         finally:
+            unregister_thread()
             self.session.logger.info("Emulator loop finished")
 
             # Stop the services thread
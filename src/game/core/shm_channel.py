@@ -0,0 +1,263 @@
+"""mmap-backed ring buffers shared with a co-located decision process.
+
+Two rings live in two files (``/dev/shm`` when available):
+
+* the *state* ring, written by the emulator every N frames with the battle
+  and party state in the fixed :data:`STATE_RECORD` layout.  It keeps the
+  last ``capacity`` frames; a reader normally just takes :meth:`ShmRing.latest`;
+* the *command* ring, a single-producer/single-consumer queue written by the
+  planner (:func:`pack_command`) and drained by the bot.
+
+File layout (little endian)::
+
+    header  magic "PKMR", version u16, reserved u16, slot_size u32,
+            capacity u32, write_seq u64, read_seq u64          (32 bytes)
+    slots   capacity x [seq u64, length u32, pad u32, payload[slot_size]]
+
+Writers follow a seqlock per slot: the slot ``seq`` is zeroed while the
+payload is written and set last, so readers detect torn reads and retry.
+Nothing is serialized: a reader unpacks the payload with :mod:`struct`
+(or ``numpy.frombuffer``) straight from the copied slot.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import tempfile
+from typing import List, Optional, Tuple
+
+MAGIC = b"PKMR"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIIQQ")
+_WRITE_SEQ_AT = 16
+_READ_SEQ_AT = 24
+_SLOT_HEADER = struct.Struct("<QII")
+_U64 = struct.Struct("<Q")
+_READ_RETRIES = 8
+
+
+def default_channel_dir() -> str:
+    return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+class ShmRing:
+    """Fixed-slot ring in a shared file mapping (one writer per ring)."""
+
+    def __init__(self, path: str, fd: int, mapping: mmap.mmap, slot_size: int, capacity: int) -> None:
+        self.path = path
+        self._fd = fd
+        self._map = mapping
+        self.slot_size = slot_size
+        self.capacity = capacity
+        self._stride = _SLOT_HEADER.size + slot_size
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def create(cls, path: str, slot_size: int, capacity: int) -> "ShmRing":
+        size = _HEADER.size + capacity * (_SLOT_HEADER.size + slot_size)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.ftruncate(fd, size)
+        mapping = mmap.mmap(fd, size)
+        _HEADER.pack_into(mapping, 0, MAGIC, VERSION, 0, slot_size, capacity, 0, 0)
+        return cls(path, fd, mapping, slot_size, capacity)
+
+    @classmethod
+    def open(cls, path: str) -> "ShmRing":
+        fd = os.open(path, os.O_RDWR)
+        mapping = mmap.mmap(fd, os.fstat(fd).st_size)
+        magic, version, _, slot_size, capacity, _, _ = _HEADER.unpack_from(mapping, 0)
+        if magic != MAGIC or version != VERSION:
+            mapping.close()
+            os.close(fd)
+            raise ValueError(f"{path} is not a v{VERSION} shared-memory ring")
+        return cls(path, fd, mapping, slot_size, capacity)
+
+    def close(self, unlink: bool = False) -> None:
+        self._map.close()
+        os.close(self._fd)
+        if unlink:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Cursors
+    # ------------------------------------------------------------------
+    @property
+    def write_seq(self) -> int:
+        return _U64.unpack_from(self._map, _WRITE_SEQ_AT)[0]
+
+    @property
+    def read_seq(self) -> int:
+        return _U64.unpack_from(self._map, _READ_SEQ_AT)[0]
+
+    def _slot_at(self, seq: int) -> int:
+        return _HEADER.size + ((seq - 1) % self.capacity) * self._stride
+
+    # ------------------------------------------------------------------
+    # Writer
+    # ------------------------------------------------------------------
+    def publish(self, payload: bytes) -> int:
+        """Write ``payload`` as the next slot (overwrites the oldest); returns its seq."""
+        if len(payload) > self.slot_size:
+            raise ValueError(f"payload of {len(payload)} bytes exceeds slot size {self.slot_size}")
+        seq = self.write_seq + 1
+        at = self._slot_at(seq)
+        mapping = self._map
+        _U64.pack_into(mapping, at, 0)  # slot busy
+        start = at + _SLOT_HEADER.size
+        mapping[start:start + len(payload)] = payload
+        _SLOT_HEADER.pack_into(mapping, at, seq, len(payload), 0)
+        _U64.pack_into(mapping, _WRITE_SEQ_AT, seq)
+        return seq
+
+    def push(self, payload: bytes) -> bool:
+        """Queue semantics: like :meth:`publish` but refuses to overwrite unread slots."""
+        if self.write_seq - self.read_seq >= self.capacity:
+            return False
+        self.publish(payload)
+        return True
+
+    # ------------------------------------------------------------------
+    # Readers
+    # ------------------------------------------------------------------
+    def read(self, seq: int) -> Optional[bytes]:
+        """Payload of ``seq`` if it is still in the ring (and not being rewritten)."""
+        if seq < 1:
+            return None
+        at = self._slot_at(seq)
+        mapping = self._map
+        for _ in range(_READ_RETRIES):
+            slot_seq, length, _ = _SLOT_HEADER.unpack_from(mapping, at)
+            if slot_seq != seq:
+                if slot_seq == 0:
+                    continue  # being written
+                return None  # overwritten
+            start = at + _SLOT_HEADER.size
+            payload = mapping[start:start + length]
+            if _U64.unpack_from(mapping, at)[0] == seq:
+                return payload
+        return None
+
+    def latest(self) -> Optional[Tuple[int, bytes]]:
+        """``(seq, payload)`` of the newest complete slot, or ``None`` if empty."""
+        for _ in range(_READ_RETRIES):
+            seq = self.write_seq
+            if seq == 0:
+                return None
+            payload = self.read(seq)
+            if payload is not None:
+                return seq, payload
+        return None
+
+    def pop(self) -> Optional[bytes]:
+        """Queue semantics: next unread payload, advancing ``read_seq``."""
+        read_seq = self.read_seq
+        if read_seq >= self.write_seq:
+            return None
+        payload = self.read(read_seq + 1)
+        _U64.pack_into(self._map, _READ_SEQ_AT, read_seq + 1)
+        return payload
+
+
+# ----------------------------------------------------------------------
+# Record layouts
+# ----------------------------------------------------------------------
+# frame u32, battle type u8, turn u8, pokemon count u16
+STATE_HEADER = struct.Struct("<IBBH")
+# dex u16, level u8, hp u16, max hp u16, type1, type2, status, 4 move ids, 4 current PP
+POKEMON_RECORD = struct.Struct("<HBHHBBB4B4B")
+# enemy, active, party 1..6
+STATE_POKEMON = 8
+STATE_RECORD = struct.Struct("<IBBH" + "HBHHBBB4B4B" * STATE_POKEMON)
+# request id (ASCII, NUL padded), BATTLE_ACTION value, choice, reserved
+COMMAND_RECORD = struct.Struct("<16sBBH")
+
+
+def unpack_state(payload: bytes) -> Tuple[Tuple[int, int, int, int], List[Tuple[int, ...]]]:
+    """Split a state payload into its header and the 8 Pokémon records."""
+    header = STATE_HEADER.unpack_from(payload, 0)
+    pokemon = [
+        POKEMON_RECORD.unpack_from(payload, STATE_HEADER.size + i * POKEMON_RECORD.size)
+        for i in range(STATE_POKEMON)
+    ]
+    return header, pokemon
+
+
+# (species, level, hp, max_hp, type1, type2, status, moves, pp) offsets inside SCENE_BLOCK
+Offsets = Tuple[int, int, int, int, int, int, int, int, int]
+
+# built on first pack_state: the schemas live with the scene serializer, which
+# the planner side (unpack_* only) should not have to import
+_PACK_TABLES: Optional[Tuple[int, Tuple[Offsets, ...], dict]] = None
+
+
+def _pack_tables() -> Tuple[int, Tuple[Offsets, ...], dict]:
+    global _PACK_TABLES
+    if _PACK_TABLES is None:
+        from game.data.data import POKEMON_ROM_ID_TO_PKDX_ID
+        from game.data.ram_reader import MainPokemonData
+        from game.scenes.serializer import ENEMY_SCHEMA, PARTY_SCHEMAS, PLAYER_BATTLE_SCHEMA, SCENE_BLOCK
+
+        def offsets(schema) -> Offsets:
+            start = schema.address - SCENE_BLOCK.start_address
+            return (
+                start + schema.species, start + schema.level, start + schema.hp, start + schema.max_hp,
+                start + schema.type1, start + schema.type2, start + schema.status, start + schema.moves,
+                start + schema.pp,
+            )
+
+        records = (offsets(ENEMY_SCHEMA), offsets(PLAYER_BATTLE_SCHEMA), *(offsets(s) for s in PARTY_SCHEMAS))
+        assert len(records) == STATE_POKEMON
+        battle_type_at = MainPokemonData.BattleTypeID.start_address - SCENE_BLOCK.start_address
+        _PACK_TABLES = (battle_type_at, records, POKEMON_ROM_ID_TO_PKDX_ID)
+    return _PACK_TABLES
+
+
+def pack_state(frame: int, mem: bytes, turn: int) -> bytes:
+    """Pack the :data:`STATE_RECORD` for one frame from the scene RAM window (``SCENE_BLOCK``)."""
+    battle_type_at, records, dex_ids = _pack_tables()
+    values: List[int] = [frame & 0xFFFFFFFF, mem[battle_type_at], turn, STATE_POKEMON]
+    dex = dex_ids.get
+    for species, level, hp, max_hp, t1, t2, status, moves, pp in records:
+        values.extend((
+            dex(mem[species], 0),
+            mem[level],
+            (mem[hp] << 8) | mem[hp + 1],
+            (mem[max_hp] << 8) | mem[max_hp + 1],
+            mem[t1],
+            mem[t2],
+            mem[status],
+        ))
+        values.extend(mem[moves:moves + 4])
+        values.extend(b & 0x3F for b in mem[pp:pp + 4])  # low 6 bits: current PP (high bits: PP ups)
+    return STATE_RECORD.pack(*values)
+
+
+def pack_command(request_id: str, action: int, choice: int) -> bytes:
+    return COMMAND_RECORD.pack(request_id.encode("ascii")[:16], action, choice, 0)
+
+
+def unpack_command(payload: bytes) -> Tuple[str, int, int]:
+    request_id, action, choice, _ = COMMAND_RECORD.unpack_from(payload, 0)
+    return request_id.rstrip(b"\0").decode("ascii", errors="ignore"), action, choice
+
+
+__all__ = [
+    "ShmRing",
+    "STATE_HEADER",
+    "POKEMON_RECORD",
+    "STATE_POKEMON",
+    "STATE_RECORD",
+    "COMMAND_RECORD",
+    "default_channel_dir",
+    "pack_state",
+    "unpack_state",
+    "pack_command",
+    "unpack_command",
+]
@@ -1,8 +1,147 @@
+"""Save-state files with rotating backups and an integrity header.
+
+Every state written by :class:`SaveStateManager` starts with a fixed
+:data:`HEADER` followed by the PyBoy payload::
+
+    magic "PKST" | header version u8 | codec u8 | reserved u16 |
+    crc32 u32 | payload size u64 | ROM digest (blake2b-128)
+
+The payload is compressed with the codec named in the header (see
+:mod:`game.core.state_codecs`); CRC and size are those of the stored
+bytes, so a file is verified before anything is decompressed.  Saving
+streams PyBoy's output through the compressor straight to the file.
+
+Loading reads a file once, checks size, CRC and ROM digest, and falls back
+to the newest backup that passes.  Files without the magic (written before
+the header existed, or by PyBoy directly) are loaded unverified.
+"""
+import hashlib
+import io
 import os
 import shutil
-from dataclasses import dataclass
+import struct
+import zlib
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from time import perf_counter
+from typing import List, Optional, Tuple
+
+from loguru import logger as _loguru_logger
+
+from game.core.state_codecs import RAW_CODEC, get_state_codec, state_codec_by_id
+from game.utils.metrics import REGISTRY
+
+STATE_MAGIC = b"PKST"
+STATE_HEADER_VERSION = 1
+HEADER = struct.Struct("<4sBBHIQ16s")
+ROM_DIGEST_BYTES = 16
+
+_VERIFY_SECONDS = REGISTRY.histogram(
+    "pkm_save_state_verify_seconds",
+    "Time to read and verify one save-state file",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025),
+)
+_REJECTED = REGISTRY.counter(
+    "pkm_save_state_rejected_total", "Save-state generations skipped on load", label_names=("reason",)
+)
+
+
+@dataclass(frozen=True, slots=True)
+class StateHeader:
+    codec: int
+    crc32: int
+    size: int
+    rom_digest: bytes
+    version: int = STATE_HEADER_VERSION
+
+    def pack(self) -> bytes:
+        return HEADER.pack(STATE_MAGIC, self.version, self.codec, 0, self.crc32, self.size, self.rom_digest)
+
+    @classmethod
+    def unpack(cls, buf) -> Optional["StateHeader"]:
+        """The header at the start of ``buf``, or ``None`` for a headerless (raw PyBoy) state."""
+        if len(buf) < HEADER.size or bytes(buf[:4]) != STATE_MAGIC:
+            return None
+        _, version, codec, _, crc, size, digest = HEADER.unpack_from(buf)
+        if version != STATE_HEADER_VERSION:
+            raise ValueError(f"Unsupported save-state header version {version}")
+        return cls(codec, crc, size, digest, version)
+
+
+def payload_offset(buf) -> int:
+    """Where the PyBoy payload starts in a state file's bytes."""
+    return HEADER.size if bytes(buf[:4]) == STATE_MAGIC else 0
+
+
+def split_state(data, rom_digest: Optional[bytes] = None) -> Tuple[Optional[StateHeader], memoryview]:
+    """
+    ``(header, payload)`` of a state file's bytes, raising :class:`ValueError`
+    when it is truncated, fails its checksum, or was saved from another ROM
+    (when ``rom_digest`` is given).
+    """
+    view = memoryview(data)
+    header = StateHeader.unpack(view)
+    if header is None:
+        if not view:
+            raise ValueError("empty")
+        return None, view
+    payload = view[HEADER.size:]
+    if len(payload) != header.size:
+        raise ValueError(f"truncated: {len(payload)} of {header.size} payload bytes")
+    if zlib.crc32(payload) != header.crc32:
+        raise ValueError("checksum mismatch")
+    if rom_digest is not None and header.rom_digest != rom_digest:
+        raise ValueError("saved from a different ROM")
+    return header, payload
+
+
+def decode_payload(data) -> bytes:
+    """The PyBoy state in a state file's bytes (header skipped, payload decompressed; not verified)."""
+    header = StateHeader.unpack(data)
+    if header is None:
+        return data
+    return state_codec_by_id(header.codec).decompress(memoryview(data)[HEADER.size:])
+
+
+class _StateWriter(io.RawIOBase):
+    """Compresses what it is given into ``fh``, tracking CRC and size of the stored bytes."""
+
+    def __init__(self, fh, compressor) -> None:
+        self.fh = fh
+        self.compressor = compressor
+        self.crc32 = 0
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._store(data if self.compressor is None else self.compressor.compress(data))
+        return len(data)
+
+    def finish(self) -> None:
+        if self.compressor is not None:
+            self._store(self.compressor.flush())
+
+    def _store(self, data) -> None:
+        if data:
+            self.fh.write(data)
+            self.crc32 = zlib.crc32(data, self.crc32)
+            self.size += len(data)
+
+
+def file_rom_digest(rom_path: str) -> bytes:
+    with open(rom_path, "rb") as fh:
+        return hashlib.blake2b(fh.read(), digest_size=ROM_DIGEST_BYTES).digest()
+
+
+def _reason(exc: ValueError) -> str:
+    message = str(exc)
+    for reason in ("truncated", "checksum", "ROM", "empty"):
+        if reason in message:
+            return reason.lower()
+    return "invalid"
+
 
 @dataclass(slots=True)
 class SaveStateManager:
@@ -18,6 +157,9 @@ class SaveStateManager:
     rom_path: str
     custom_state_path: Optional[str] = None
     max_backups: int = 5  # number of .bak_n files to keep (excluding .state)
+    codec: str = "raw"  # see game.core.state_codecs
+    level: Optional[int] = None  # codec default when None
+    _rom_digest: Optional[bytes] = field(default=None, init=False, repr=False)
 
     @property
     def path(self) -> Path:
@@ -26,18 +168,77 @@ class SaveStateManager:
             return Path(self.custom_state_path)
         return Path(f"{self.rom_path}.state")
 
+    @property
+    def rom_digest(self) -> bytes:
+        if self._rom_digest is None:
+            self._rom_digest = file_rom_digest(self.rom_path)
+        return self._rom_digest
+
     def _bak_path(self, n: int) -> Path:
         """Helper: build a safe backup file path like <rom>.state.bak_n."""
         return self.path.with_name(self.path.name + f".bak_{n}")
 
-    def load(self, emulator) -> bool:
-        """Load the latest state into the emulator, if it exists."""
-        state_path = self.path
-        if not state_path.exists():
-            return False
-        with state_path.open("rb") as fh:
-            emulator.load_state(fh)
-        return True
+    def generations(self) -> List[Path]:
+        """Existing state files, newest first (.state, .bak_1, ...)."""
+        candidates = [self.path] + [self._bak_path(n) for n in range(1, self.max_backups + 1)]
+        return [p for p in candidates if p.exists()]
+
+    def read_verified(self, path: Path) -> Tuple[Optional[StateHeader], memoryview]:
+        """Read ``path`` once and verify it (see :func:`split_state`)."""
+        started = perf_counter()
+        with path.open("rb") as fh:
+            data = fh.read()
+        result = split_state(data, self.rom_digest)
+        _VERIFY_SECONDS.observe(perf_counter() - started)
+        return result
+
+    def load(self, emulator, logger=_loguru_logger) -> Optional[Path]:
+        """Load the newest valid generation into the emulator; returns its path (``None`` if none)."""
+        for state_path in self.generations():
+            try:
+                header, payload = self.read_verified(state_path)
+            except ValueError as exc:
+                _REJECTED.labels(_reason(exc)).inc()
+                logger.warning("Skipping save state {}: {}", state_path, exc)
+                continue
+            except OSError as exc:
+                _REJECTED.labels("io").inc()
+                logger.warning("Skipping save state {}: {}", state_path, exc)
+                continue
+            try:
+                codec = RAW_CODEC if header is None else state_codec_by_id(header.codec)
+            except ValueError as exc:
+                _REJECTED.labels("codec").inc()
+                logger.warning("Skipping save state {}: {}", state_path, exc)
+                continue
+            try:
+                emulator.load_state(io.BytesIO(codec.decompress(payload)))
+            except Exception as exc:  # headerless files are only checked by PyBoy itself
+                _REJECTED.labels("load").inc()
+                logger.warning("Skipping save state {}: PyBoy could not load it ({})", state_path, exc)
+                continue
+            if header is None:
+                logger.info("Loaded unverified (headerless) save state {}", state_path)
+            return state_path
+        return None
+
+    def write_state(self, emulator, fh) -> StateHeader:
+        """Write header + (compressed) state of ``emulator`` to the seekable ``fh``."""
+        codec = get_state_codec(self.codec)
+        start = fh.tell()
+        fh.write(bytes(HEADER.size))
+        writer = _StateWriter(fh, codec.compressor(self.level))
+        # PyBoy writes one byte per call: coalesce them before the compressor
+        buffered = io.BufferedWriter(writer, buffer_size=1 << 16)
+        emulator.save_state(buffered)
+        buffered.flush()
+        writer.finish()
+        header = StateHeader(codec.id, writer.crc32, writer.size, self.rom_digest)
+        end = fh.tell()
+        fh.seek(start)
+        fh.write(header.pack())
+        fh.seek(end)
+        return header
 
     def save(self, emulator) -> None:
         """Save the current emulator state and rotate backups safely."""
@@ -65,7 +266,7 @@ class SaveStateManager:
         tmp_path = state_path.with_name(state_path.name + ".tmpwrite")
         try:
             with tmp_path.open("wb") as fh:
-                emulator.save_state(fh)
+                self.write_state(emulator, fh)
                 fh.flush()
                 os.fsync(fh.fileno())
             # Atomically replace the old .state with the new one
@@ -77,4 +278,15 @@ class SaveStateManager:
                     tmp_path.unlink()
                 except OSError:
                     pass
-__all__ = ["SaveStateManager"]
\ No newline at end of file
+
+
+__all__ = [
+    "HEADER",
+    "STATE_MAGIC",
+    "SaveStateManager",
+    "StateHeader",
+    "decode_payload",
+    "file_rom_digest",
+    "payload_offset",
+    "split_state",
+]
@@ -0,0 +1,300 @@
+"""SQLite catalog of save states, queryable without loading them.
+
+Each ``.state`` file gets one row in ``states`` (map, position, badges,
+battle type, party summary, frame count, wall time, content digest) and one
+row per party Pokémon in ``party``; the columns used by :meth:`find` are
+indexed.  Rows come from two places:
+
+* :meth:`StateCatalog.record`: metadata read from the live emulator at save
+  time (see :class:`~game.services.state_catalog_service.StateCatalogService`);
+* :meth:`StateCatalog.index_paths`: files parsed offline with
+  :mod:`game.offline.state_file`, skipped while their size, mtime and inode
+  are unchanged.  A file whose content was already catalogued under another
+  path (backup rotation) keeps the frame count and wall time of that row.
+
+Summaries that fail :func:`~game.offline.state_file.is_plausible` (RAM of an
+unknown layout) are stored with ``valid = 0``, so they are not parsed again,
+and never returned by :meth:`StateCatalog.find`.
+
+Query from the command line::
+
+    python -m game.core.state_catalog games/states.sqlite3 --index games --map 12 --battle-type 2 --top-level 20
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from game.offline.state_file import StateImage, decode_state, find_states
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS states (
+    path            TEXT PRIMARY KEY,
+    size            INTEGER NOT NULL,
+    mtime_ns        INTEGER NOT NULL,
+    inode           INTEGER NOT NULL,
+    digest          TEXT NOT NULL,
+    indexed_at      REAL NOT NULL,
+    saved_at        REAL,             -- wall time of the save (when recorded live)
+    frame           INTEGER,          -- emulator frame count at save time (when recorded live)
+    initialised     INTEGER NOT NULL,
+    valid           INTEGER NOT NULL DEFAULT 1,  -- 0: RAM did not decode (see is_plausible)
+    map             INTEGER,
+    x               INTEGER,
+    y               INTEGER,
+    badges          INTEGER,
+    badge_count     INTEGER,
+    battle_type     INTEGER,
+    party_count     INTEGER,
+    party_min_level INTEGER,
+    party_max_level INTEGER,
+    summary         TEXT NOT NULL     -- full decode as JSON
+);
+CREATE INDEX IF NOT EXISTS states_map ON states (map, battle_type);
+CREATE INDEX IF NOT EXISTS states_battle ON states (battle_type);
+CREATE INDEX IF NOT EXISTS states_level ON states (party_max_level);
+CREATE INDEX IF NOT EXISTS states_badges ON states (badge_count);
+CREATE INDEX IF NOT EXISTS states_digest ON states (digest);
+
+CREATE TABLE IF NOT EXISTS party (
+    path    TEXT NOT NULL REFERENCES states (path) ON DELETE CASCADE,
+    slot    INTEGER NOT NULL,
+    dex     INTEGER NOT NULL,
+    level   INTEGER NOT NULL,
+    hp      INTEGER NOT NULL,
+    max_hp  INTEGER NOT NULL,
+    PRIMARY KEY (path, slot)
+);
+CREATE INDEX IF NOT EXISTS party_dex ON party (dex, level);
+"""
+
+_STATE_COLUMNS = (
+    "path", "size", "mtime_ns", "inode", "digest", "indexed_at", "saved_at", "frame", "initialised",
+    "valid", "map", "x", "y", "badges", "badge_count", "battle_type", "party_count", "party_min_level",
+    "party_max_level", "summary",
+)
+_UPSERT_STATE = (
+    f"INSERT OR REPLACE INTO states ({', '.join(_STATE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_STATE_COLUMNS))})"
+)
+# PRAGMA user_version; 1: ``valid`` column, rows of older versions are re-parsed
+SCHEMA_VERSION = 1
+
+
+def file_digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class StateCatalog:
+    """Thread-safe wrapper around one SQLite connection."""
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(states)")}
+        with self._db:
+            if "valid" not in columns:
+                self._db.execute("ALTER TABLE states ADD COLUMN valid INTEGER NOT NULL DEFAULT 1")
+            # decoded before the plausibility check: make index_paths parse them again
+            self._db.execute("UPDATE states SET mtime_ns = -1")
+            self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def record(
+        self,
+        path: str,
+        summary: Dict[str, Any],
+        *,
+        data: Optional[bytes] = None,
+        frame: Optional[int] = None,
+        saved_at: Optional[float] = None,
+    ) -> None:
+        """Store ``summary`` (see :func:`~game.offline.state_file.decode_memory`) for ``path``."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        if data is None:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        self._upsert(path, stat, file_digest(data), summary, frame, saved_at)
+
+    def index_paths(self, paths: Iterable[str]) -> int:
+        """Parse and store every new or changed file; returns how many were (re)indexed."""
+        changed = []
+        for path in paths:
+            path = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+                if self._unchanged(path, stat):
+                    continue
+                with open(path, "rb") as fh:
+                    data = fh.read()
+                summary = decode_state(StateImage(data))
+            except (OSError, ValueError):
+                continue
+            digest = file_digest(data)
+            # look up before writing anything: rotation moves content between rows
+            changed.append((path, stat, digest, summary, *self._known_content(digest)))
+        for row in changed:
+            self._upsert(*row)
+        return len(changed)
+
+    def index_directory(self, root: str) -> int:
+        return self.index_paths(find_states(root))
+
+    def prune(self) -> int:
+        """Drop rows whose file no longer exists."""
+        with self._lock:
+            paths = [row[0] for row in self._db.execute("SELECT path FROM states")]
+            missing = [(p,) for p in paths if not os.path.exists(p)]
+            with self._db:
+                self._db.executemany("DELETE FROM states WHERE path = ?", missing)
+        return len(missing)
+
+    def _unchanged(self, path: str, stat: os.stat_result) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT size, mtime_ns, inode FROM states WHERE path = ?", (path,)).fetchone()
+        return row == (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+    def _known_content(self, digest: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT frame, saved_at FROM states WHERE digest = ? AND saved_at IS NOT NULL LIMIT 1", (digest,)
+            ).fetchone()
+        return row if row is not None else (None, None)
+
+    def _upsert(self, path, stat, digest, summary, frame, saved_at) -> None:
+        party = summary.get("party") or []
+        levels = [p["level"] for p in party]
+        values = (
+            path, stat.st_size, stat.st_mtime_ns, stat.st_ino, digest, time.time(), saved_at, frame,
+            int(summary.get("initialised", True)), int(summary.get("valid", True)),
+            summary.get("map"), summary.get("x"), summary.get("y"),
+            summary.get("badges"), summary.get("badge_count"), summary.get("battle_type"),
+            len(party), min(levels, default=None), max(levels, default=None),
+            json.dumps(summary, ensure_ascii=False),
+        )
+        rows = [(path, slot, p["dex"], p["level"], p["hp"], p["max_hp"]) for slot, p in enumerate(party, start=1)]
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM party WHERE path = ?", (path,))
+            self._db.execute(_UPSERT_STATE, values)
+            self._db.executemany("INSERT INTO party VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def find(
+        self,
+        *,
+        map: Optional[int] = None,
+        battle_type: Optional[int] = None,
+        in_battle: Optional[bool] = None,
+        min_badges: Optional[int] = None,
+        top_level: Optional[int] = None,
+        party_level: Optional[int] = None,
+        has_dex: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Paths matching every given criterion, most recent first.
+
+        ``top_level``: strongest party member at least this level;
+        ``party_level``: every party member at least this level;
+        ``has_dex``: a party member of this national dex number.
+        """
+        where: List[str] = ["initialised = 1", "valid = 1"]
+        args: List[Any] = []
+        for column, op, value in (
+            ("map", "=", map),
+            ("battle_type", "=", battle_type),
+            ("badge_count", ">=", min_badges),
+            ("party_max_level", ">=", top_level),
+            ("party_min_level", ">=", party_level),
+        ):
+            if value is not None:
+                where.append(f"{column} {op} ?")
+                args.append(value)
+        if in_battle is not None:
+            where.append("battle_type != 0" if in_battle else "battle_type = 0")
+        if has_dex is not None:
+            where.append("EXISTS (SELECT 1 FROM party p WHERE p.path = states.path AND p.dex = ?)")
+            args.append(has_dex)
+        sql = f"SELECT path FROM states WHERE {' AND '.join(where)} ORDER BY COALESCE(saved_at, indexed_at) DESC"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            return [row[0] for row in self._db.execute(sql, args)]
+
+    def summary(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT summary FROM states WHERE path = ?", (os.path.abspath(path),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM states").fetchone()[0]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("db", help="catalog database file")
+    parser.add_argument("--index", action="append", default=[], help="directory to (incrementally) index first")
+    parser.add_argument("--map", type=int)
+    parser.add_argument("--battle-type", type=int)
+    parser.add_argument("--in-battle", action="store_true", default=None)
+    parser.add_argument("--min-badges", type=int)
+    parser.add_argument("--top-level", type=int)
+    parser.add_argument("--party-level", type=int)
+    parser.add_argument("--dex", type=int)
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+
+    catalog = StateCatalog(args.db)
+    try:
+        for root in args.index:
+            started = time.perf_counter()
+            count = catalog.index_directory(root)
+            print(f"indexed {count} new/changed states under {root} in {time.perf_counter() - started:.3f}s")
+        started = time.perf_counter()
+        paths = catalog.find(
+            map=args.map, battle_type=args.battle_type, in_battle=args.in_battle, min_badges=args.min_badges,
+            top_level=args.top_level, party_level=args.party_level, has_dex=args.dex, limit=args.limit,
+        )
+        for path in paths:
+            print(path)
+        print(f"{len(paths)} of {len(catalog)} states in {(time.perf_counter() - started) * 1000:.2f} ms")
+    finally:
+        catalog.close()
+
+
+__all__ = ["StateCatalog", "SCHEMA", "SCHEMA_VERSION", "file_digest"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Compression codecs for save-state payloads.
+
+The codec ``id`` is stored in the save-state header (see
+:mod:`game.core.state`), so ids are permanent; names are what the
+configuration (``SAVE_STATE_CODEC``) uses.
+
+Available codecs:
+
+* ``raw``  (0) – uncompressed PyBoy state
+* ``zlib`` (1) – deflate, levels 1-9
+* ``gzip`` (2) – deflate with a gzip wrapper (``zcat``-able payload), levels 1-9
+* ``bz2``  (3) – levels 1-9
+* ``lzma`` (4) – xz container, presets 0-9
+* ``zstd`` (5) – only when the ``zstandard`` package is installed, levels 1-22
+"""
+from __future__ import annotations
+
+import bz2
+import lzma
+import zlib
+from typing import Any, Dict, Optional
+
+try:  # optional
+    import zstandard as _zstd
+except ImportError:  # pragma: no cover - depends on the environment
+    _zstd = None
+
+
+class StateCodec:
+    """Streaming compressor factory + one-shot decompressor for one format."""
+
+    name = "abstract"
+    id = -1
+    default_level: Optional[int] = None
+
+    def compressor(self, level: Optional[int] = None) -> Any:
+        """An object with ``compress(data) -> bytes`` and ``flush() -> bytes`` (``None`` = store as is)."""
+        raise NotImplementedError
+
+    def decompress(self, data) -> bytes:
+        raise NotImplementedError
+
+
+class RawCodec(StateCodec):
+    name, id = "raw", 0
+
+    def compressor(self, level: Optional[int] = None) -> Any:
+        return None
+
+    def decompress(self, data) -> bytes:
+        return data
+
+
+class ZlibStateCodec(StateCodec):
+    name, id, default_level = "zlib", 1, 6
+    wbits = zlib.MAX_WBITS
+
+    def compressor(self, level: Optional[int] = None) -> Any:
+        return zlib.compressobj(self.default_level if level is None else level, zlib.DEFLATED, self.wbits)
+
+    def decompress(self, data) -> bytes:
+        return zlib.decompress(data, self.wbits)
+
+
+class GzipStateCodec(ZlibStateCodec):
+    name, id = "gzip", 2
+    wbits = zlib.MAX_WBITS | 16
+
+
+class Bz2StateCodec(StateCodec):
+    name, id, default_level = "bz2", 3, 9
+
+    def compressor(self, level: Optional[int] = None) -> Any:
+        return bz2.BZ2Compressor(self.default_level if level is None else level)
+
+    def decompress(self, data) -> bytes:
+        return bz2.decompress(data)
+
+
+class LzmaStateCodec(StateCodec):
+    name, id, default_level = "lzma", 4, 6
+
+    def compressor(self, level: Optional[int] = None) -> Any:
+        return lzma.LZMACompressor(preset=self.default_level if level is None else level)
+
+    def decompress(self, data) -> bytes:
+        return lzma.decompress(data)
+
+
+class ZstdStateCodec(StateCodec):
+    name, id, default_level = "zstd", 5, 3
+
+    def compressor(self, level: Optional[int] = None) -> Any:
+        return _zstd.ZstdCompressor(level=self.default_level if level is None else level).compressobj()
+
+    def decompress(self, data) -> bytes:
+        return _zstd.ZstdDecompressor().decompressobj().decompress(data)
+
+
+RAW_CODEC = RawCodec()
+
+STATE_CODECS: Dict[str, StateCodec] = {
+    codec.name: codec
+    for codec in (RAW_CODEC, ZlibStateCodec(), GzipStateCodec(), Bz2StateCodec(), LzmaStateCodec())
+}
+if _zstd is not None:
+    STATE_CODECS["zstd"] = ZstdStateCodec()
+
+
+def get_state_codec(name: Optional[str]) -> StateCodec:
+    """Return the codec registered under ``name`` (``None``/empty -> raw)."""
+    if not name:
+        return RAW_CODEC
+    try:
+        return STATE_CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown save-state codec {name!r} (available: {', '.join(STATE_CODECS)})") from None
+
+
+def state_codec_by_id(codec_id: int) -> StateCodec:
+    for codec in STATE_CODECS.values():
+        if codec.id == codec_id:
+            return codec
+    raise ValueError(f"Unknown save-state codec id {codec_id}")
+
+
+def register_state_codec(codec: StateCodec) -> None:
+    STATE_CODECS[codec.name] = codec
+
+
+__all__ = [
+    "StateCodec",
+    "RawCodec",
+    "ZlibStateCodec",
+    "GzipStateCodec",
+    "Bz2StateCodec",
+    "LzmaStateCodec",
+    "ZstdStateCodec",
+    "RAW_CODEC",
+    "STATE_CODECS",
+    "get_state_codec",
+    "state_codec_by_id",
+    "register_state_codec",
+]
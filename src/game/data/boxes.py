@@ -0,0 +1,298 @@
+"""Bulk decoder for the 12 PC boxes (240 stored Pokémon + the current box).
+
+A box is stored as one 0x462 byte block, in WRAM for the current box
+(``MainPokemonData.CurrentBoxData``) and in cartridge RAM for all of them
+(``SavedPokemonData.Box1..Box12``, banks 2 and 3)::
+
+    count u8, species list (20 + 0xFF end), 20 x 33 byte box mons,
+    20 x 11 byte OT names, 20 x 11 byte nicknames
+
+Every box is read in one slice and all entries are decoded at once into a
+NumPy structured array (:data:`BOX_DTYPE`); :class:`PCBoxes` adds filtered
+queries on top::
+
+    boxes = read_boxes(session)
+    boxes.where(type="Water", max_level=30).top(3)
+"""
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from game.data.data import POKDX_ID_TO_NAME, POKEMON_ROM_ID_TO_PKDX_ID, POKEMON_TYPES
+from game.data.decoder import decode_pkm_name
+from game.data.ram_reader import MainPokemonData, MemoryData, SavedPokemonData
+
+NUM_BOXES = 12
+BOX_CAPACITY = 20
+BOX_BYTES = 0x462
+BOX_MON_BYTES = 33
+NAME_BYTES = 11
+
+_MONS_AT = 1 + BOX_CAPACITY + 1
+_OT_NAMES_AT = _MONS_AT + BOX_CAPACITY * BOX_MON_BYTES
+_NICKNAMES_AT = _OT_NAMES_AT + BOX_CAPACITY * NAME_BYTES
+assert _NICKNAMES_AT + BOX_CAPACITY * NAME_BYTES == BOX_BYTES
+
+# In-RAM layout of one box mon (big-endian words)
+BOX_MON_RAW = np.dtype([
+    ("species", "u1"),
+    ("hp", ">u2"),
+    ("level", "u1"),
+    ("status", "u1"),
+    ("type1", "u1"),
+    ("type2", "u1"),
+    ("catch_rate", "u1"),
+    ("moves", "u1", (4,)),
+    ("ot_id", ">u2"),
+    ("exp", "u1", (3,)),
+    ("stat_exp", ">u2", (5,)),
+    ("dvs", "u1", (2,)),
+    ("pp", "u1", (4,)),
+])
+assert BOX_MON_RAW.itemsize == BOX_MON_BYTES
+
+# Decoded columns, one row per stored Pokémon
+BOX_DTYPE = np.dtype([
+    ("box", "u1"),          # 0-based box number
+    ("slot", "u1"),         # 0-based slot in the box
+    ("species", "u1"),      # ROM species id
+    ("dex", "u2"),          # national dex number
+    ("nickname", "U20"),
+    ("ot_name", "U20"),
+    ("ot_id", "u2"),
+    ("level", "u1"),
+    ("hp", "u2"),
+    ("status", "u1"),
+    ("type1", "u1"),
+    ("type2", "u1"),
+    ("moves", "u1", (4,)),
+    ("pp", "u1", (4,)),     # current PP (low 6 bits)
+    ("pp_ups", "u1", (4,)),
+    ("exp", "u4"),
+    ("stat_exp", "u2", (5,)),  # hp, attack, defense, speed, special
+    ("dv_attack", "u1"),
+    ("dv_defense", "u1"),
+    ("dv_speed", "u1"),
+    ("dv_special", "u1"),
+    ("dv_hp", "u1"),
+    ("dv_total", "u1"),
+])
+
+_DEX = np.array([POKEMON_ROM_ID_TO_PKDX_ID.get(i, 0) for i in range(256)], dtype=np.uint16)
+_TYPE_IDS = {name.lower(): type_id for type_id, name in POKEMON_TYPES.items()}
+
+# SRAM boxes 1-6 in bank 2, 7-12 in bank 3 (same addresses in both banks)
+SRAM_BOXES: Tuple[Tuple[int, MemoryData], ...] = tuple(
+    (2 + i // 6, getattr(SavedPokemonData, f"Box{i + 1}")) for i in range(NUM_BOXES)
+)
+SRAM_BANK_BYTES = 0x2000
+SRAM_CURRENT_BOX_BANK = 1
+
+# wCurrentBoxNum is part of the main data block, which the game saves verbatim to bank 1
+_WRAM_MAIN_DATA = MainPokemonData.PokedexOwned.start_address
+SRAM_CURRENT_BOX_NUMBER = MemoryData(
+    SavedPokemonData.MainData.start_address + MainPokemonData.CurrentBoxNumber.start_address - _WRAM_MAIN_DATA,
+    SavedPokemonData.MainData.start_address + MainPokemonData.CurrentBoxNumber.start_address - _WRAM_MAIN_DATA,
+    "Saved current PC box number",
+)
+
+BOXES_INITIALISED = 0x80
+
+
+# ----------------------------------------------------------------------
+# Decoding
+# ----------------------------------------------------------------------
+def decode_boxes(raw_boxes: Sequence[bytes], box_numbers: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Decode ``BOX_BYTES`` blocks into one :data:`BOX_DTYPE` array.
+
+    ``box_numbers`` gives the 0-based box of each block (defaults to its
+    index).  Blocks with an invalid count (uninitialised SRAM) are empty.
+    """
+    if box_numbers is None:
+        box_numbers = range(len(raw_boxes))
+    if not raw_boxes:
+        return np.zeros(0, dtype=BOX_DTYPE)
+    blocks = np.frombuffer(b"".join(bytes(raw[:BOX_BYTES]) for raw in raw_boxes), dtype=np.uint8)
+    blocks = blocks.reshape(len(raw_boxes), BOX_BYTES)
+
+    counts = blocks[:, 0].astype(np.intp)
+    counts[counts > BOX_CAPACITY] = 0
+    used = np.arange(BOX_CAPACITY) < counts[:, None]  # (boxes, 20)
+    box_index, slot = np.nonzero(used)
+
+    mons = np.ascontiguousarray(blocks[:, _MONS_AT:_OT_NAMES_AT]).view(BOX_MON_RAW)[used]
+    out = np.zeros(len(mons), dtype=BOX_DTYPE)
+    out["box"] = np.asarray(box_numbers, dtype=np.uint8)[box_index]
+    out["slot"] = slot
+    out["species"] = mons["species"]
+    out["dex"] = _DEX[mons["species"]]
+    for field in ("ot_id", "level", "hp", "status", "type1", "type2", "moves", "stat_exp"):
+        out[field] = mons[field]
+    out["pp"] = mons["pp"] & 0x3F
+    out["pp_ups"] = mons["pp"] >> 6
+    exp = mons["exp"].astype(np.uint32)
+    out["exp"] = (exp[:, 0] << 16) | (exp[:, 1] << 8) | exp[:, 2]
+
+    dvs = mons["dvs"]
+    attack, defense = dvs[:, 0] >> 4, dvs[:, 0] & 0x0F
+    speed, special = dvs[:, 1] >> 4, dvs[:, 1] & 0x0F
+    hp = ((attack & 1) << 3) | ((defense & 1) << 2) | ((speed & 1) << 1) | (special & 1)
+    out["dv_attack"], out["dv_defense"], out["dv_speed"], out["dv_special"], out["dv_hp"] = (
+        attack, defense, speed, special, hp
+    )
+    out["dv_total"] = attack + defense + speed + special + hp
+
+    # names go through the decoded-name cache (mostly the same few strings)
+    names = blocks[:, _OT_NAMES_AT:].reshape(len(raw_boxes), 2, BOX_CAPACITY, NAME_BYTES)[box_index, :, slot]
+    out["ot_name"] = [decode_pkm_name(name.tobytes()) for name in names[:, 0]]
+    out["nickname"] = [decode_pkm_name(name.tobytes()) for name in names[:, 1]]
+    return out
+
+
+def sram_slice(sram, bank: int, md: MemoryData) -> bytes:
+    """Bytes of the SRAM region ``md`` (0xA000-0xBFFF) of ``bank`` in a flat 32 KiB image."""
+    start = bank * SRAM_BANK_BYTES + md.start_address - 0xA000
+    return bytes(sram[start:start + md.size()])
+
+
+def read_sram_boxes(sram) -> "PCBoxes":
+    """
+    Decode all boxes from a 32 KiB SRAM image (``.ram`` file, ``bytes`` or
+    ``mmap``).  The current box comes from its bank 1 copy, which the game
+    keeps up to date, instead of its (possibly stale) bank 2/3 slot.
+    """
+    number = sram_slice(sram, SRAM_CURRENT_BOX_BANK, SRAM_CURRENT_BOX_NUMBER)[0]
+    current = sram_slice(sram, SRAM_CURRENT_BOX_BANK, SavedPokemonData.CurrentBoxData)
+    return _assemble(number, current, lambda bank, md: sram_slice(sram, bank, md))
+
+
+def read_boxes(session) -> "PCBoxes":
+    """Decode all boxes from a running :class:`~game.core.emulator.EmulatorSession` (WRAM + SRAM)."""
+    number = session.read_memory(MainPokemonData.CurrentBoxNumber)[0]
+    current = session.read_memory(MainPokemonData.CurrentBoxData)
+    return _assemble(number, current, session.read_sram)
+
+
+def _assemble(number: int, current: bytes, read_sram) -> "PCBoxes":
+    current_box = number & ~BOXES_INITIALISED
+    raw_boxes: List[bytes] = []
+    box_numbers: List[int] = []
+    for box, (bank, md) in enumerate(SRAM_BOXES):
+        if box == current_box:
+            raw_boxes.append(current)
+        elif number & BOXES_INITIALISED:
+            raw_boxes.append(read_sram(bank, md))
+        else:
+            continue  # other boxes are not formatted until the player first changes box
+        box_numbers.append(box)
+    return PCBoxes(decode_boxes(raw_boxes, box_numbers))
+
+
+# ----------------------------------------------------------------------
+# Queries
+# ----------------------------------------------------------------------
+def _type_id(value: Union[int, str]) -> int:
+    if isinstance(value, str):
+        try:
+            return _TYPE_IDS[value.lower()]
+        except KeyError:
+            raise ValueError(f"Unknown type {value!r}") from None
+    return value
+
+
+class PCBoxes:
+    """Columnar view of stored Pokémon (``mons`` is a :data:`BOX_DTYPE` array)."""
+
+    def __init__(self, mons: np.ndarray):
+        self.mons = mons
+
+    def __len__(self) -> int:
+        return len(self.mons)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.mons[field]
+
+    def where(
+        self,
+        *,
+        type: Optional[Union[int, str]] = None,
+        species: Optional[Iterable[int]] = None,
+        dex: Optional[Iterable[int]] = None,
+        min_level: Optional[int] = None,
+        max_level: Optional[int] = None,
+        box: Optional[int] = None,
+        move: Optional[int] = None,
+    ) -> "PCBoxes":
+        """Rows matching every given criterion (``type`` matches either type slot, by id or name)."""
+        mons = self.mons
+        mask = np.ones(len(mons), dtype=bool)
+        if type is not None:
+            type_id = _type_id(type)
+            mask &= (mons["type1"] == type_id) | (mons["type2"] == type_id)
+        if species is not None:
+            mask &= np.isin(mons["species"], list(species))
+        if dex is not None:
+            mask &= np.isin(mons["dex"], list(dex))
+        if min_level is not None:
+            mask &= mons["level"] >= min_level
+        if max_level is not None:
+            mask &= mons["level"] <= max_level
+        if box is not None:
+            mask &= mons["box"] == box
+        if move is not None:
+            mask &= (mons["moves"] == move).any(axis=1)
+        return PCBoxes(mons[mask])
+
+    def top(self, n: int = 1, by: Sequence[str] = ("level", "dv_total")) -> "PCBoxes":
+        """The ``n`` best rows, sorted descending on ``by`` (first key first)."""
+        if not len(self.mons):
+            return self
+        order = np.lexsort(tuple(self.mons[key] for key in reversed(by)))[::-1]
+        return PCBoxes(self.mons[order[:n]])
+
+    def to_records(self) -> List[dict]:
+        records = []
+        for row in self.mons:
+            dex = int(row["dex"])
+            records.append({
+                "box": int(row["box"]) + 1,
+                "slot": int(row["slot"]) + 1,
+                "pokedex_id": dex,
+                "name": POKDX_ID_TO_NAME.get(dex, {"en": "Unknown"}).get("en", "Unknown"),
+                "nickname": str(row["nickname"]),
+                "ot_name": str(row["ot_name"]),
+                "level": int(row["level"]),
+                "hp": int(row["hp"]),
+                "types": [
+                    POKEMON_TYPES.get(int(row["type1"]), "Unknown"),
+                    POKEMON_TYPES.get(int(row["type2"]), "Unknown"),
+                ],
+                "moves": [int(m) for m in row["moves"]],
+                "dvs": {
+                    "attack": int(row["dv_attack"]),
+                    "defense": int(row["dv_defense"]),
+                    "speed": int(row["dv_speed"]),
+                    "special": int(row["dv_special"]),
+                    "hp": int(row["dv_hp"]),
+                },
+            })
+        return records
+
+
+__all__ = [
+    "BOX_BYTES",
+    "BOX_DTYPE",
+    "BOX_MON_RAW",
+    "NUM_BOXES",
+    "PCBoxes",
+    "SRAM_BOXES",
+    "decode_boxes",
+    "read_boxes",
+    "read_sram_boxes",
+    "sram_slice",
+    "SRAM_BANK_BYTES",
+    "SRAM_CURRENT_BOX_NUMBER",
+]
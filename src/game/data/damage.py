@@ -0,0 +1,328 @@
+"""Vectorised Gen 1 damage calculator.
+
+:func:`damage_table` evaluates every move of an attacker against every
+target in one NumPy pass and keeps the whole distribution: for each
+(move, target) the 39 random rolls (217..255) without and with a critical
+hit.  The formula follows Red/Blue::
+
+    d = min(((2L/5 + 2) * Power * A / D) / 50, 997) + 2     (L doubled on a crit)
+    d += d/2                                                (STAB)
+    d = d * eff / 10, per matching type-chart entry, in chart order
+    d = d * r / 255, r in 217..255                          (unless d == 1)
+
+with Attack/Defense for physical types and Special/Special for special
+ones (type id >= 20), both divided by 4 when either exceeds 255.  Fixed
+damage (Sonic Boom, Dragon Rage, Seismic Toss, Night Shade, Psywave),
+Super Fang, OHKO moves, Explosion's halved Defense and multi-hit moves are
+handled; stat stages, Reflect/Light Screen and accuracy/evasion stages are
+not (battle stats read from RAM already include burn/paralysis drops).
+
+Critical hits use stats as given (the game uses unmodified stats); their
+chance comes from the attacker's *base* Speed (see :func:`crit_chances`).
+
+    table = damage_table(attacker, MoveArrays.from_rows(move_rows), targets)
+    table.expected      # (moves, targets) expected damage, capped at target HP
+    table.ko_chance     # (moves, targets)
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from game.data.data import TYPE_CHART
+from game.data.ram_reader import MainPokemonData, MoveROMBank
+from game.data.rom_tables import type_matrices
+
+ROLLS = np.arange(217, 256, dtype=np.int64)
+NUM_ROLLS = len(ROLLS)
+SPECIAL_TYPE_MIN = 20  # Fire and above use Special
+
+# move effects (FUNCTION_CODE_EFFECT)
+EFFECT_EXPLODE = 0x07
+EFFECT_SWIFT = 0x11
+EFFECT_MULTI_HIT = 0x1D
+EFFECT_MULTI_HIT_ALT = 0x1E
+EFFECT_OHKO = 0x26
+EFFECT_SUPER_FANG = 0x28
+EFFECT_FIXED_DAMAGE = 0x29
+EFFECT_DOUBLE_HIT = 0x2C
+EFFECT_TWINEEDLE = 0x4D
+
+# move ids
+SONICBOOM, SEISMIC_TOSS, DRAGON_RAGE, NIGHT_SHADE, PSYWAVE = 49, 69, 82, 101, 149
+HIGH_CRIT_MOVES = (2, 75, 152, 163)  # Karate Chop, Razor Leaf, Crabhammer, Slash
+
+# number of hits -> probability
+_HITS_ONCE = ((1, 1.0),)
+_HITS_TWICE = ((2, 1.0),)
+_HITS_2_TO_5 = ((2, 3 / 8), (3, 3 / 8), (4, 1 / 8), (5, 1 / 8))
+
+
+# ----------------------------------------------------------------------
+# Type chart
+# ----------------------------------------------------------------------
+_BUILTIN_MATRICES: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+
+def default_type_matrices() -> Tuple[np.ndarray, np.ndarray]:
+    """The ROM's chart as read by :class:`MoveROMBank`, else :data:`~game.data.data.TYPE_CHART`."""
+    global _BUILTIN_MATRICES
+    bank = MoveROMBank._instance
+    if bank is not None:
+        return bank.type_effectiveness, bank.type_order
+    if _BUILTIN_MATRICES is None:
+        _BUILTIN_MATRICES = type_matrices(TYPE_CHART)
+    return _BUILTIN_MATRICES
+
+
+# ----------------------------------------------------------------------
+# Inputs
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class Combatant:
+    """Battle stats of one or several Pokémon (scalars or equal-length arrays)."""
+
+    level: np.ndarray
+    hp: np.ndarray
+    attack: np.ndarray
+    defense: np.ndarray
+    speed: np.ndarray
+    special: np.ndarray
+    type1: np.ndarray
+    type2: np.ndarray
+    base_speed: Optional[np.ndarray] = None  # for the crit chance; None = no crits expected
+
+    @classmethod
+    def of(cls, **fields) -> "Combatant":
+        return cls(**{k: (None if v is None else np.asarray(v, dtype=np.int64)) for k, v in fields.items()})
+
+
+@dataclass(frozen=True)
+class MoveArrays:
+    """Move data, shape (M,), as stored in the ROM move table."""
+
+    move_id: np.ndarray
+    effect: np.ndarray
+    power: np.ndarray
+    type: np.ndarray
+    accuracy: np.ndarray  # 0..255
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[int]]) -> "MoveArrays":
+        """From ROM rows ``[id, effect, power, type, accuracy, pp]`` (see :meth:`MoveROMBank.get_move_bytes`)."""
+        table = np.asarray([list(r[:5]) for r in rows], dtype=np.int64).reshape(-1, 5)
+        return cls(*(table[:, i] for i in range(5)))
+
+    @classmethod
+    def from_ids(cls, move_ids: Sequence[int]) -> "MoveArrays":
+        bank = MoveROMBank()
+        return cls.from_rows([bank.get_move_bytes(i) if i else [0] * 6 for i in move_ids])
+
+
+def _any_of(values: np.ndarray, options: Sequence[int]) -> np.ndarray:
+    # np.isin is slow for a handful of constants
+    out = values == options[0]
+    for option in options[1:]:
+        out = out | (values == option)
+    return out
+
+
+def crit_chances(base_speed, move_ids) -> np.ndarray:
+    """Critical-hit probability per move: base Speed / 2 / 256, x8 (max 255/256) for high-crit moves."""
+    threshold = np.asarray(base_speed, dtype=np.int64) // 2
+    high = _any_of(np.asarray(move_ids), HIGH_CRIT_MOVES)
+    return np.where(high, np.minimum(threshold * 8, 255), threshold) / 256.0
+
+
+# ----------------------------------------------------------------------
+# Calculator
+# ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class DamageTable:
+    rolls: np.ndarray        # (M, N, 2, 39) damage per hit: [.., 0, :] normal, [.., 1, :] critical
+    accuracy: np.ndarray     # (M,) hit probability
+    crit_chance: np.ndarray  # (M,)
+    hit_counts: Tuple[Tuple[Tuple[int, float], ...], ...]  # per move: ((hits, probability), ...)
+    target_hp: np.ndarray    # (N,)
+
+    @property
+    def min_damage(self) -> np.ndarray:
+        hits = np.array([min(h for h, _ in hc) for hc in self.hit_counts])
+        return self.rolls[:, :, 0, 0] * hits[:, None]
+
+    @property
+    def max_damage(self) -> np.ndarray:
+        hits = np.array([max(h for h, _ in hc) for hc in self.hit_counts])
+        return self.rolls[:, :, 1, -1] * hits[:, None]
+
+    def _outcomes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(expected damage capped at HP, KO probability), both (M, N)."""
+        hp = self.target_hp[None, :, None, None]
+        weights = np.stack([1.0 - self.crit_chance, self.crit_chance], axis=-1)[:, None, :]  # (M, 1, 2)
+        expected = np.zeros(self.rolls.shape[:2])
+        ko = np.zeros(self.rolls.shape[:2])
+        for hits in sorted({h for hc in self.hit_counts for h, _ in hc}):
+            p = np.array([dict(hc).get(hits, 0.0) for hc in self.hit_counts])[:, None]  # (M, 1)
+            total = self.rolls * hits
+            capped = np.minimum(total, hp).mean(axis=-1)            # (M, N, 2)
+            kills = (total >= hp).mean(axis=-1)
+            expected += p * (capped * weights).sum(axis=-1)
+            ko += p * (kills * weights).sum(axis=-1)
+        acc = self.accuracy[:, None]
+        return expected * acc, ko * acc
+
+    @property
+    def expected(self) -> np.ndarray:
+        return self._outcomes()[0]
+
+    @property
+    def ko_chance(self) -> np.ndarray:
+        return self._outcomes()[1]
+
+
+def damage_table(
+    attacker: Combatant,
+    moves: MoveArrays,
+    targets: Combatant,
+    *,
+    matrices: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    crit_chance: Optional[np.ndarray] = None,
+) -> DamageTable:
+    """
+    Damage of each move of ``attacker`` (scalar fields) against each of
+    ``targets`` (shape (N,) fields).  ``matrices`` defaults to
+    :func:`default_type_matrices` (see :func:`~game.data.rom_tables.type_matrices`).
+    """
+    eff, order = matrices if matrices is not None else default_type_matrices()
+    n = np.broadcast(targets.level, targets.hp).shape or (1,)
+    t = {f: np.broadcast_to(getattr(targets, f), n)[None, :] for f in
+         ("level", "hp", "defense", "special", "speed", "type1", "type2")}
+    move_id, effect = moves.move_id[:, None], moves.effect[:, None]
+    power, mtype = moves.power[:, None], moves.type[:, None]
+
+    # --- stats (M, N) -------------------------------------------------
+    special = mtype >= SPECIAL_TYPE_MIN
+    a = np.where(special, attacker.special, attacker.attack) + np.zeros_like(t["defense"])
+    d = np.where(special, t["special"], t["defense"])
+    d = np.where(effect == EFFECT_EXPLODE, d // 2, d)
+    big = (a > 255) | (d > 255)
+    a = np.where(big, a // 4, a)
+    d = np.maximum(np.where(big, d // 4, d), 1)
+
+    # --- base damage (M, N, 2): normal / critical ----------------------
+    level = attacker.level * np.array([1, 2])
+    base = ((2 * level // 5 + 2) * (power * a)[..., None]) // d[..., None] // 50
+    base = np.minimum(base, 997) + 2
+    stab = (mtype == attacker.type1) | (mtype == attacker.type2)
+    base = base + np.where(stab[..., None], base // 2, 0)
+
+    # --- type effectiveness, in chart order -----------------------------
+    e1, e2 = eff[mtype, t["type1"]], eff[mtype, t["type2"]]
+    e2 = np.where(t["type2"] == t["type1"], 10, e2)
+    first_is_1 = order[mtype, t["type1"]] <= order[mtype, t["type2"]]
+    first, second = np.where(first_is_1, e1, e2), np.where(first_is_1, e2, e1)
+    base = base * first[..., None] // 10
+    base = base * second[..., None] // 10
+    immune = (e1 == 0) | (e2 == 0)
+    base = np.where((power <= 0)[..., None], 0, base)
+
+    # --- random roll (M, N, 2, 39) --------------------------------------
+    rolls = np.where((base > 1)[..., None], base[..., None] * ROLLS // 255, base[..., None])
+
+    # --- special-cased effects -------------------------------------------
+    fixed = np.select(
+        [move_id == SONICBOOM, move_id == DRAGON_RAGE, _any_of(move_id, (SEISMIC_TOSS, NIGHT_SHADE))],
+        [20, 40, attacker.level],
+        default=0,
+    ) + np.zeros_like(t["hp"])
+    fixed = np.where(effect == EFFECT_SUPER_FANG, np.maximum(t["hp"] // 2, 1), fixed)
+    fixed = np.where(
+        (effect == EFFECT_OHKO) & (attacker.speed >= t["speed"]) & ~immune, t["hp"], fixed
+    )
+    is_fixed = _any_of(effect, (EFFECT_FIXED_DAMAGE, EFFECT_SUPER_FANG, EFFECT_OHKO))
+    rolls = np.where(is_fixed[..., None, None], fixed[..., None, None], rolls)
+    if (moves.move_id == PSYWAVE).any():
+        # uniform 1 .. 1.5 * level - 1, spread over the roll axis
+        psywave_max = max(int(np.max(attacker.level) * 3 // 2) - 1, 1)
+        psywave = np.round(np.linspace(1, psywave_max, NUM_ROLLS)).astype(np.int64)
+        rolls = np.where((move_id == PSYWAVE)[..., None, None], psywave, rolls)
+
+    # --- per-move probabilities ------------------------------------------
+    accuracy = np.where(moves.effect == EFFECT_SWIFT, 1.0, moves.accuracy / 256.0)
+    accuracy = np.where(moves.power > 0, accuracy, 0.0)
+    if crit_chance is None:
+        crit_chance = (
+            np.zeros(len(moves.move_id)) if attacker.base_speed is None
+            else crit_chances(attacker.base_speed, moves.move_id)
+        )
+    crit_chance = np.where(is_fixed[:, 0] | (moves.move_id == PSYWAVE), 0.0, crit_chance)
+    hit_counts = tuple(
+        _HITS_2_TO_5 if e in (EFFECT_MULTI_HIT, EFFECT_MULTI_HIT_ALT)
+        else _HITS_TWICE if e in (EFFECT_DOUBLE_HIT, EFFECT_TWINEEDLE)
+        else _HITS_ONCE
+        for e in moves.effect.tolist()
+    )
+    return DamageTable(
+        rolls.astype(np.int32), accuracy, np.asarray(crit_chance, dtype=float), hit_counts, t["hp"][0]
+    )
+
+
+# ----------------------------------------------------------------------
+# Live battle
+# ----------------------------------------------------------------------
+def _u8(session, md) -> int:
+    return session.read_memory(md)[0]
+
+
+def _u16(session, md) -> int:
+    hi, lo = session.read_memory(md)[:2]
+    return (hi << 8) | lo
+
+
+def battle_combatants(session) -> Tuple[Combatant, np.ndarray, Combatant, np.ndarray]:
+    """``(player, player_move_ids, enemy, enemy_move_ids)`` of the battle in RAM."""
+    M = MainPokemonData
+    enemy_base = session.read_memory(M.EnemyBaseStats)
+    player = Combatant.of(
+        level=_u8(session, M.PlayerLevel), hp=_u16(session, M.PlayerCurrentHP),
+        attack=_u16(session, M.PlayerAttack), defense=_u16(session, M.PlayerDefense),
+        speed=_u16(session, M.PlayerSpeed), special=_u16(session, M.PlayerSpecial),
+        type1=_u8(session, M.PlayerType1), type2=_u8(session, M.PlayerType2),
+    )
+    enemy = Combatant.of(
+        level=_u8(session, M.EnemyLevel2), hp=_u16(session, M.EnemyHP),
+        attack=_u16(session, M.EnemyAttack), defense=_u16(session, M.EnemyDefense),
+        speed=_u16(session, M.EnemySpeed), special=_u16(session, M.EnemySpecial),
+        type1=_u8(session, M.EnemyType1), type2=_u8(session, M.EnemyType2),
+        base_speed=enemy_base[3],
+    )
+    player_moves = np.array([_u8(session, getattr(M, f"PlayerMove{i}")) for i in range(1, 5)])
+    enemy_moves = np.array([_u8(session, getattr(M, f"EnemyMove{i}")) for i in range(1, 5)])
+    return player, player_moves, enemy, enemy_moves
+
+
+def battle_damage(session, *, player_base_speed: Optional[int] = None) -> Tuple[DamageTable, DamageTable]:
+    """``(player moves vs enemy, enemy moves vs player)`` for the battle in RAM (empty slots deal 0)."""
+    player, player_moves, enemy, enemy_moves = battle_combatants(session)
+    if player_base_speed is not None:
+        player = Combatant(**{**player.__dict__, "base_speed": np.int64(player_base_speed)})
+    return (
+        damage_table(player, MoveArrays.from_ids(player_moves.tolist()), enemy),
+        damage_table(enemy, MoveArrays.from_ids(enemy_moves.tolist()), player),
+    )
+
+
+__all__ = [
+    "Combatant",
+    "DamageTable",
+    "MoveArrays",
+    "ROLLS",
+    "battle_combatants",
+    "battle_damage",
+    "crit_chances",
+    "damage_table",
+    "default_type_matrices",
+    "type_matrices",
+]
@@ -22,6 +22,94 @@ POKEMON_TYPES = {
     26: "Dragon"
 }
 
+# Gen 1 type chart, in ROM order: (attacking type, defending type, multiplier x10).
+# Pairs not listed are neutral (10).  The game applies matching entries in this
+# order, truncating after each one.  Used when the chart is not read from ROM.
+TYPE_CHART = [
+    (0x15, 0x14, 20),  # Water -> Fire
+    (0x14, 0x16, 20),  # Fire -> Grass
+    (0x14, 0x19, 20),  # Fire -> Ice
+    (0x16, 0x15, 20),  # Grass -> Water
+    (0x17, 0x15, 20),  # Electric -> Water
+    (0x15, 0x05, 20),  # Water -> Rock
+    (0x04, 0x02,  0),  # Ground -> Flying
+    (0x15, 0x15,  5),  # Water -> Water
+    (0x14, 0x14,  5),  # Fire -> Fire
+    (0x17, 0x17,  5),  # Electric -> Electric
+    (0x19, 0x19,  5),  # Ice -> Ice
+    (0x16, 0x16,  5),  # Grass -> Grass
+    (0x18, 0x18,  5),  # Psychic -> Psychic
+    (0x14, 0x15,  5),  # Fire -> Water
+    (0x16, 0x14,  5),  # Grass -> Fire
+    (0x15, 0x16,  5),  # Water -> Grass
+    (0x17, 0x16,  5),  # Electric -> Grass
+    (0x00, 0x05,  5),  # Normal -> Rock
+    (0x00, 0x08,  0),  # Normal -> Ghost
+    (0x08, 0x08, 20),  # Ghost -> Ghost
+    (0x14, 0x07, 20),  # Fire -> Bug
+    (0x14, 0x05,  5),  # Fire -> Rock
+    (0x15, 0x04, 20),  # Water -> Ground
+    (0x17, 0x04,  0),  # Electric -> Ground
+    (0x17, 0x02, 20),  # Electric -> Flying
+    (0x16, 0x04, 20),  # Grass -> Ground
+    (0x16, 0x07,  5),  # Grass -> Bug
+    (0x16, 0x03,  5),  # Grass -> Poison
+    (0x16, 0x05, 20),  # Grass -> Rock
+    (0x16, 0x02,  5),  # Grass -> Flying
+    (0x19, 0x15,  5),  # Ice -> Water
+    (0x19, 0x16, 20),  # Ice -> Grass
+    (0x19, 0x04, 20),  # Ice -> Ground
+    (0x19, 0x02, 20),  # Ice -> Flying
+    (0x01, 0x00, 20),  # Fighting -> Normal
+    (0x01, 0x03,  5),  # Fighting -> Poison
+    (0x01, 0x02,  5),  # Fighting -> Flying
+    (0x01, 0x18,  5),  # Fighting -> Psychic
+    (0x01, 0x07,  5),  # Fighting -> Bug
+    (0x01, 0x05, 20),  # Fighting -> Rock
+    (0x01, 0x19, 20),  # Fighting -> Ice
+    (0x01, 0x08,  0),  # Fighting -> Ghost
+    (0x03, 0x16, 20),  # Poison -> Grass
+    (0x03, 0x03,  5),  # Poison -> Poison
+    (0x03, 0x04,  5),  # Poison -> Ground
+    (0x03, 0x07, 20),  # Poison -> Bug
+    (0x03, 0x05,  5),  # Poison -> Rock
+    (0x03, 0x08,  5),  # Poison -> Ghost
+    (0x04, 0x14, 20),  # Ground -> Fire
+    (0x04, 0x17, 20),  # Ground -> Electric
+    (0x04, 0x16,  5),  # Ground -> Grass
+    (0x04, 0x07,  5),  # Ground -> Bug
+    (0x04, 0x05, 20),  # Ground -> Rock
+    (0x04, 0x03, 20),  # Ground -> Poison
+    (0x02, 0x17,  5),  # Flying -> Electric
+    (0x02, 0x01, 20),  # Flying -> Fighting
+    (0x02, 0x07, 20),  # Flying -> Bug
+    (0x02, 0x16, 20),  # Flying -> Grass
+    (0x02, 0x05,  5),  # Flying -> Rock
+    (0x18, 0x01, 20),  # Psychic -> Fighting
+    (0x18, 0x03, 20),  # Psychic -> Poison
+    (0x07, 0x14,  5),  # Bug -> Fire
+    (0x07, 0x16, 20),  # Bug -> Grass
+    (0x07, 0x01,  5),  # Bug -> Fighting
+    (0x07, 0x02,  5),  # Bug -> Flying
+    (0x07, 0x18, 20),  # Bug -> Psychic
+    (0x07, 0x08,  5),  # Bug -> Ghost
+    (0x07, 0x03, 20),  # Bug -> Poison
+    (0x05, 0x14, 20),  # Rock -> Fire
+    (0x05, 0x01,  5),  # Rock -> Fighting
+    (0x05, 0x04,  5),  # Rock -> Ground
+    (0x05, 0x02, 20),  # Rock -> Flying
+    (0x05, 0x07, 20),  # Rock -> Bug
+    (0x05, 0x19, 20),  # Rock -> Ice
+    (0x08, 0x00,  0),  # Ghost -> Normal
+    (0x08, 0x18,  0),  # Ghost -> Psychic
+    (0x14, 0x1A,  5),  # Fire -> Dragon
+    (0x15, 0x1A,  5),  # Water -> Dragon
+    (0x17, 0x1A,  5),  # Electric -> Dragon
+    (0x16, 0x1A,  5),  # Grass -> Dragon
+    (0x19, 0x14,  5),  # Ice -> Fire
+    (0x1A, 0x1A, 20),  # Dragon -> Dragon
+]
+
 # Gen 1 (RBY) ROM species index  -> National Pokédex number
 POKEMON_ROM_ID_TO_PKDX_ID = {
     0x01: 112, # Rhydon
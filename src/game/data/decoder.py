@@ -7,6 +7,10 @@
 #  - 0xF6-0xFF: '0'..'9'
 #  - Special codes 0x49–0x5F (see control table)
 
+from collections import OrderedDict
+
+from game.utils.metrics import REGISTRY
+
 PKM_GEN1_TABLE = {
     0x00: "<null>",
 
@@ -58,18 +62,187 @@ PKM_GEN1_TABLE = {
 }
 
 
+_TERMINATOR = 0x50
+_TERMINATOR_BYTE = b"\x50"
+
+
+class _CompiledTable:
+    """256-entry lookups derived from a ``{byte: str}`` table."""
+
+    __slots__ = ("table", "lut", "ascii", "encode_map", "max_token")
+
+    def __init__(self, table) -> None:
+        self.table = table
+        # every byte -> its text (unknown bytes render as "<?xx>")
+        self.lut = [table.get(b, f"<?{b:02X}>") for b in range(256)]
+        # bytes.translate table for bytes whose text is one ASCII char; 0x00 flags the others
+        self.ascii = bytes(
+            ord(text) if len(text) == 1 and ord(text) < 0x80 and b != 0x00 else 0x00
+            for b, text in enumerate(self.lut)
+        )
+        # text -> byte for the encoder (first byte wins on duplicates)
+        self.encode_map = {}
+        for b in sorted(table):
+            text = table[b]
+            if text and text not in self.encode_map:
+                self.encode_map[text] = b
+        self.max_token = max(len(token) for token in self.encode_map)
+
+
+_COMPILED = {}
+
+
+def _compiled(table) -> _CompiledTable:
+    entry = _COMPILED.get(id(table))
+    if entry is None or entry.table is not table:
+        entry = _COMPILED[id(table)] = _CompiledTable(table)
+    return entry
+
+
+_DEFAULT = _compiled(PKM_GEN1_TABLE)
+
+
 def decode_pkm_text(bytes_, table=PKM_GEN1_TABLE, stop_at_terminator=True):
     """
     Decode a list of Gen I bytes -> string.
     - stop_at_terminator: if True, stops at 0x50.
     - table: dict {byte:int -> str}; unknown bytes become "<?xx>".
+
+    Table driven.  Lists/tuples (PyBoy memory slices, the common case) are
+    walked once against the 256-entry lookup: for names of a few characters
+    this beats converting them to ``bytes`` first.  For ``bytes``-like input
+    the terminator is found by ``bytes.partition`` and names made of single
+    ASCII characters are decoded by one ``bytes.translate``.
+    """
+    compiled = _DEFAULT if table is PKM_GEN1_TABLE else _compiled(table)
+    kind = type(bytes_)
+    if kind is list or kind is tuple:
+        lut = compiled.lut
+        if not stop_at_terminator:
+            return "".join([lut[b] for b in bytes_])
+        text = ""
+        for b in bytes_:
+            if b == _TERMINATOR:
+                return text
+            text += lut[b]
+        return text
+    data = bytes_ if kind is bytes else bytes(bytes_)
+    if stop_at_terminator:
+        data = data.partition(_TERMINATOR_BYTE)[0]
+    fast = data.translate(compiled.ascii)
+    if 0x00 in fast:
+        return data.decode("latin-1").translate(compiled.lut)
+    return fast.decode("ascii")
+
+
+def encode_pkm_text(text, length=None, table=PKM_GEN1_TABLE, terminator=True):
+    """
+    Encode a string -> Gen I bytes (inverse of :func:`decode_pkm_text`).
+    - multi-character entries ("Pk", "<player>"...) are matched greedily, "<?xx>" gives byte xx.
+    - terminator: append 0x50.
+    - length: pad with 0x50 up to ``length`` bytes; raises ValueError if the text is longer.
+    Raises ValueError for characters missing from ``table``.
     """
-    out = []
-    for b in bytes_:
-        if stop_at_terminator and b == 0x50:
-            break
-        if b in table:
-            out.append(table[b])
+    compiled = _compiled(table)
+    encode_map = compiled.encode_map
+    out = bytearray()
+    i, size = 0, len(text)
+    while i < size:
+        if text.startswith("<?", i) and text[i + 4:i + 5] == ">":
+            try:
+                out.append(int(text[i + 2:i + 4], 16))
+                i += 5
+                continue
+            except ValueError:
+                pass
+        for width in range(min(compiled.max_token, size - i), 0, -1):
+            code = encode_map.get(text[i:i + width])
+            if code is not None:
+                out.append(code)
+                i += width
+                break
         else:
-            out.append(f"<?{b:02X}>")
-    return "".join(out)
+            raise ValueError(f"Character {text[i]!r} cannot be encoded")
+    if terminator:
+        out.append(_TERMINATOR)
+    if length is not None:
+        if len(out) > length:
+            raise ValueError(f"Encoded text is {len(out)} bytes, more than {length}")
+        out.extend(bytes([_TERMINATOR]) * (length - len(out)))
+    return bytes(out)
+
+
+# ----------------------------------------------------------------------
+# Decoded name cache
+# ----------------------------------------------------------------------
+class TextCache:
+    """
+    LRU of ``raw bytes -> decoded text`` in front of :func:`decode_pkm_text`.
+
+    Names (nicknames, trainer and move names) are read from the same few
+    byte sequences over and over; a hit costs one dict lookup.  Keys are
+    ``bytes`` as given, other sequences (PyBoy memory slices are lists)
+    are keyed by ``tuple``, which is cheaper to build than ``bytes``.  Lookups
+    are lock free: under concurrent readers the stats are approximate and
+    an entry may be evicted twice, never decoded wrongly.
+    """
+
+    def __init__(self, maxsize: int = 1024, table=PKM_GEN1_TABLE) -> None:
+        self.maxsize = maxsize
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[object, str]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def decode(self, raw) -> str:
+        """Decode ``raw`` up to the 0x50 terminator, from the cache when possible."""
+        key = raw if type(raw) is bytes else tuple(raw)
+        entries = self._entries
+        text = entries.get(key)
+        if text is not None:
+            self.hits += 1
+            try:
+                entries.move_to_end(key)
+            except KeyError:  # evicted by another thread meanwhile
+                pass
+            return text
+        self.misses += 1
+        text = decode_pkm_text(raw, self.table, stop_at_terminator=True)
+        entries[key] = text
+        while len(entries) > self.maxsize:
+            try:
+                entries.popitem(last=False)
+            except KeyError:
+                break
+            self.evictions += 1
+        return text
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+TEXT_CACHE = TextCache()
+
+# read at scrape time: nothing is recorded on the lookup path
+REGISTRY.gauge("pkm_text_cache_entries", "Decoded names held in the text cache").set_function(lambda: len(TEXT_CACHE))
+REGISTRY.counter("pkm_text_cache_hits_total", "Text cache hits").set_function(lambda: TEXT_CACHE.hits)
+REGISTRY.counter("pkm_text_cache_misses_total", "Text cache misses (decodes)").set_function(lambda: TEXT_CACHE.misses)
+REGISTRY.counter("pkm_text_cache_evictions_total", "Text cache evictions").set_function(lambda: TEXT_CACHE.evictions)
+
+
+def decode_pkm_name(raw) -> str:
+    """Cached :func:`decode_pkm_text` for fixed-size name fields (default table, stops at 0x50)."""
+    return TEXT_CACHE.decode(raw)
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from typing import List, Tuple
 
-from game.data.decoder import decode_pkm_text
+from game.data.decoder import decode_pkm_name
 from game.data.ram_reader import MemoryData
 
 
@@ -18,12 +18,11 @@ def read_u16(raw: List[int], sl: Tuple[int, int] = (0, 2)) -> int:
 
 
 def read_str(raw: List[int], sl: Tuple[int, int]) -> str:
-    return decode_pkm_text(raw[sl[0]:sl[1]], stop_at_terminator=True)
+    return decode_pkm_name(raw[sl[0]:sl[1]])
 
 
 def read_str_from_md(md: MemoryData) -> str:
-    data = MemoryData.game.memory[md.start_address : md.end_address + 1]
-    return read_str(list(data), (0, md.end_address - md.start_address + 1))
+    return decode_pkm_name(MemoryData.game.memory[md.start_address : md.end_address + 1])
 
 
 def read_list(raw: List[int], sl: Tuple[int, int]) -> List[int]:
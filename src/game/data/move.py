@@ -1,7 +1,7 @@
 
 from game.data.data import  POKEMON_TYPES, FUNCTION_CODE_EFFECT
 from dataclasses import dataclass
-from game.data.decoder import decode_pkm_text
+from game.data.decoder import decode_pkm_name
 import json
 
 from game.data.ram_reader import MoveROMBank
@@ -41,7 +41,7 @@ def _read_move_name_current_bank(pyboy, move_id: int, table_base: int = 0x4000,
     if start < 0:
         return "NA"
     raw = pyboy.memory[table_base + start : table_base + start + cap]
-    return decode_pkm_text(raw, stop_at_terminator=True)
+    return decode_pkm_name(raw)
 
 
 
@@ -68,7 +68,7 @@ class Move:
 
         new_move = Move.load_from_bytes(move_bank.get_move_bytes(id))
 
-        new_move.name = move_bank.get_move_name(id,decode_pkm_text)
+        new_move.name = decode_pkm_name(move_bank.get_move_name_bytes(id))
 
         return new_move
 
@@ -133,6 +133,7 @@ class Move:
 
     def to_dict(self):
         return {
+            "id" : self.id,
             "name" : self.name,
             "effect" : self.effect,
             "power" : self.power,
@@ -7,6 +7,7 @@ from typing import Any, ClassVar, Dict, List, Literal, Optional, Tuple
 import pyboy
 
 from game.data.data import POKDX_ID_TO_NAME, POKEMON_ROM_ID_TO_PKDX_ID, POKEMON_TYPES
+from game.data.decoder import decode_pkm_name
 from game.data.helpers import (
     read_list,
     read_str_from_md,
@@ -259,7 +260,7 @@ class PartyPokemon(Pokemon):
         # nickname stocké ailleurs (11 octets), on le lit à la volée
         _, nick_md = self.SLOT_BLOCKS[self.slot]
         raw = MemoryData.game.memory[nick_md.start_address:nick_md.end_address + 1]
-        return decode_pkm_text(raw, stop_at_terminator=True)
+        return decode_pkm_name(raw)
 
     @property
     def species_id(self) -> int:
@@ -470,6 +471,7 @@ class PlayerPokemonBattle(Pokemon):
     def max_hp(self) -> int: 
         return self._u16(MainPokemonData.PlayerMaxHP)
     
+    @property
     def species_id(self) -> int:
         return self._u8(MainPokemonData.PlayerPokemonNumber)
     
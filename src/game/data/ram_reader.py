@@ -1,9 +1,14 @@
 
 import threading
 import time
+from pathlib import Path
+from typing import Optional
 from loguru import logger
 import pyboy
 
+from game.data.data import TYPE_CHART
+from game.data.rom_tables import RomTables, cache_path, parse_type_chart
+
 def select_rom_bank(pyboy, bank: int) -> None:
     bank &= 0x7F
     pyboy.memory[0x6000] = 0x00
@@ -14,6 +19,8 @@ def select_rom_bank(pyboy, bank: int) -> None:
 BYTES_PER_MOVE         = 6
 MOVES_DATA_BANK_NUMBER = 0x0E
 NAMES_BANK_NUMBER      = 0x2C
+TYPE_CHART_BANK_NUMBER = 0x0F  # battle engine bank in Red/Blue; other banks are scanned if absent
+ROM_BANK_COUNT         = 0x40
 
 
 def _read_rom_bank_window(game: "pyboy.PyBoy", bank_number: int, start: int = 0x4000, end: int = 0x8000) -> bytes:
@@ -31,15 +38,28 @@ def _read_rom_bank_window(game: "pyboy.PyBoy", bank_number: int, start: int = 0x
             select_rom_bank(game, old_bank)
 
 
+def _read_type_chart(game: "pyboy.PyBoy") -> Optional[list]:
+    """Locate the type chart in the ROM banks (its home bank first)."""
+    banks = [TYPE_CHART_BANK_NUMBER] + [b for b in range(1, ROM_BANK_COUNT) if b != TYPE_CHART_BANK_NUMBER]
+    for bank in banks:
+        chart = parse_type_chart(_read_rom_bank_window(game, bank))
+        if chart:
+            return chart
+    return None
+
+
 class MoveROMBank:
     """
-    Singleton helper to preload move data and names from the ROM once.
-    Provides O(1) access to each move’s raw bytes and decoded name.
+    Singleton helper to preload move data, move names and the type chart from the ROM once.
+    Provides O(1) access to each move’s raw bytes and decoded name, and to type effectiveness.
+
+    With ``cache_dir`` and ``rom_digest`` the tables are stored on disk
+    (:mod:`game.data.rom_tables`) and reused by later sessions on the same ROM.
     """
 
     _instance = None
 
-    def __new__(cls, game: "pyboy.PyBoy" = None):
+    def __new__(cls, game: "pyboy.PyBoy" = None, *, rom_digest: Optional[bytes] = None, cache_dir: Optional[str] = None):
         # If an instance already exists, reuse it
         if cls._instance is not None:
             return cls._instance
@@ -49,17 +69,42 @@ class MoveROMBank:
 
         # Create new instance and store it
         cls._instance = super().__new__(cls)
-        cls._instance._init_data(game)
+        cls._instance._init_data(game, rom_digest, cache_dir)
         return cls._instance
 
-    def _init_data(self, game: "pyboy.PyBoy"):
-        # --- Preload both banks ---
-        self.moves_data: bytes = _read_rom_bank_window(game, MOVES_DATA_BANK_NUMBER)
-        self.names_blob: bytes = _read_rom_bank_window(game, NAMES_BANK_NUMBER)
+    def _init_data(self, game: "pyboy.PyBoy", rom_digest: Optional[bytes], cache_dir: Optional[str]):
+        path: Optional[Path] = cache_path(cache_dir, rom_digest) if cache_dir and rom_digest else None
+        tables = RomTables.load(path) if path is not None and path.exists() else None
+        if tables is None:
+            tables = self._read_tables(game)
+            if path is not None:
+                try:
+                    tables.save(path)
+                    logger.info("ROM tables cached in {}", path)
+                except OSError as exc:
+                    logger.warning("Could not cache ROM tables in {}: {}", path, exc)
+
+        self.moves_data: bytes = tables.moves_data
+        self.names_blob: bytes = tables.names_blob
+        self.type_chart: list = tables.type_chart
+        # type_effectiveness[attack_type, defend_type] = multiplier x10
+        self.type_effectiveness = tables.type_effectiveness
+        self.type_order = tables.type_order
 
         # Split the 0x50-terminated names immediately
         self._names_list: list[bytes] = self.names_blob.split(b"\x50")
 
+    @staticmethod
+    def _read_tables(game: "pyboy.PyBoy") -> RomTables:
+        # --- Preload the banks ---
+        moves_data = _read_rom_bank_window(game, MOVES_DATA_BANK_NUMBER)
+        names_blob = _read_rom_bank_window(game, NAMES_BANK_NUMBER)
+        type_chart = _read_type_chart(game)
+        if type_chart is None:
+            logger.warning("Type chart not found in ROM, using the built-in Gen 1 chart")
+            type_chart = TYPE_CHART
+        return RomTables.build(moves_data, names_blob, type_chart)
+
     # --- Accessors ---
     def get_move_bytes(self, move_id: int) -> bytes:
         """Return the 6-byte record for a given move ID (1-based)."""
@@ -83,6 +128,10 @@ class MoveROMBank:
         raw = self.get_move_name_bytes(move_id)
         return decode_pkm_text(raw, stop_at_terminator=True)
 
+    def effectiveness(self, attack_type: int, defend_type: int) -> int:
+        """Multiplier x10 (0, 5, 10 or 20) of one chart entry."""
+        return int(self.type_effectiveness[attack_type, defend_type])
+
 
 class MemoryData:
 
@@ -113,20 +162,25 @@ class MemoryData:
         """
         if cls.game is None:
             raise ValueError("No game class set for the memory! Use MemoryData.set_game(game : PyBoy)")
-        threshold = 0xCF1A + MemoryData.shift
 
         if not hasattr(cls.game,"game_version"):
             return data
         if cls.game.game_version.is_yellow :
-            shift_start = -1 if data.start_address >= threshold else 0
-            shift_end = -1 if data.end_address >= threshold else 0
-            data = MemoryData(
-                data.start_address + shift_start - MemoryData.shift,
-                data.end_address + shift_end - MemoryData.shift,
-                data.description,
-            )
+            data = cls.shift_for_yellow(data)
         return data
 
+    @staticmethod
+    def shift_for_yellow(data: "MemoryData") -> "MemoryData":
+        """Yellow address of a Red/Blue ``data`` (WRAM from 0xCF1A moved down one byte)."""
+        threshold = 0xCF1A + MemoryData.shift
+        shift_start = -1 if data.start_address >= threshold else 0
+        shift_end = -1 if data.end_address >= threshold else 0
+        return MemoryData(
+            data.start_address + shift_start - MemoryData.shift,
+            data.end_address + shift_end - MemoryData.shift,
+            data.description,
+        )
+
     @classmethod
     def set_game(cls, game):
         cls.game  = game
@@ -156,10 +210,10 @@ class SavedPokemonData(DataType):
     MainData                   = MemoryData(0xa5a3,0xad2b) # 0xa5a3 - 0xad2b
     SpriteData                 = MemoryData(0xad2c,0xaf2b) # 0xad2c - 0xaf2b
     PartyData                  = MemoryData(0xaf2c,0xb0bf) # 0xaf2c - 0xb0bf
-    CurrentBoxData             = MemoryData(0xb0c0,0xbc521) # 0xb0c0 - 0xbc521
-    TilesetType                = MemoryData(0xbc522,0xbc522) # 0xbc522
-    MainDataChecksum           = MemoryData(0xbc523,0xbc523) # 0xbc523
-    SpriteDataChecksum         = MemoryData(0xbc524,0xbc524) # 0xbc524
+    CurrentBoxData             = MemoryData(0xb0c0,0xb521) # 0xb0c0 - 0xb521
+    TilesetType                = MemoryData(0xb522,0xb522) # 0xb522
+    MainDataChecksum           = MemoryData(0xb523,0xb523) # 0xb523
+    SpriteDataChecksum         = MemoryData(0xb524,0xb524) # 0xb524
     #Bank 2
     
     Box1                       = MemoryData(0xA000, 0xA461)  # 0x462 bytes
@@ -181,6 +235,36 @@ class SavedPokemonData(DataType):
     GlobalChecksum_3           = MemoryData(0xBA4C, 0xBA4C)  # 0x1 byte
     IndividualChecksums_3      = MemoryData(0xBA4D, 0xBA52)  # 0x6 bytes
 
+    @staticmethod
+    def start_pokemon_logger(pyboy, pokemon_md: MemoryData, interval_sec: int = 60):
+        """
+        Lance un thread qui logge les infos du Pokémon défini par 'pokemon_md' toutes les 'interval_sec' secondes.
+        Retourne le thread (daemon).
+        """
+        # Déterminer Yellow dynamiquement si possible
+        is_yellow_flag = False
+        try:
+            gv = getattr(pyboy, "game_version", None)
+            is_yellow_flag = bool(getattr(gv, "is_yellow", False))
+        except Exception:
+            pass
+
+        def _worker():
+            # Import tardif pour éviter import-cycles (pokemon -> ram_reader)
+            from game.data.pokemon import Pokemon
+            while True:
+                try:
+                    mon = Pokemon.from_memory(pyboy, pokemon_md, is_yellow=is_yellow_flag)
+                    # __str__ de ta classe Pokemon est déjà propre ; on logge la ligne lisible
+                    logger.info(str(mon))
+                except Exception as e:
+                    logger.exception(f"[PokemonLogger] failure: {e}")
+                time.sleep(interval_sec)
+
+        t = threading.Thread(target=_worker, daemon=True)
+        t.start()
+        return t
+
 class MainPokemonData(DataType):
     #WRAM
     # Audio
@@ -533,6 +617,8 @@ class MainPokemonData(DataType):
     # Stored Items
     StoredItem = MemoryData(0xD53A, 0xD59F, "Stored items (item ID + quantity, 2 bytes each, up to 50 items)")
 
+    CurrentBoxNumber = MemoryData(0xD5A0, 0xD5A0, "Current PC box (bits 0-6, 0-based; bit 7 set once boxes are initialised)")
+
     # Game CCoins
     coins = MemoryData(0xD5A4, 0xD5A5, "Game Corner coins (in cents)")
     
@@ -646,6 +732,7 @@ class MainPokemonData(DataType):
     Pokemons_in_box = MemoryData(0xDA96, 0xDD29, "All boxes' Pokémon (14 boxes of 20 Pokémon each = 280 total)")
     Trainer_names_boxes = MemoryData(0xDD2A, 0xDE05, "All boxes' trainer names (11 bytes each, 14 boxes of 20 Pokémon each = 280 total)")
     Nickname_boxes = MemoryData(0xDE06, 0xDEE1, "All boxes' nicknames (11 bytes each, 14 boxes of 20 Pokémon each = 280 total)")
+    CurrentBoxData = MemoryData(0xDA80, 0xDEE1, "Current box: count, species list, 20 box mons, OT names, nicknames (0x462 bytes)")
 
     @staticmethod
     def get_main_pkm_for_party_slot(slot: int) -> MemoryData:
@@ -712,45 +799,3 @@ class InternalPokemonData(DataType):
     BattleTurn         = MemoryData(0xFFF3, 0xFFF3, "Battle turn (0=player, 1=opponent)")
     JoypadInput        = MemoryData(0xFFF8, 0xFFF8, "Joypad input")
     JoypadPollingFlag  = MemoryData(0xFFF9, 0xFFF9, "Disable joypad polling flag")
-
-
-        
-
-
-# ... (tes imports existants)
-# from game.data.pokemon import Pokemon  # Importé dans la fonction pour éviter les cycles
-
-class SavedPokemonData(DataType):
-    # --- tes MemoryData existants ici ---
-    # Exemple (remplace par ton vrai champ) :
-    # Pokemon1SlotBattle = MemoryData(0xD16B, 0xD192, "First Pokémon battle block")
-
-    @staticmethod
-    def start_pokemon_logger(pyboy, pokemon_md: MemoryData, interval_sec: int = 60):
-        """
-        Lance un thread qui logge les infos du Pokémon défini par 'pokemon_md' toutes les 'interval_sec' secondes.
-        Retourne le thread (daemon).
-        """
-        # Déterminer Yellow dynamiquement si possible
-        is_yellow_flag = False
-        try:
-            gv = getattr(pyboy, "game_version", None)
-            is_yellow_flag = bool(getattr(gv, "is_yellow", False))
-        except Exception:
-            pass
-
-        def _worker():
-            # Import tardif pour éviter import-cycles (pokemon -> ram_reader)
-            from game.data.pokemon import Pokemon
-            while True:
-                try:
-                    mon = Pokemon.from_memory(pyboy, pokemon_md, is_yellow=is_yellow_flag)
-                    # __str__ de ta classe Pokemon est déjà propre ; on logge la ligne lisible
-                    logger.info(str(mon))
-                except Exception as e:
-                    logger.exception(f"[PokemonLogger] failure: {e}")
-                time.sleep(interval_sec)
-
-        t = threading.Thread(target=_worker, daemon=True)
-        t.start()
-        return t
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""ROM tables read once per ROM and cached on disk.
+
+:class:`~game.data.ram_reader.MoveROMBank` reads the move data, the move
+names and the type chart out of the ROM banks when the emulator starts.
+With a cache directory the result is stored as ``<rom blake2b>.npz``
+(see :attr:`SaveStateManager.rom_digest <game.core.state.SaveStateManager.rom_digest>`)
+and later sessions on the same ROM load it instead of switching banks.
+
+The type chart is kept both as the ROM's ordered list of
+``(attacking type, defending type, multiplier x10)`` entries and as two
+dense ``(256, 256)`` matrices indexed by raw type bytes, so an
+effectiveness lookup is ``effectiveness[attack_type, defend_type]``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ROM_TABLES_VERSION = 1
+NUM_TYPE_IDS = 256  # matrices are indexed by raw type bytes
+
+# First two entries of the ROM chart: Water -> Fire x2, Fire -> Grass x2
+TYPE_CHART_SIGNATURE = bytes((0x15, 0x14, 20, 0x14, 0x16, 20))
+TYPE_CHART_TERMINATOR = 0xFF
+_MAX_TYPE_ID = 0x1A
+_MULTIPLIERS = (0, 5, 20)
+
+TypeChart = List[Tuple[int, int, int]]
+
+
+def parse_type_chart(blob: bytes) -> Optional[TypeChart]:
+    """Find and decode the type chart in a ROM bank window, or ``None``."""
+    start = blob.find(TYPE_CHART_SIGNATURE)
+    if start < 0:
+        return None
+    chart: TypeChart = []
+    for i in range(start, len(blob) - 2, 3):
+        if blob[i] == TYPE_CHART_TERMINATOR:
+            return chart
+        attack, defend, multiplier = blob[i:i + 3]
+        if attack > _MAX_TYPE_ID or defend > _MAX_TYPE_ID or multiplier not in _MULTIPLIERS:
+            return None
+        chart.append((attack, defend, multiplier))
+    return None
+
+
+def type_matrices(chart: Sequence[Tuple[int, int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    ``(effectiveness, order)``: ``effectiveness[attack_type, defend_type]`` is
+    the multiplier x10 (10 when the pair is not in the chart) and ``order``
+    the entry's position in the chart (the game applies entries in that order).
+    """
+    eff = np.full((NUM_TYPE_IDS, NUM_TYPE_IDS), 10, dtype=np.uint8)
+    order = np.full((NUM_TYPE_IDS, NUM_TYPE_IDS), len(chart), dtype=np.int16)
+    for i, (attack, defend, multiplier) in enumerate(chart):
+        eff[attack, defend] = multiplier
+        order[attack, defend] = i
+    return eff, order
+
+
+@dataclass(frozen=True)
+class RomTables:
+    moves_data: bytes
+    names_blob: bytes
+    type_chart: TypeChart
+    type_effectiveness: np.ndarray  # (256, 256) uint8, multiplier x10
+    type_order: np.ndarray          # (256, 256) int16, position in type_chart
+
+    @classmethod
+    def build(cls, moves_data: bytes, names_blob: bytes, type_chart: TypeChart) -> "RomTables":
+        return cls(moves_data, names_blob, list(type_chart), *type_matrices(type_chart))
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            np.savez_compressed(
+                fh,
+                version=np.array(ROM_TABLES_VERSION),
+                moves_data=np.frombuffer(self.moves_data, dtype=np.uint8),
+                names_blob=np.frombuffer(self.names_blob, dtype=np.uint8),
+                type_chart=np.array(self.type_chart, dtype=np.uint8).reshape(-1, 3),
+                type_effectiveness=self.type_effectiveness,
+                type_order=self.type_order,
+            )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["RomTables"]:
+        """Tables cached at ``path``; ``None`` when missing or from another format version."""
+        try:
+            with np.load(path) as npz:
+                if int(npz["version"]) != ROM_TABLES_VERSION:
+                    return None
+                return cls(
+                    npz["moves_data"].tobytes(),
+                    npz["names_blob"].tobytes(),
+                    [tuple(int(v) for v in row) for row in npz["type_chart"]],
+                    npz["type_effectiveness"],
+                    npz["type_order"],
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def cache_path(cache_dir: str | Path, rom_digest: bytes) -> Path:
+    return Path(cache_dir) / f"{rom_digest.hex()}.npz"
+
+
+__all__ = [
+    "NUM_TYPE_IDS",
+    "RomTables",
+    "TypeChart",
+    "cache_path",
+    "parse_type_chart",
+    "type_matrices",
+]
@@ -0,0 +1,79 @@
+"""Read on-screen text from the tile buffer (``wTileMap``, 20x18 tiles)."""
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from game.data.decoder import PKM_GEN1_TABLE
+from game.data.helpers import read_bytes
+from game.data.ram_reader import MainPokemonData
+
+SCREEN_COLS, SCREEN_ROWS = 20, 18
+
+# Battle layout (rows/cols in tiles)
+TEXT_BOX_ROWS = slice(12, 18)      # bottom box: dialogue or move list
+DIALOGUE_ROWS = (14, 16)           # the two dialogue lines
+MOVE_INFO_ROWS = slice(8, 12)      # "TYPE/" + PP box shown next to the move list
+MOVE_INFO_COLS = slice(0, 11)
+
+# Characters the string table does not need but the screen shows
+_SCREEN_EXTRAS = {0x9A: "(", 0x9B: ")", 0x9C: ":", 0x9D: ";", 0x9E: "[", 0x9F: "]", 0xF3: "/", 0xF4: ","}
+
+
+def _build_lut() -> np.ndarray:
+    lut = [" "] * 256
+    for code, text in {**_SCREEN_EXTRAS, **PKM_GEN1_TABLE}.items():
+        # control codes and graphics (borders, HP bar, sprites) render as blanks
+        if code >= 0x60 and text and not text.startswith("<"):
+            lut[code] = text
+    return np.array(lut, dtype="<U2")
+
+
+TEXT_LUT = _build_lut()
+
+
+@dataclass(frozen=True)
+class ScreenText:
+    """Decoded view of one tile buffer snapshot."""
+
+    tiles: np.ndarray  # (18, 20) uint8
+
+    @classmethod
+    def from_bytes(cls, raw) -> "ScreenText":
+        return cls(np.frombuffer(bytes(raw), dtype=np.uint8).reshape(SCREEN_ROWS, SCREEN_COLS))
+
+    def lines(self, rows: slice = slice(None), cols: slice = slice(None)) -> List[str]:
+        chars = np.ascontiguousarray(TEXT_LUT[self.tiles[rows, cols]])
+        # one fixed-width string per row (single-char entries leave a NUL pad)
+        joined = chars.view(f"<U{2 * chars.shape[1]}").ravel().tolist()
+        return [row.replace("\x00", "").rstrip() for row in joined]
+
+    def text(self, rows: slice = slice(None), cols: slice = slice(None)) -> str:
+        return "\n".join(self.lines(rows, cols))
+
+    @property
+    def text_box_hash(self) -> int:
+        """CRC of the bottom box tiles: changes whenever its content changes."""
+        return zlib.crc32(self.tiles[TEXT_BOX_ROWS].tobytes())
+
+    @property
+    def dialogue(self) -> str:
+        return " ".join(line.strip() for line in (self.lines(slice(r, r + 1))[0] for r in DIALOGUE_ROWS) if line.strip())
+
+    @property
+    def is_move_menu(self) -> bool:
+        """The move list is open (its "TYPE/" info box is drawn above it)."""
+        return any("TYPE" in line for line in self.lines(MOVE_INFO_ROWS, MOVE_INFO_COLS))
+
+
+def get_screen_text() -> Optional[ScreenText]:
+    raw = read_bytes(MainPokemonData.TileBuffer)
+    if len(raw) != SCREEN_ROWS * SCREEN_COLS:
+        return None
+    return ScreenText.from_bytes(raw)
+
+
+__all__ = ["ScreenText", "TEXT_LUT", "get_screen_text", "SCREEN_COLS", "SCREEN_ROWS"]
@@ -0,0 +1,262 @@
+"""Minimal MQTT broker for single-host deployments, benchmarks and offline runs.
+
+:class:`LocalBroker` implements the subset of MQTT the bot uses: publish,
+subscribe/unsubscribe with ``+``/``#`` wildcards and retained messages.
+In-process clients (see :class:`game.mqtt.transport.LocalTransport`) get
+messages by direct function call, without sockets or serialization.
+
+:class:`BrokerTCPServer` exposes the same broker on a loopback TCP port
+speaking MQTT 3.1.1, so external processes (planners, ``mosquitto_sub``,
+another bot) can join.  QoS 1/2 publishes are acknowledged but everything is
+delivered at QoS 0; sessions are not persisted.
+"""
+from __future__ import annotations
+
+import socket
+import socketserver
+import struct
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from game.mqtt.router import TopicTrie, topic_matches, validate_filter
+from game.utils.metrics import REGISTRY
+
+
+_ROUTED = REGISTRY.counter("pkm_local_broker_messages_total", "Messages routed by the local broker")
+_DELIVERED = REGISTRY.counter("pkm_local_broker_deliveries_total", "Messages delivered by the local broker")
+
+# deliver(topic, payload, retain)
+Subscriber = Callable[[str, bytes, bool], None]
+
+
+class LocalBroker:
+    """Thread-safe topic router with a retained-message store."""
+
+    def __init__(self, logger=None) -> None:
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._subscriptions: TopicTrie[Subscriber] = TopicTrie()
+        self._retained: Dict[str, bytes] = {}
+
+    def subscribe(self, topic_filter: str, subscriber: Subscriber) -> None:
+        """Add ``subscriber`` for ``topic_filter`` and replay matching retained messages."""
+        validate_filter(topic_filter)
+        with self._lock:
+            self._subscriptions.insert(topic_filter, subscriber)
+            retained = [(t, p) for t, p in self._retained.items() if topic_matches(topic_filter, t)]
+        for topic, payload in retained:
+            self._deliver(subscriber, topic, payload, True)
+
+    def unsubscribe(self, topic_filter: str, subscriber: Subscriber) -> bool:
+        with self._lock:
+            return self._subscriptions.remove(topic_filter, subscriber)
+
+    def publish(self, topic: str, payload: str | bytes, retain: bool = False) -> int:
+        """Route a message; returns the number of deliveries."""
+        data = payload.encode("utf-8") if isinstance(payload, str) else bytes(payload)
+        with self._lock:
+            if retain:
+                if data:
+                    self._retained[topic] = data
+                else:  # empty retained payload clears the topic
+                    self._retained.pop(topic, None)
+            # one delivery per subscriber even when several of its filters
+            # match (MQTT 3.1.1 §3.3.5); keeps the order of first match
+            subscribers = list(dict.fromkeys(self._subscriptions.match(topic)))
+        _ROUTED.inc()
+        # subscribers are called outside the lock: they may publish in turn
+        for subscriber in subscribers:
+            self._deliver(subscriber, topic, data, False)
+        return len(subscribers)
+
+    def _deliver(self, subscriber: Subscriber, topic: str, payload: bytes, retain: bool) -> None:
+        try:
+            subscriber(topic, payload, retain)
+            _DELIVERED.inc()
+        except Exception as exc:  # pragma: no cover - a bad subscriber must not break routing
+            if self.logger is not None:
+                self.logger.exception("Local broker delivery on {} failed: {}", topic, exc)
+
+    def retained(self, topic: str) -> Optional[bytes]:
+        with self._lock:
+            return self._retained.get(topic)
+
+
+# ----------------------------------------------------------------------
+# MQTT 3.1.1 over loopback TCP
+# ----------------------------------------------------------------------
+_CONNECT, _CONNACK, _PUBLISH, _PUBACK, _PUBREC, _PUBREL, _PUBCOMP = 1, 2, 3, 4, 5, 6, 7
+_SUBSCRIBE, _SUBACK, _UNSUBSCRIBE, _UNSUBACK, _PINGREQ, _PINGRESP, _DISCONNECT = 8, 9, 10, 11, 12, 13, 14
+
+
+def _encode_length(length: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte, length = length % 128, length // 128
+        out.append(byte | 0x80 if length else byte)
+        if not length:
+            return bytes(out)
+
+
+def _packet(header: int, body: bytes) -> bytes:
+    return bytes((header,)) + _encode_length(len(body)) + body
+
+
+def _read_string(data: bytes, offset: int) -> Tuple[str, int]:
+    (length,) = struct.unpack_from("!H", data, offset)
+    start = offset + 2
+    return data[start:start + length].decode("utf-8"), start + length
+
+
+class _MQTTHandler(socketserver.BaseRequestHandler):
+    """One TCP client: decode packets, forward to the broker, write deliveries back."""
+
+    server: "_Server"
+
+    def setup(self) -> None:
+        self._write_lock = threading.Lock()
+        self._filters: List[str] = []
+        self._closed = False
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _send(self, data: bytes) -> None:
+        with self._write_lock:
+            if self._closed:
+                return
+            try:
+                self.request.sendall(data)
+            except OSError:
+                self._closed = True
+
+    def _deliver(self, topic: str, payload: bytes, retain: bool) -> None:
+        encoded = topic.encode("utf-8")
+        self._send(_packet((_PUBLISH << 4) | int(retain), struct.pack("!H", len(encoded)) + encoded + payload))
+
+    def _recv_exact(self, size: int) -> Optional[bytes]:
+        chunks = bytearray()
+        while len(chunks) < size:
+            chunk = self.request.recv(size - len(chunks))
+            if not chunk:
+                return None
+            chunks += chunk
+        return bytes(chunks)
+
+    def _read_packet(self) -> Optional[Tuple[int, bytes]]:
+        head = self._recv_exact(1)
+        if head is None:
+            return None
+        length, multiplier = 0, 1
+        while True:
+            byte = self._recv_exact(1)
+            if byte is None:
+                return None
+            length += (byte[0] & 0x7F) * multiplier
+            if not byte[0] & 0x80:
+                break
+            multiplier *= 128
+        body = self._recv_exact(length) if length else b""
+        if body is None:
+            return None
+        return head[0], body
+
+    def handle(self) -> None:
+        broker = self.server.broker
+        try:
+            while True:
+                packet = self._read_packet()
+                if packet is None:
+                    return
+                header, body = packet
+                kind = header >> 4
+                if kind == _CONNECT:
+                    self._send(_packet(_CONNACK << 4, b"\x00\x00"))
+                elif kind == _PUBLISH:
+                    qos, retain = (header >> 1) & 0x03, bool(header & 0x01)
+                    topic, offset = _read_string(body, 0)
+                    if qos:
+                        packet_id = body[offset:offset + 2]
+                        offset += 2
+                        self._send(_packet((_PUBACK if qos == 1 else _PUBREC) << 4, packet_id))
+                    broker.publish(topic, body[offset:], retain)
+                elif kind == _PUBREL:
+                    self._send(_packet(_PUBCOMP << 4, body[:2]))
+                elif kind == _SUBSCRIBE:
+                    offset, codes, accepted = 2, bytearray(), []
+                    while offset < len(body):
+                        topic_filter, offset = _read_string(body, offset)
+                        offset += 1  # requested QoS, always granted 0
+                        try:
+                            validate_filter(topic_filter)
+                        except ValueError:
+                            codes.append(0x80)
+                            continue
+                        codes.append(0x00)
+                        accepted.append(topic_filter)
+                    # SUBACK goes out before the retained messages it unlocks
+                    self._send(_packet(_SUBACK << 4, body[:2] + bytes(codes)))
+                    for topic_filter in accepted:
+                        if topic_filter in self._filters:
+                            continue
+                        self._filters.append(topic_filter)
+                        broker.subscribe(topic_filter, self._deliver)
+                elif kind == _UNSUBSCRIBE:
+                    offset = 2
+                    while offset < len(body):
+                        topic_filter, offset = _read_string(body, offset)
+                        if topic_filter in self._filters:
+                            self._filters.remove(topic_filter)
+                            broker.unsubscribe(topic_filter, self._deliver)
+                    self._send(_packet(_UNSUBACK << 4, body[:2]))
+                elif kind == _PINGREQ:
+                    self._send(_packet(_PINGRESP << 4, b""))
+                elif kind == _DISCONNECT:
+                    return
+        except (OSError, struct.error, UnicodeDecodeError):
+            return
+
+    def finish(self) -> None:
+        self._closed = True
+        for topic_filter in self._filters:
+            self.server.broker.unsubscribe(topic_filter, self._deliver)
+        self._filters.clear()
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int], broker: LocalBroker) -> None:
+        self.broker = broker
+        super().__init__(address, _MQTTHandler)
+
+
+class BrokerTCPServer:
+    """Serve a :class:`LocalBroker` over MQTT 3.1.1 on ``host:port`` (``port=0`` picks a free one)."""
+
+    def __init__(self, broker: LocalBroker, host: str = "127.0.0.1", port: int = 1883) -> None:
+        self.broker = broker
+        self.host = host
+        self.port = port
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._server is not None:
+            return
+        self._server = _Server((self.host, self.port), self.broker)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="local-mqtt-broker", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+
+LOCAL_BROKER = LocalBroker()
+
+
+__all__ = ["LocalBroker", "BrokerTCPServer", "LOCAL_BROKER", "Subscriber"]
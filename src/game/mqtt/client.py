@@ -1,124 +1,132 @@
 """High level MQTT client used by the services."""
 from __future__ import annotations
 
-import os
 import threading
-import uuid
-from dataclasses import dataclass
 from typing import Any, Callable, Optional
 
-import paho.mqtt.client as mqtt
-
-
-@dataclass(slots=True)
-class MQTTConfig:
-    host: str = os.getenv("MQTT_BROKER", "test.mosquitto.org")
-    port: int = int(os.getenv("MQTT_PORT", "1883"))
-    keepalive: int = 30
-    client_id: Optional[str] = os.getenv("MQTT_CLIENT_ID", None)
-    use_tls: bool = False
-    username: Optional[str] = os.getenv("MQTT_USERNAME", None)
-    password: Optional[str] = os.getenv("MQTT_PASSWORD", None)
+from game.mqtt.connection import DEFAULT_MANAGER, ConnectionManager, MQTTConfig
+from game.mqtt.publisher import OutboundMessage
+from game.mqtt.router import TopicTrie, merge_filters, validate_filter
 
 
 class MQTTClient:
-    """Thin wrapper around :mod:`paho.mqtt.client` with sensible defaults."""
-
-    def __init__(self, *, host: str, port: int, base_topic: str, logger) -> None:
+    """
+    One session's view of the broker: its ``base_topic`` and its handlers.
+
+    The socket, the paho network thread and the outbound queue belong to a
+    :class:`~game.mqtt.connection.SharedConnection` obtained from
+    ``manager`` (``MQTT_POOL_SIZE`` connections per broker by default), so
+    many sessions cost no extra threads.  Inbound messages are routed to the
+    session whose ``base_topic`` prefixes the topic.
+
+    Handler filters may overlap (``a/+/move`` and ``a/#``): every matching
+    handler runs once per message.  To get one copy per message from the
+    broker, which sends one per matching subscription, the session subscribes
+    on the wire to :func:`~game.mqtt.router.merge_filters` of its filters.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        base_topic: str,
+        logger,
+        max_pending: int = 1000,
+        max_publish_rate: Optional[float] = None,
+        manager: Optional[ConnectionManager] = None,
+    ) -> None:
         self.config = MQTTConfig(host=host, port=port)
         self.base_topic = base_topic.rstrip("/") + "/"
         self.logger = logger
-        self._client = self._create_client()
-        self._connected = threading.Event()
-        self._client.user_data_set({"logger": logger})
-        self._client.on_connect = self._on_connect
-        self._client.on_disconnect = self._on_disconnect
-        self._client.on_message = self._on_message
-        self._client.on_subscribe = self._on_subscribe
-        self._client.on_unsubscribe = self._on_unsubscribe
-        self._message_handlers: dict[str, Callable[[str, str], None]] = {}
+        # topic filter -> (handler, raw); raw handlers receive the undecoded bytes payload
+        self._message_handlers: dict[str, tuple[Callable[[str, Any], None], bool]] = {}
+        # same entries, indexed for wildcard (+/#) matching
+        self._router: TopicTrie[tuple[Callable[[str, Any], None], bool]] = TopicTrie()
+        # non-overlapping filters actually subscribed on the connection
+        self._wire_filters: list[str] = []
+        self._wire_lock = threading.Lock()
+        self._manager = manager or DEFAULT_MANAGER
+        self._connection = self._manager.acquire(
+            self, max_pending=max_pending, max_publish_rate=max_publish_rate
+        )
         self.connect()
 
     # ------------------------------------------------------------------
     # Life-cycle
     # ------------------------------------------------------------------
-    def _create_client(self) -> mqtt.Client:
-        client_id = self.config.client_id or f"pyboy-{uuid.uuid4().hex[:10]}"
-        return mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id)
-
     def connect(self) -> None:
-        if self._client.is_connected():
-            return
-        self.logger.info(
-            "Connecting to MQTT broker {}:{}", self.config.host, self.config.port
-        )
-        self._connected.clear()
-        self._client.connect(self.config.host, self.config.port, self.config.keepalive)
-        self._client.loop_start()
-        if not self._connected.wait(timeout=5.0):
-            self.logger.warning("MQTT connection timeout")
+        self._connection.connect()
 
     def disconnect(self) -> None:
-        return
-        try:
-            self._client.loop_stop()
-            if self._client.is_connected():
-                self._client.disconnect()
-        finally:
-            self._connected.clear()
+        for topic in list(self._message_handlers):
+            self.unsubscribe(topic)
+        # the shared connection is closed with its last session
+        self._manager.release(self)
 
     # ------------------------------------------------------------------
-    # Logging helpers
+    # Inbound dispatch (called from the connection's network thread)
     # ------------------------------------------------------------------
-    # paho expects call-signature with userdata first
-    def _on_connect(self, client: mqtt.Client, userdata: Any, flags, reason_code, properties=None):
-        if reason_code.is_failure:
-            self.logger.error("MQTT connection failed: {}", reason_code)
+    def _dispatch(self, topic: str, payload: bytes) -> None:
+        entries = self._router.match(topic)
+        if not entries:
+            self.logger.debug("MQTT message on {}: {!r}", topic, payload[:128])
             return
-        self.logger.info("MQTT connected (rc={})", reason_code.value)
-        self._connected.set()
-
-    def _on_disconnect(
-        self,
-        client: mqtt.Client,
-        userdata: Any,
-        disconnect_flags,
-        reason_code,
-        properties=None,
-    ):
-        self.logger.warning("MQTT disconnected: {} (flags={})", reason_code, disconnect_flags)
-        self._connected.clear()
-
-    def _on_message(self, client: mqtt.Client, userdata: Any, message: mqtt.MQTTMessage) -> None:
-        payload = message.payload.decode(errors="ignore")
-        handler = self._message_handlers.get(message.topic)
-        if handler:
-            handler(message.topic, payload)
-        else:
-            self.logger.debug("MQTT message on {}: {}", message.topic, payload)
-
-    def _on_subscribe(self, client: mqtt.Client, userdata: Any, mid: int, reason_codes, properties=None):
-        self.logger.info("Subscribed to topic (mid={})", mid)
-
-    def _on_unsubscribe(self, client: mqtt.Client, userdata: Any, mid: int, reason_codes, properties=None):
-        self.logger.info("Unsubscribed from topic (mid={})", mid)
+        text: Optional[str] = None
+        for handler, raw in entries:  # every matching filter gets the message
+            if raw:
+                handler(topic, payload)
+                continue
+            if text is None:
+                text = payload.decode(errors="ignore")
+            handler(topic, text)
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
-    def publish(self, topic: str, payload: str | bytes, qos: int = 0, retain: bool = False) -> None:
-        self.logger.debug("Publishing MQTT message to {}", topic)
-        self._client.publish(topic, payload=payload, qos=qos, retain=retain)
+    def publish(self, topic: str, payload: str | bytes, qos: int = 0, retain: bool = False) -> bool:
+        """Queue a message for the sender thread; never blocks on the network.
+
+        Retained topics are coalesced to their latest value.  Returns ``False``
+        when the message was dropped by the bounded queue.
+        """
+        return self._connection.publish(OutboundMessage(topic, payload, qos, retain))
 
-    def subscribe(self, topic: str, *, handler: Callable[[str, str], None]) -> None:
+    def subscribe(self, topic: str, *, handler: Callable[[str, Any], None], raw: bool = False) -> None:
+        """Route messages matching ``topic`` (an MQTT filter, ``+``/``#`` allowed) to ``handler``.
+
+        Subscribing again to the same filter replaces its handler.
+        """
+        validate_filter(topic)
         self.logger.debug("Subscribing to topic {}", topic)
-        self._message_handlers[topic] = handler
-        self._client.subscribe(topic)
+        entry = (handler, raw)
+        previous = self._message_handlers.get(topic)
+        # register first: retained messages can arrive before SUBACK
+        self._message_handlers[topic] = entry
+        self._router.insert(topic, entry)
+        if previous is None:
+            self._sync_wire_filters()
+        else:
+            self._router.remove(topic, previous)
 
     def unsubscribe(self, topic: str) -> None:
         self.logger.debug("Unsubscribing from topic {}", topic)
-        self._message_handlers.pop(topic, None)
-        self._client.unsubscribe(topic)
+        entry = self._message_handlers.pop(topic, None)
+        if entry is not None:
+            self._router.remove(topic, entry)
+            self._sync_wire_filters()
+
+    def _sync_wire_filters(self) -> None:
+        with self._wire_lock:
+            wanted = merge_filters(self._message_handlers)
+            added = [f for f in wanted if f not in self._wire_filters]
+            removed = [f for f in self._wire_filters if f not in wanted]
+            self._wire_filters = wanted
+            # subscribe before unsubscribing so a widened filter leaves no gap
+            for topic in added:
+                self._connection.subscribe(topic)
+            for topic in removed:
+                self._connection.unsubscribe(topic)
 
 
 __all__ = ["MQTTClient", "MQTTConfig"]
@@ -0,0 +1,370 @@
+"""Pluggable payload codecs for MQTT scene and command messages.
+
+Every codec has a topic-safe ``name``.  JSON stays on the historical topics;
+any other codec is advertised as a trailing topic level, e.g.
+``battle/info/msgpack-zlib`` (MQTT 3.1.1 has no header properties and ``+``
+is reserved in topic names, hence the dashes).
+
+Available codecs:
+
+* ``json``          – :func:`game.utils.json_utils.to_json`, UTF-8 text
+* ``msgpack``       – MessagePack (``msgpack`` package if installed, else a
+                      small built-in implementation)
+* ``json-zlib`` / ``msgpack-zlib`` – the above, deflate-compressed
+* ``battle-v1``     – schema-driven MessagePack for battle scene payloads:
+                      moves, types and effects are written as numeric IDs
+"""
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from game.data.data import POKEMON_TYPES
+from game.utils.json_utils import to_json
+
+try:  # optional C-accelerated implementation
+    import msgpack as _msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    _msgpack = None
+
+
+# ----------------------------------------------------------------------
+# Built-in MessagePack subset (nil, bool, int, float64, str, bin, array, map)
+# ----------------------------------------------------------------------
+def _pack_into(obj: Any, out: bytearray) -> None:
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -32 <= obj < 0:
+            out.append(obj & 0xFF)
+        elif 0 <= obj <= 0xFF:
+            out += b"\xcc" + struct.pack(">B", obj)
+        elif 0 <= obj <= 0xFFFF:
+            out += b"\xcd" + struct.pack(">H", obj)
+        elif 0 <= obj <= 0xFFFFFFFF:
+            out += b"\xce" + struct.pack(">I", obj)
+        elif obj > 0:
+            out += b"\xcf" + struct.pack(">Q", obj)
+        elif obj >= -0x80:
+            out += b"\xd0" + struct.pack(">b", obj)
+        elif obj >= -0x8000:
+            out += b"\xd1" + struct.pack(">h", obj)
+        elif obj >= -0x80000000:
+            out += b"\xd2" + struct.pack(">i", obj)
+        else:
+            out += b"\xd3" + struct.pack(">q", obj)
+    elif isinstance(obj, float):
+        out += b"\xcb" + struct.pack(">d", obj)
+    elif isinstance(obj, str):
+        raw = obj.encode("utf-8")
+        n = len(raw)
+        if n < 32:
+            out.append(0xA0 | n)
+        elif n <= 0xFF:
+            out += b"\xd9" + struct.pack(">B", n)
+        elif n <= 0xFFFF:
+            out += b"\xda" + struct.pack(">H", n)
+        else:
+            out += b"\xdb" + struct.pack(">I", n)
+        out += raw
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        raw = bytes(obj)
+        n = len(raw)
+        if n <= 0xFF:
+            out += b"\xc4" + struct.pack(">B", n)
+        elif n <= 0xFFFF:
+            out += b"\xc5" + struct.pack(">H", n)
+        else:
+            out += b"\xc6" + struct.pack(">I", n)
+        out += raw
+    elif isinstance(obj, (list, tuple)):
+        n = len(obj)
+        if n < 16:
+            out.append(0x90 | n)
+        elif n <= 0xFFFF:
+            out += b"\xdc" + struct.pack(">H", n)
+        else:
+            out += b"\xdd" + struct.pack(">I", n)
+        for item in obj:
+            _pack_into(item, out)
+    elif isinstance(obj, dict):
+        n = len(obj)
+        if n < 16:
+            out.append(0x80 | n)
+        elif n <= 0xFFFF:
+            out += b"\xde" + struct.pack(">H", n)
+        else:
+            out += b"\xdf" + struct.pack(">I", n)
+        for key, value in obj.items():
+            _pack_into(key, out)
+            _pack_into(value, out)
+    else:
+        raise TypeError(f"Cannot MessagePack-encode {type(obj).__name__}")
+
+
+_FIXED = {
+    0xCC: (">B", 1), 0xCD: (">H", 2), 0xCE: (">I", 4), 0xCF: (">Q", 8),
+    0xD0: (">b", 1), 0xD1: (">h", 2), 0xD2: (">i", 4), 0xD3: (">q", 8),
+    0xCA: (">f", 4), 0xCB: (">d", 8),
+}
+
+
+def _unpack_from(data: bytes, pos: int) -> Tuple[Any, int]:
+    b = data[pos]
+    pos += 1
+    if b <= 0x7F:
+        return b, pos
+    if b >= 0xE0:
+        return b - 0x100, pos
+    if 0xA0 <= b <= 0xBF:
+        n = b & 0x1F
+        return data[pos:pos + n].decode("utf-8"), pos + n
+    if 0x90 <= b <= 0x9F:
+        return _unpack_array(data, pos, b & 0x0F)
+    if 0x80 <= b <= 0x8F:
+        return _unpack_map(data, pos, b & 0x0F)
+    if b == 0xC0:
+        return None, pos
+    if b == 0xC2:
+        return False, pos
+    if b == 0xC3:
+        return True, pos
+    if b in _FIXED:
+        fmt, size = _FIXED[b]
+        return struct.unpack_from(fmt, data, pos)[0], pos + size
+    if b in (0xD9, 0xDA, 0xDB, 0xC4, 0xC5, 0xC6):
+        fmt, size = {0xD9: (">B", 1), 0xDA: (">H", 2), 0xDB: (">I", 4),
+                     0xC4: (">B", 1), 0xC5: (">H", 2), 0xC6: (">I", 4)}[b]
+        n = struct.unpack_from(fmt, data, pos)[0]
+        pos += size
+        raw = data[pos:pos + n]
+        return (raw.decode("utf-8") if b >= 0xD9 else bytes(raw)), pos + n
+    if b in (0xDC, 0xDD):
+        fmt, size = (">H", 2) if b == 0xDC else (">I", 4)
+        return _unpack_array(data, pos + size, struct.unpack_from(fmt, data, pos)[0])
+    if b in (0xDE, 0xDF):
+        fmt, size = (">H", 2) if b == 0xDE else (">I", 4)
+        return _unpack_map(data, pos + size, struct.unpack_from(fmt, data, pos)[0])
+    raise ValueError(f"Unsupported MessagePack type byte 0x{b:02X}")
+
+
+def _unpack_array(data: bytes, pos: int, n: int) -> Tuple[List[Any], int]:
+    items = []
+    for _ in range(n):
+        item, pos = _unpack_from(data, pos)
+        items.append(item)
+    return items, pos
+
+
+def _unpack_map(data: bytes, pos: int, n: int) -> Tuple[Dict[Any, Any], int]:
+    result = {}
+    for _ in range(n):
+        key, pos = _unpack_from(data, pos)
+        value, pos = _unpack_from(data, pos)
+        result[key] = value
+    return result, pos
+
+
+def msgpack_dumps(obj: Any) -> bytes:
+    if _msgpack is not None:
+        return _msgpack.packb(obj, use_bin_type=True)
+    out = bytearray()
+    _pack_into(obj, out)
+    return bytes(out)
+
+
+def msgpack_loads(data: bytes) -> Any:
+    if _msgpack is not None:
+        return _msgpack.unpackb(data, raw=False, strict_map_key=False)
+    obj, _ = _unpack_from(bytes(data), 0)
+    return obj
+
+
+# ----------------------------------------------------------------------
+# Codecs
+# ----------------------------------------------------------------------
+class Codec:
+    """Encode/decode message payloads. ``name`` must be a valid topic level."""
+
+    name = "abstract"
+    binary = True
+
+    def encode(self, obj: Any) -> bytes | str:
+        raise NotImplementedError
+
+    def decode(self, payload: bytes | str) -> Any:
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    name = "json"
+    binary = False
+
+    def encode(self, obj: Any) -> str:
+        return to_json(obj)
+
+    def decode(self, payload: bytes | str) -> Any:
+        return json.loads(payload)
+
+
+class MsgPackCodec(Codec):
+    name = "msgpack"
+
+    def encode(self, obj: Any) -> bytes:
+        return msgpack_dumps(obj)
+
+    def decode(self, payload: bytes | str) -> Any:
+        return msgpack_loads(payload)
+
+
+class ZlibCodec(Codec):
+    """Deflate-compress the output of ``inner``."""
+
+    def __init__(self, inner: Codec, level: int = 6) -> None:
+        self.inner = inner
+        self.level = level
+        self.name = f"{inner.name}-zlib"
+
+    def encode(self, obj: Any) -> bytes:
+        data = self.inner.encode(obj)
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return zlib.compress(data, self.level)
+
+    def decode(self, payload: bytes | str) -> Any:
+        return self.inner.decode(zlib.decompress(payload))
+
+
+# --- Schema-driven battle encoding -------------------------------------
+_TYPE_NAME_TO_ID = {name: type_id for type_id, name in POKEMON_TYPES.items()}
+_UNKNOWN_TYPE = 0xFF
+BATTLE_SCHEMA_VERSION = 1
+
+
+def _encode_pokemon(p: Dict[str, Any]) -> list:
+    t1, t2 = p["types"]
+    hp, max_hp = p["hp"]
+    return [
+        p["dex"],
+        p["name"],
+        p["level"],
+        hp,
+        max_hp,
+        _TYPE_NAME_TO_ID.get(t1, _UNKNOWN_TYPE),
+        _TYPE_NAME_TO_ID.get(t2, _UNKNOWN_TYPE),
+        p["status"],
+        [[m.get("id", 0), m["pp"][0], m["pp"][1]] for m in p["moves"]],
+    ]
+
+
+def _decode_pokemon(row: list) -> Dict[str, Any]:
+    dex, name, level, hp, max_hp, t1, t2, status, moves = row
+    return {
+        "dex": dex,
+        "name": name,
+        "level": level,
+        "hp": (hp, max_hp),
+        "types": (POKEMON_TYPES.get(t1, "Unknown"), POKEMON_TYPES.get(t2, "Unknown")),
+        "status": status,
+        # Static move metadata (name, power, type, effect...) is resolved by id client side.
+        "moves": [{"id": mid, "pp": (rem, total)} for mid, rem, total in moves],
+    }
+
+
+class BattleSchemaCodec(Codec):
+    """
+    MessagePack codec with a fixed positional layout for battle scene
+    payloads (``{"battle_id", "turn", "timestamp", "scene", ...}``).
+
+    Pokémon become ``[dex, name, level, hp, max_hp, type1_id, type2_id,
+    status, [[move_id, pp, max_pp], ...]]``; the long, repeated move strings
+    are never sent.  Other payloads fall back to plain MessagePack.
+    """
+
+    name = "battle-v1"
+
+    def encode(self, obj: Any) -> bytes:
+        scene = obj.get("scene") if isinstance(obj, dict) else None
+        if not isinstance(scene, dict) or "enemy" not in scene:
+            return msgpack_dumps([0, obj])
+        header = {k: v for k, v in obj.items() if k != "scene"}
+        body = [
+            _encode_pokemon(scene["enemy"]),
+            _encode_pokemon(scene["on_battle"]),
+            [_encode_pokemon(p) for p in scene["party"]],
+        ]
+        return msgpack_dumps([BATTLE_SCHEMA_VERSION, header, body])
+
+    def decode(self, payload: bytes | str) -> Any:
+        decoded = msgpack_loads(payload)
+        if decoded[0] == 0:
+            return decoded[1]
+        if decoded[0] != BATTLE_SCHEMA_VERSION:
+            raise ValueError(f"Unsupported battle schema version {decoded[0]}")
+        _, header, (enemy, on_battle, party) = decoded
+        result = dict(header)
+        result["scene"] = {
+            "enemy": _decode_pokemon(enemy),
+            "on_battle": _decode_pokemon(on_battle),
+            "party": [_decode_pokemon(p) for p in party],
+        }
+        return result
+
+
+JSON_CODEC = JsonCodec()
+
+CODECS: Dict[str, Codec] = {
+    codec.name: codec
+    for codec in (
+        JSON_CODEC,
+        MsgPackCodec(),
+        ZlibCodec(JSON_CODEC),
+        ZlibCodec(MsgPackCodec()),
+        BattleSchemaCodec(),
+    )
+}
+
+
+def get_codec(name: Optional[str]) -> Codec:
+    """Return the codec registered under ``name`` (``None``/empty -> JSON)."""
+    if not name:
+        return JSON_CODEC
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown codec {name!r} (available: {', '.join(CODECS)})") from None
+
+
+def register_codec(codec: Codec) -> None:
+    CODECS[codec.name] = codec
+
+
+def codec_topic(topic: str, codec: Codec) -> str:
+    """Topic on which payloads encoded with ``codec`` are exchanged."""
+    if codec.name == JSON_CODEC.name:
+        return topic
+    return f"{topic.rstrip('/')}/{codec.name}"
+
+
+__all__ = [
+    "Codec",
+    "JsonCodec",
+    "MsgPackCodec",
+    "ZlibCodec",
+    "BattleSchemaCodec",
+    "CODECS",
+    "JSON_CODEC",
+    "get_codec",
+    "register_codec",
+    "codec_topic",
+    "msgpack_dumps",
+    "msgpack_loads",
+]
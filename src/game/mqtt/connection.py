@@ -0,0 +1,254 @@
+"""Shared MQTT connections multiplexing many emulator sessions.
+
+Each :class:`~game.mqtt.client.MQTTClient` is a lightweight *session* view
+(``base_topic`` + handlers).  Sessions talking to the same broker share a
+small pool of :class:`SharedConnection` objects managed by a
+:class:`ConnectionManager`; every connection owns exactly one paho network
+thread and one outbound sender thread, so running 32 bots over a pool of 2
+costs 4 threads and 2 sockets instead of 64 threads and 32 sockets.
+
+Inbound messages are routed to sessions by ``base_topic`` prefix through a
+:class:`~game.mqtt.router.PrefixTrie`.  Identical subscriptions from several
+sessions are reference counted and sent to the broker once.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import paho.mqtt.client as mqtt
+
+from game.mqtt.publisher import AsyncPublisher, OutboundMessage
+from game.mqtt.router import PrefixTrie
+from game.mqtt.transport import create_transport
+from game.utils.metrics import REGISTRY
+
+
+_PUBLISHED_MESSAGES = REGISTRY.counter("pkm_mqtt_published_messages_total", "MQTT messages published")
+_PUBLISHED_BYTES = REGISTRY.counter("pkm_mqtt_published_bytes_total", "MQTT payload bytes published")
+_CONNECTIONS = REGISTRY.gauge("pkm_mqtt_connections", "Open shared MQTT connections")
+_SESSIONS = REGISTRY.gauge("pkm_mqtt_sessions", "MQTT sessions attached to shared connections")
+
+
+@dataclass(slots=True)
+class MQTTConfig:
+    host: str = os.getenv("MQTT_BROKER", "test.mosquitto.org")
+    port: int = int(os.getenv("MQTT_PORT", "1883"))
+    keepalive: int = 30
+    client_id: Optional[str] = os.getenv("MQTT_CLIENT_ID", None)
+    use_tls: bool = False
+    username: Optional[str] = os.getenv("MQTT_USERNAME", None)
+    password: Optional[str] = os.getenv("MQTT_PASSWORD", None)
+    transport: str = os.getenv("MQTT_TRANSPORT", "paho")  # "paho" or "local" (in-process broker)
+
+    @property
+    def broker_key(self) -> Tuple[Any, ...]:
+        return (self.transport, self.host, self.port, self.use_tls, self.username)
+
+
+class SharedConnection:
+    """One transport client (one socket, one network thread) serving several sessions."""
+
+    def __init__(
+        self,
+        config: MQTTConfig,
+        logger,
+        *,
+        index: int = 0,
+        max_pending: int = 1000,
+        max_publish_rate: Optional[float] = None,
+    ) -> None:
+        self.config = config
+        self.logger = logger
+        self.index = index
+        self._client = self._create_client()
+        self._connected = threading.Event()
+        self._lock = threading.Lock()
+        self._sessions: PrefixTrie = PrefixTrie()
+        self._subscriptions: Dict[str, int] = {}  # topic filter -> number of sessions using it
+        self._client.user_data_set({"logger": logger})
+        self._client.on_connect = self._on_connect
+        self._client.on_disconnect = self._on_disconnect
+        self._client.on_message = self._on_message
+        self._client.on_subscribe = self._on_subscribe
+        self._client.on_unsubscribe = self._on_unsubscribe
+        self._publisher = AsyncPublisher(
+            self._send,
+            max_pending=max_pending,
+            max_rate=max_publish_rate,
+            logger=logger,
+            name=f"mqtt-publisher-{index}",
+        )
+        self._loop_started = False
+
+    # ------------------------------------------------------------------
+    # Life-cycle
+    # ------------------------------------------------------------------
+    def _create_client(self) -> mqtt.Client:
+        base_id = self.config.client_id or f"pyboy-{uuid.uuid4().hex[:10]}"
+        client_id = base_id if self.index == 0 else f"{base_id}-{self.index}"
+        client = create_transport(self.config.transport, client_id)
+        if self.config.username:
+            client.username_pw_set(self.config.username, self.config.password)
+        if self.config.use_tls:
+            client.tls_set()
+        return client
+
+    def connect(self) -> None:
+        if self._client.is_connected():
+            return
+        self.logger.info(
+            "Connecting to MQTT broker {}:{} (connection #{}, transport={})",
+            self.config.host, self.config.port, self.index, self.config.transport,
+        )
+        self._connected.clear()
+        self._client.connect(self.config.host, self.config.port, self.config.keepalive)
+        if not self._loop_started:
+            self._client.loop_start()
+            self._loop_started = True
+        if not self._connected.wait(timeout=5.0):
+            self.logger.warning("MQTT connection timeout")
+
+    def close(self) -> None:
+        self._publisher.close()
+        try:
+            if self._loop_started:
+                self._client.loop_stop()
+                self._loop_started = False
+            if self._client.is_connected():
+                self._client.disconnect()
+        finally:
+            self._connected.clear()
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+    def attach(self, session) -> None:
+        with self._lock:
+            self._sessions.insert(session.base_topic, session)
+
+    def detach(self, session) -> None:
+        with self._lock:
+            self._sessions.remove(session.base_topic, session)
+
+    @property
+    def session_count(self) -> int:
+        return len(self._sessions)
+
+    def subscribe(self, topic: str) -> None:
+        with self._lock:
+            count = self._subscriptions.get(topic, 0)
+            self._subscriptions[topic] = count + 1
+        if count == 0:
+            self._client.subscribe(topic)
+
+    def unsubscribe(self, topic: str) -> None:
+        with self._lock:
+            count = self._subscriptions.get(topic, 0) - 1
+            if count > 0:
+                self._subscriptions[topic] = count
+                return
+            self._subscriptions.pop(topic, None)
+        self._client.unsubscribe(topic)
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+    def publish(self, message: OutboundMessage) -> bool:
+        return self._publisher.submit(message)
+
+    def _send(self, message: OutboundMessage) -> None:
+        self._client.publish(message.topic, payload=message.payload, qos=message.qos, retain=message.retain)
+        _PUBLISHED_MESSAGES.inc()
+        payload = message.payload
+        _PUBLISHED_BYTES.inc(len(payload.encode("utf-8")) if isinstance(payload, str) else len(payload))
+
+    # ------------------------------------------------------------------
+    # paho callbacks (userdata first)
+    # ------------------------------------------------------------------
+    def _on_connect(self, client: mqtt.Client, userdata: Any, flags, reason_code, properties=None):
+        if reason_code.is_failure:
+            self.logger.error("MQTT connection failed: {}", reason_code)
+            return
+        self.logger.info("MQTT connected (rc={}, connection #{})", reason_code.value, self.index)
+        with self._lock:
+            topics = list(self._subscriptions)
+        for topic in topics:  # restore subscriptions after a reconnect
+            client.subscribe(topic)
+        self._connected.set()
+
+    def _on_disconnect(self, client: mqtt.Client, userdata: Any, disconnect_flags, reason_code, properties=None):
+        self.logger.warning("MQTT disconnected: {} (flags={})", reason_code, disconnect_flags)
+        self._connected.clear()
+
+    def _on_message(self, client: mqtt.Client, userdata: Any, message: mqtt.MQTTMessage) -> None:
+        sessions = self._sessions.match(message.topic)
+        if not sessions:
+            self.logger.debug("MQTT message on {} matches no session", message.topic)
+            return
+        for session in sessions:
+            session._dispatch(message.topic, message.payload)
+
+    def _on_subscribe(self, client: mqtt.Client, userdata: Any, mid: int, reason_codes, properties=None):
+        self.logger.info("Subscribed to topic (mid={})", mid)
+
+    def _on_unsubscribe(self, client: mqtt.Client, userdata: Any, mid: int, reason_codes, properties=None):
+        self.logger.info("Unsubscribed from topic (mid={})", mid)
+
+
+class ConnectionManager:
+    """Assign sessions to at most ``pool_size`` connections per broker (least loaded first)."""
+
+    def __init__(self, pool_size: int = 1) -> None:
+        self.pool_size = max(1, pool_size)
+        self._lock = threading.Lock()
+        self._pools: Dict[Tuple[Any, ...], List[SharedConnection]] = {}
+        self._owner: Dict[int, SharedConnection] = {}  # id(session) -> connection
+
+    def acquire(
+        self,
+        session,
+        *,
+        max_pending: int = 1000,
+        max_publish_rate: Optional[float] = None,
+    ) -> SharedConnection:
+        with self._lock:
+            pool = self._pools.setdefault(session.config.broker_key, [])
+            if len(pool) < self.pool_size:
+                connection = SharedConnection(
+                    session.config,
+                    session.logger,
+                    index=len(pool),
+                    max_pending=max_pending,
+                    max_publish_rate=max_publish_rate,
+                )
+                pool.append(connection)
+                _CONNECTIONS.inc()
+            else:
+                connection = min(pool, key=lambda c: c.session_count)
+            connection.attach(session)
+            self._owner[id(session)] = connection
+            _SESSIONS.inc()
+        return connection
+
+    def release(self, session) -> None:
+        with self._lock:
+            connection = self._owner.pop(id(session), None)
+            if connection is None:
+                return
+            connection.detach(session)
+            _SESSIONS.dec()
+            if connection.session_count:
+                return
+            self._pools[session.config.broker_key].remove(connection)
+            _CONNECTIONS.dec()
+        connection.close()
+
+
+DEFAULT_MANAGER = ConnectionManager(int(os.getenv("MQTT_POOL_SIZE", "1")))
+
+
+__all__ = ["MQTTConfig", "SharedConnection", "ConnectionManager", "DEFAULT_MANAGER"]
@@ -0,0 +1,185 @@
+"""Asynchronous outbound MQTT queue with per-topic coalescing and backpressure.
+
+:class:`MQTTClient.publish` only enqueues; a dedicated sender thread drains
+the queue.  A slow broker therefore never blocks the services thread:
+
+* retained (state) topics are *coalesced*: only the newest payload per topic
+  is kept, older unsent ones are replaced;
+* other topics keep a FIFO per topic, bounded globally by ``max_pending``;
+  on overflow the oldest message of that topic is dropped (or the new one if
+  the topic has nothing queued);
+* topics are drained round-robin, optionally rate limited by a token bucket
+  (``max_rate`` msg/s), so a burst on one topic cannot starve the others.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional
+
+from game.utils.metrics import REGISTRY
+
+
+_ENQUEUED = REGISTRY.counter("pkm_mqtt_outbound_enqueued_total", "Messages handed to the outbound queue")
+_COALESCED = REGISTRY.counter(
+    "pkm_mqtt_outbound_coalesced_total", "Retained messages replaced by a newer value before being sent"
+)
+_DROPPED = REGISTRY.counter(
+    "pkm_mqtt_outbound_dropped_total", "Messages dropped by the outbound queue", label_names=("reason",)
+)
+_SEND_ERRORS = REGISTRY.counter("pkm_mqtt_outbound_send_errors_total", "Errors raised while sending")
+_PENDING = REGISTRY.gauge("pkm_mqtt_outbound_pending", "Messages waiting in the outbound queue")
+_DROPPED_OVERFLOW = _DROPPED.labels("overflow")
+_DROPPED_CLOSED = _DROPPED.labels("closed")
+
+
+@dataclass(slots=True)
+class OutboundMessage:
+    topic: str
+    payload: str | bytes
+    qos: int = 0
+    retain: bool = False
+
+
+SendFn = Callable[[OutboundMessage], None]
+
+
+class AsyncPublisher:
+    """Bounded outbound queue drained by one sender thread."""
+
+    def __init__(
+        self,
+        send: SendFn,
+        *,
+        max_pending: int = 1000,
+        max_rate: Optional[float] = None,
+        logger=None,
+        name: str = "mqtt-publisher",
+    ) -> None:
+        self._send = send
+        self.max_pending = max_pending
+        self.max_rate = max_rate
+        self.logger = logger
+
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Deque[OutboundMessage]] = {}
+        self._ready: Deque[str] = deque()  # topics with pending messages, round-robin order
+        self._pending = 0
+        self._closed = False
+
+        # token bucket for max_rate
+        self._tokens = float(max_rate or 0.0)
+        self._last_refill = time.monotonic()
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Producer side (never blocks on the network)
+    # ------------------------------------------------------------------
+    def submit(self, message: OutboundMessage) -> bool:
+        """Queue ``message``; returns ``False`` if it was dropped."""
+        with self._cond:
+            if self._closed:
+                _DROPPED_CLOSED.inc()
+                return False
+
+            queue = self._queues.get(message.topic)
+
+            if message.retain and queue:
+                # last-value coalescing: a newer state supersedes what is queued
+                dropped = len(queue)
+                queue.clear()
+                queue.append(message)
+                self._pending -= dropped - 1
+                _PENDING.set(self._pending)
+                _COALESCED.inc(dropped)
+                _ENQUEUED.inc()
+                return True
+
+            if self._pending >= self.max_pending:
+                if not queue:
+                    _DROPPED_OVERFLOW.inc()
+                    return False
+                # may leave the deque empty: the topic stays in _ready and
+                # _next_message discards it if nothing is appended
+                queue.popleft()
+                self._pending -= 1
+                _DROPPED_OVERFLOW.inc()
+
+            if queue is None:
+                queue = self._queues[message.topic] = deque()
+                self._ready.append(message.topic)
+            queue.append(message)
+            self._pending += 1
+            _PENDING.set(self._pending)
+            _ENQUEUED.inc()
+            self._cond.notify()
+            return True
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    # ------------------------------------------------------------------
+    # Sender thread
+    # ------------------------------------------------------------------
+    def _next_message(self) -> Optional[OutboundMessage]:
+        with self._cond:
+            while True:
+                while not self._ready and not self._closed:
+                    self._cond.wait()
+                if not self._ready:
+                    return None
+                topic = self._ready.popleft()
+                queue = self._queues[topic]
+                if not queue:
+                    # emptied by an overflow drop
+                    del self._queues[topic]
+                    continue
+                message = queue.popleft()
+                if queue:
+                    self._ready.append(topic)
+                else:
+                    del self._queues[topic]
+                self._pending -= 1
+                _PENDING.set(self._pending)
+                return message
+
+    def _throttle(self) -> None:
+        if not self.max_rate:
+            return
+        now = time.monotonic()
+        self._tokens = min(self.max_rate, self._tokens + (now - self._last_refill) * self.max_rate)
+        self._last_refill = now
+        if self._tokens < 1.0:
+            time.sleep((1.0 - self._tokens) / self.max_rate)
+            self._tokens = 1.0
+            self._last_refill = time.monotonic()
+        self._tokens -= 1.0
+
+    def _run(self) -> None:
+        while True:
+            message = self._next_message()
+            if message is None:
+                return
+            self._throttle()
+            try:
+                self._send(message)
+            except Exception as exc:  # pragma: no cover - defensive logging
+                _SEND_ERRORS.inc()
+                if self.logger is not None:
+                    self.logger.warning("MQTT publish to {} failed: {}", message.topic, exc)
+
+    # ------------------------------------------------------------------
+    def close(self, timeout: float = 2.0) -> None:
+        """Stop accepting messages, drain what is queued for up to ``timeout`` seconds."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=timeout)
+
+
+__all__ = ["AsyncPublisher", "OutboundMessage"]
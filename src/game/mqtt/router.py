@@ -0,0 +1,276 @@
+"""Topic tries used to route inbound MQTT messages.
+
+* :class:`PrefixTrie` maps whole-level topic prefixes (session base topics)
+  to values;
+* :class:`TopicTrie` maps MQTT subscription filters, ``+`` and ``#``
+  included, to handlers.
+"""
+from __future__ import annotations
+
+from typing import Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+SINGLE_LEVEL = "+"
+MULTI_LEVEL = "#"
+
+
+def split_topic(topic: str) -> List[str]:
+    """Split a topic into its levels (``"/a/b"`` -> ``["", "a", "b"]``, as MQTT does)."""
+    return topic.split("/")
+
+
+def validate_filter(topic_filter: str) -> List[str]:
+    """Split ``topic_filter`` and check the MQTT wildcard rules; raises :class:`ValueError`."""
+    if not topic_filter:
+        raise ValueError("Empty topic filter")
+    levels = split_topic(topic_filter)
+    for index, level in enumerate(levels):
+        if MULTI_LEVEL in level and (level != MULTI_LEVEL or index != len(levels) - 1):
+            raise ValueError(f"'#' must be the last, whole level: {topic_filter!r}")
+        if SINGLE_LEVEL in level and level != SINGLE_LEVEL:
+            raise ValueError(f"'+' must occupy a whole level: {topic_filter!r}")
+    return levels
+
+
+def topic_matches(topic_filter: str, topic: str) -> bool:
+    """``True`` if ``topic`` matches ``topic_filter`` (one-off check, no trie needed)."""
+    filter_levels = split_topic(topic_filter)
+    topic_levels = split_topic(topic)
+    if topic.startswith("$") and filter_levels[0] in (SINGLE_LEVEL, MULTI_LEVEL):
+        return False
+    for index, level in enumerate(filter_levels):
+        if level == MULTI_LEVEL:
+            return True
+        if index >= len(topic_levels):
+            return False
+        if level != SINGLE_LEVEL and level != topic_levels[index]:
+            return False
+    return len(filter_levels) == len(topic_levels)
+
+
+def filter_covers(outer: str, inner: str) -> bool:
+    """``True`` if every topic matching ``inner`` also matches ``outer``."""
+    outer_levels, inner_levels = split_topic(outer), split_topic(inner)
+    for index, level in enumerate(outer_levels):
+        if level == MULTI_LEVEL:
+            return True
+        if index >= len(inner_levels):
+            return False
+        inner_level = inner_levels[index]
+        if inner_level == MULTI_LEVEL:
+            return False
+        if level != SINGLE_LEVEL and level != inner_level:
+            return False
+    return len(outer_levels) == len(inner_levels)
+
+
+def filters_overlap(a: str, b: str) -> bool:
+    """``True`` if some topic matches both filters."""
+    a_levels, b_levels = split_topic(a), split_topic(b)
+    for la, lb in zip(a_levels, b_levels):
+        if la == MULTI_LEVEL or lb == MULTI_LEVEL:
+            return True
+        if la != lb and la != SINGLE_LEVEL and lb != SINGLE_LEVEL:
+            return False
+    if len(a_levels) == len(b_levels):
+        return True
+    longer = a_levels if len(a_levels) > len(b_levels) else b_levels
+    return longer[min(len(a_levels), len(b_levels))] == MULTI_LEVEL  # "a/#" also matches "a"
+
+
+def _widen(a: str, b: str) -> str:
+    """Narrowest filter of this form covering both ``a`` and ``b``."""
+    if filter_covers(a, b):
+        return a
+    if filter_covers(b, a):
+        return b
+    a_levels, b_levels = split_topic(a), split_topic(b)
+    out: List[str] = []
+    for la, lb in zip(a_levels, b_levels):
+        if la == MULTI_LEVEL or lb == MULTI_LEVEL:
+            out.append(MULTI_LEVEL)
+            return "/".join(out)
+        out.append(la if la == lb else SINGLE_LEVEL)
+    if len(a_levels) != len(b_levels):
+        out.append(MULTI_LEVEL)
+    return "/".join(out)
+
+
+def merge_filters(filters: Iterable[str]) -> List[str]:
+    """
+    Non-overlapping filters covering ``filters``: a broker sends one copy of
+    a message per matching subscription, so subscribing to these instead
+    delivers each message once.  Filters covered by another are dropped,
+    partially overlapping ones are widened (``a/+/c`` + ``a/b/+`` ->
+    ``a/+/+``), which may bring topics no original filter matches.
+    """
+    merged: List[str] = []
+    for topic_filter in filters:
+        while True:
+            other = next((m for m in merged if filters_overlap(m, topic_filter)), None)
+            if other is None:
+                merged.append(topic_filter)
+                break
+            merged.remove(other)
+            topic_filter = _widen(other, topic_filter)
+    return merged
+
+
+class _Node(Generic[V]):
+    __slots__ = ("children", "values")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_Node[V]"] = {}
+        self.values: List[V] = []
+
+
+class PrefixTrie(Generic[V]):
+    """
+    Map topic *prefixes* (whole levels) to values.
+
+    ``match(topic)`` walks the topic once and returns every value registered
+    on a prefix of it, i.e. O(topic depth) regardless of how many prefixes
+    (sessions) are registered.  A trailing ``/`` on a prefix is ignored, so
+    ``"bots/7/"`` matches ``"bots/7/battle/move"`` but not ``"bots/70/..."``.
+    """
+
+    def __init__(self) -> None:
+        self._root: _Node[V] = _Node()
+        self._size = 0
+
+    @staticmethod
+    def _levels(prefix: str) -> List[str]:
+        return split_topic(prefix[:-1] if prefix.endswith("/") else prefix)
+
+    def insert(self, prefix: str, value: V) -> None:
+        node = self._root
+        for level in self._levels(prefix):
+            node = node.children.setdefault(level, _Node())
+        node.values.append(value)
+        self._size += 1
+
+    def remove(self, prefix: str, value: V) -> bool:
+        path = [self._root]
+        for level in self._levels(prefix):
+            nxt = path[-1].children.get(level)
+            if nxt is None:
+                return False
+            path.append(nxt)
+        node = path[-1]
+        try:
+            node.values.remove(value)
+        except ValueError:
+            return False
+        self._size -= 1
+        # prune empty branches
+        levels = self._levels(prefix)
+        for depth in range(len(levels), 0, -1):
+            child = path[depth]
+            if child.values or child.children:
+                break
+            del path[depth - 1].children[levels[depth - 1]]
+        return True
+
+    def match(self, topic: str) -> List[V]:
+        found: List[V] = list(self._root.values)
+        node: Optional[_Node[V]] = self._root
+        for level in split_topic(topic):
+            node = node.children.get(level)
+            if node is None:
+                break
+            if node.values:
+                found.extend(node.values)
+        return found
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[V]:
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            yield from node.values
+            stack.extend(node.children.values())
+
+
+class TopicTrie(Generic[V]):
+    """
+    Map MQTT topic *filters* (with ``+`` / ``#`` wildcards) to values.
+
+    ``match(topic)`` returns the values of every filter matching ``topic``
+    (fan-out), visiting at most the exact, ``+`` and ``#`` children per
+    level: O(topic depth) and independent of the number of filters.  As in
+    MQTT, ``a/#`` also matches ``a`` and wildcards in the first level never
+    match ``$``-prefixed (broker) topics.
+    """
+
+    def __init__(self) -> None:
+        self._root: _Node[V] = _Node()
+        self._size = 0
+
+    def insert(self, topic_filter: str, value: V) -> None:
+        node = self._root
+        for level in validate_filter(topic_filter):
+            node = node.children.setdefault(level, _Node())
+        node.values.append(value)
+        self._size += 1
+
+    def remove(self, topic_filter: str, value: V) -> bool:
+        levels = split_topic(topic_filter)
+        path = [self._root]
+        for level in levels:
+            nxt = path[-1].children.get(level)
+            if nxt is None:
+                return False
+            path.append(nxt)
+        try:
+            path[-1].values.remove(value)
+        except ValueError:
+            return False
+        self._size -= 1
+        for depth in range(len(levels), 0, -1):
+            child = path[depth]
+            if child.values or child.children:
+                break
+            del path[depth - 1].children[levels[depth - 1]]
+        return True
+
+    def match(self, topic: str) -> List[V]:
+        levels = split_topic(topic)
+        last = len(levels)
+        found: List[V] = []
+        stack: List[Tuple[_Node[V], int]] = [(self._root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            wildcards = not (depth == 0 and topic.startswith("$"))
+            if wildcards:
+                multi = node.children.get(MULTI_LEVEL)
+                if multi is not None:
+                    found.extend(multi.values)
+            if depth == last:
+                found.extend(node.values)
+                continue
+            exact = node.children.get(levels[depth])
+            if exact is not None:
+                stack.append((exact, depth + 1))
+            if wildcards:
+                single = node.children.get(SINGLE_LEVEL)
+                if single is not None:
+                    stack.append((single, depth + 1))
+        return found
+
+    def __len__(self) -> int:
+        return self._size
+
+
+__all__ = [
+    "PrefixTrie",
+    "TopicTrie",
+    "filter_covers",
+    "filters_overlap",
+    "merge_filters",
+    "split_topic",
+    "topic_matches",
+    "validate_filter",
+]
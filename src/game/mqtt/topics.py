@@ -5,13 +5,27 @@ import os
 BASE_TOPIC = os.getenv("MQTT_BASE_TOPIC", "/dforirdod/PKM/")
 BATTLE_INFO_TOPIC = f"{BASE_TOPIC}battle/info"
 BATTLE_MOVE_TOPIC = f"{BASE_TOPIC}battle/move"
+BATTLE_DELTA_TOPIC = f"{BASE_TOPIC}battle/delta"
+BATTLE_RESYNC_TOPIC = f"{BASE_TOPIC}battle/resync"
+BATTLE_RESULT_TOPIC = f"{BASE_TOPIC}battle/result"
+BATTLE_LOOKAHEAD_TOPIC = f"{BASE_TOPIC}battle/lookahead"
+BATTLE_LOOKAHEAD_RESULT_TOPIC = f"{BASE_TOPIC}battle/lookahead/result"
 START_TOPIC = f"{BASE_TOPIC}start"
 STATUS_TOPIC = f"{BASE_TOPIC}status"
+PROFILE_TOPIC = f"{BASE_TOPIC}debug/profile"
+SCREEN_FRAME_TOPIC = f"{BASE_TOPIC}screen/frame"
 
 __all__ = [
     "BASE_TOPIC",
     "BATTLE_INFO_TOPIC",
     "BATTLE_MOVE_TOPIC",
+    "BATTLE_DELTA_TOPIC",
+    "BATTLE_RESYNC_TOPIC",
+    "BATTLE_RESULT_TOPIC",
+    "BATTLE_LOOKAHEAD_TOPIC",
+    "BATTLE_LOOKAHEAD_RESULT_TOPIC",
     "START_TOPIC",
     "STATUS_TOPIC",
+    "PROFILE_TOPIC",
+    "SCREEN_FRAME_TOPIC",
 ]
@@ -0,0 +1,123 @@
+"""Transports behind :class:`~game.mqtt.connection.SharedConnection`.
+
+A transport is anything exposing the part of :class:`paho.mqtt.client.Client`
+the connection uses (``connect``/``loop_start``/``publish``/``subscribe``…
+and the ``on_*`` callbacks, VERSION2 signatures).  ``MQTT_TRANSPORT``
+selects it:
+
+* ``paho`` (default): a real network client;
+* ``local``: :class:`LocalTransport` on the in-process
+  :data:`~game.mqtt.broker.LOCAL_BROKER`; connecting is immediate and
+  delivery is a function call.  Set ``MQTT_LOCAL_BROKER_PORT`` to also expose
+  that broker on loopback TCP for external processes.
+"""
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import paho.mqtt.client as mqtt
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.reasoncodes import ReasonCode
+
+from game.mqtt.broker import LOCAL_BROKER, LocalBroker
+
+
+@dataclass(slots=True)
+class LocalMessage:
+    """Duck-typed :class:`paho.mqtt.client.MQTTMessage`."""
+
+    topic: str
+    payload: bytes
+    qos: int = 0
+    retain: bool = False
+
+
+class LocalTransport:
+    """paho-compatible client bound to a :class:`LocalBroker`."""
+
+    _mids = itertools.count(1)
+
+    def __init__(self, broker: LocalBroker = LOCAL_BROKER, client_id: str = "") -> None:
+        self.broker = broker
+        self.client_id = client_id
+        self._connected = False
+        self._userdata: Any = None
+        self._filters: Dict[str, Callable[[str, bytes, bool], None]] = {}
+        self.on_connect: Optional[Callable[..., None]] = None
+        self.on_disconnect: Optional[Callable[..., None]] = None
+        self.on_message: Optional[Callable[..., None]] = None
+        self.on_subscribe: Optional[Callable[..., None]] = None
+        self.on_unsubscribe: Optional[Callable[..., None]] = None
+
+    # ------------------------------------------------------------------
+    # paho surface
+    # ------------------------------------------------------------------
+    def user_data_set(self, userdata: Any) -> None:
+        self._userdata = userdata
+
+    def username_pw_set(self, username: Optional[str], password: Optional[str] = None) -> None:
+        return
+
+    def tls_set(self, *args: Any, **kwargs: Any) -> None:
+        return
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def connect(self, host: str = "", port: int = 0, keepalive: int = 0) -> None:
+        self._connected = True
+        if self.on_connect is not None:
+            flags = mqtt.ConnectFlags(session_present=False)
+            self.on_connect(self, self._userdata, flags, ReasonCode(PacketTypes.CONNACK, "Success"), None)
+
+    def loop_start(self) -> None:
+        return
+
+    def loop_stop(self) -> None:
+        return
+
+    def disconnect(self) -> None:
+        for topic_filter, subscriber in self._filters.items():
+            self.broker.unsubscribe(topic_filter, subscriber)
+        self._filters.clear()
+        self._connected = False
+        if self.on_disconnect is not None:
+            flags = mqtt.DisconnectFlags(is_disconnect_packet_from_server=False)
+            reason = ReasonCode(PacketTypes.DISCONNECT, "Normal disconnection")
+            self.on_disconnect(self, self._userdata, flags, reason, None)
+
+    def publish(self, topic: str, payload: str | bytes = b"", qos: int = 0, retain: bool = False) -> None:
+        self.broker.publish(topic, payload, retain)
+
+    def subscribe(self, topic: str) -> None:
+        if topic not in self._filters:
+            subscriber = self._filters[topic] = self._deliver
+            self.broker.subscribe(topic, subscriber)
+        if self.on_subscribe is not None:
+            self.on_subscribe(self, self._userdata, next(self._mids), [], None)
+
+    def unsubscribe(self, topic: str) -> None:
+        subscriber = self._filters.pop(topic, None)
+        if subscriber is not None:
+            self.broker.unsubscribe(topic, subscriber)
+        if self.on_unsubscribe is not None:
+            self.on_unsubscribe(self, self._userdata, next(self._mids), [], None)
+
+    # ------------------------------------------------------------------
+    def _deliver(self, topic: str, payload: bytes, retain: bool) -> None:
+        if self.on_message is not None:
+            self.on_message(self, self._userdata, LocalMessage(topic, payload, 0, retain))
+
+
+def create_transport(name: str, client_id: str) -> Any:
+    """Build the transport called ``name`` (``paho`` or ``local``)."""
+    if name == "paho":
+        return mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id)
+    if name == "local":
+        return LocalTransport(LOCAL_BROKER, client_id)
+    raise ValueError(f"Unknown MQTT transport {name!r} (expected 'paho' or 'local')")
+
+
+__all__ = ["LocalMessage", "LocalTransport", "create_transport"]
@@ -0,0 +1,294 @@
+"""Offline analyzer for 32 KiB SRAM dumps (``.ram`` / ``.sav``), no emulator needed.
+
+The game saves its main data (``MainPokemonData`` from the Pokédex flags
+to the play time), the party and the current box verbatim to bank 1 and
+every PC box to banks 2/3 (see :class:`SavedPokemonData`), so the WRAM
+layouts double as SRAM offsets.  A file is memory-mapped and decoded into
+one row of :data:`SAVE_DTYPE` plus its stored Pokémon
+(:data:`~game.data.boxes.BOX_DTYPE`); directories are processed by a
+process pool into a columnar :class:`SaveDataset`::
+
+    python -m game.offline.sram_file games/ -o saves.npz
+"""
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from game.data.boxes import BOX_DTYPE, SRAM_BANK_BYTES, read_sram_boxes, sram_slice
+from game.data.data import POKEMON_ROM_ID_TO_PKDX_ID
+from game.data.decoder import decode_pkm_name
+from game.data.ram_reader import MainPokemonData, MemoryData, SavedPokemonData
+
+SRAM_BYTES = 4 * SRAM_BANK_BYTES
+SAVE_PATTERNS = ("*.ram", "*.sav")
+
+_MAIN_BANK = 1
+_PARTY_MON_BYTES = 44
+_PARTY_SIZE = 6
+
+
+def _saved(md: MemoryData, wram_block: MemoryData, sram_block: MemoryData) -> MemoryData:
+    """SRAM address of the WRAM field ``md`` saved as part of ``wram_block``."""
+    offset = sram_block.start_address - wram_block.start_address
+    return MemoryData(md.start_address + offset, md.end_address + offset, md.description)
+
+
+def _main(md: MemoryData) -> MemoryData:
+    return _saved(md, MainPokemonData.PokedexOwned, SavedPokemonData.MainData)
+
+
+def _party(md: MemoryData) -> MemoryData:
+    return _saved(md, MainPokemonData.PartyCount, SavedPokemonData.PartyData)
+
+
+# Bank 1 fields
+S_PLAYER_NAME = SavedPokemonData.PlayerName
+S_DEX_OWNED = _main(MainPokemonData.PokedexOwned)
+S_DEX_SEEN = _main(MainPokemonData.PokedexSeen)
+S_BAG_COUNT = _main(MainPokemonData.TotalItems)
+S_MONEY = _main(MainPokemonData.Money)
+S_RIVAL_NAME = _main(MainPokemonData.rival_name)
+S_BADGES = _main(MainPokemonData.Badges)
+S_PLAYER_ID = _main(MemoryData(MainPokemonData.PlayerID1.start_address, MainPokemonData.PlayerID2.end_address))
+S_MAP = _main(MainPokemonData.CurrentMapNumber)
+S_BOX_ITEMS = _main(MainPokemonData.StoredItem)
+S_CURRENT_BOX = _main(MainPokemonData.CurrentBoxNumber)
+S_HOURS = _main(MainPokemonData.GameTimeHours)
+S_MINUTES = _main(MainPokemonData.GameTimeMinutes)
+S_SECONDS = _main(MainPokemonData.GameTimeSeconds)
+S_PARTY_COUNT = _party(MainPokemonData.PartyCount)
+S_PARTY_MONS = _party(MemoryData(
+    MainPokemonData.Pokemon1.start_address,
+    MainPokemonData.Pokemon1.start_address + _PARTY_SIZE * _PARTY_MON_BYTES - 1,
+))
+S_PARTY_NICKNAMES = _party(MemoryData(
+    MainPokemonData.Nickname1.start_address, MainPokemonData.Nickname1.start_address + _PARTY_SIZE * 11 - 1
+))
+
+# The main checksum covers the player name up to the tileset byte
+S_MAIN_CHECKSUMMED = MemoryData(SavedPokemonData.PlayerName.start_address, SavedPokemonData.TilesetType.end_address)
+S_MAIN_CHECKSUM = SavedPokemonData.MainDataChecksum
+# Box banks: one checksum over the six boxes, then one per box
+S_BANK_CHECKSUMMED = MemoryData(SavedPokemonData.Box1.start_address, SavedPokemonData.Box6.end_address)
+S_BANK_CHECKSUMS = ((2, SavedPokemonData.GlobalChecksum_2), (3, SavedPokemonData.GlobalChecksum_3))
+
+SAVE_DTYPE = np.dtype([
+    ("valid", "?"),              # main data checksum matches
+    ("boxes_valid", "?"),        # both box bank checksums match
+    ("player_name", "U20"),
+    ("rival_name", "U20"),
+    ("player_id", "u2"),
+    ("money", "u4"),
+    ("badges", "u1"),            # bitfield
+    ("badge_count", "u1"),
+    ("map", "u1"),
+    ("dex_owned", "u1"),
+    ("dex_seen", "u1"),
+    ("hours", "u1"),
+    ("minutes", "u1"),
+    ("seconds", "u1"),
+    ("bag_items", "u1"),
+    ("box_items", "u1"),
+    ("current_box", "u1"),       # 0-based
+    ("party_count", "u1"),
+    ("party_species", "u1", (_PARTY_SIZE,)),
+    ("party_dex", "u2", (_PARTY_SIZE,)),
+    ("party_levels", "u1", (_PARTY_SIZE,)),
+    ("party_nicknames", "U20", (_PARTY_SIZE,)),
+    ("stored", "u2"),            # Pokémon in the PC boxes
+])
+
+
+# ----------------------------------------------------------------------
+# Single file
+# ----------------------------------------------------------------------
+def checksum(data: bytes) -> int:
+    """Gen 1 save checksum: complement of the byte sum."""
+    return ~sum(data) & 0xFF
+
+
+def _u8(sram, md: MemoryData) -> int:
+    return sram[_MAIN_BANK * SRAM_BANK_BYTES + md.start_address - 0xA000]
+
+
+def _bcd(data: bytes) -> int:
+    value = 0
+    for b in data:
+        value = value * 100 + (b >> 4) * 10 + (b & 0x0F)
+    return value
+
+
+def verify_checksums(sram) -> Tuple[bool, bool]:
+    """``(main data ok, box banks ok)`` for an SRAM image."""
+    main_ok = checksum(sram_slice(sram, _MAIN_BANK, S_MAIN_CHECKSUMMED)) == _u8(sram, S_MAIN_CHECKSUM)
+    boxes_ok = True
+    for bank, stored_md in S_BANK_CHECKSUMS:
+        stored = sram_slice(sram, bank, stored_md)[0]
+        boxes_ok &= checksum(sram_slice(sram, bank, S_BANK_CHECKSUMMED)) == stored
+    return main_ok, boxes_ok
+
+
+def decode_sram(sram) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode an SRAM image into a :data:`SAVE_DTYPE` row and its :data:`BOX_DTYPE` Pokémon."""
+    if len(sram) < SRAM_BYTES:
+        raise ValueError(f"SRAM image is {len(sram)} bytes, expected {SRAM_BYTES}")
+    row = np.zeros((), dtype=SAVE_DTYPE)
+    row["valid"], row["boxes_valid"] = verify_checksums(sram)
+
+    def field(md: MemoryData) -> bytes:
+        return sram_slice(sram, _MAIN_BANK, md)
+
+    row["player_name"] = decode_pkm_name(field(S_PLAYER_NAME))
+    row["rival_name"] = decode_pkm_name(field(S_RIVAL_NAME))
+    row["player_id"] = int.from_bytes(field(S_PLAYER_ID), "big")
+    row["money"] = _bcd(field(S_MONEY))
+    badges = _u8(sram, S_BADGES)
+    row["badges"], row["badge_count"] = badges, bin(badges).count("1")
+    row["map"] = _u8(sram, S_MAP)
+    row["dex_owned"] = sum(bin(b).count("1") for b in field(S_DEX_OWNED))
+    row["dex_seen"] = sum(bin(b).count("1") for b in field(S_DEX_SEEN))
+    row["hours"] = _u8(sram, S_HOURS)
+    row["minutes"] = field(S_MINUTES)[-1]
+    row["seconds"] = _u8(sram, S_SECONDS)
+    row["bag_items"] = _u8(sram, S_BAG_COUNT)
+    row["box_items"] = _u8(sram, S_BOX_ITEMS)
+    row["current_box"] = _u8(sram, S_CURRENT_BOX) & 0x7F
+
+    count = _u8(sram, S_PARTY_COUNT)
+    count = count if count <= _PARTY_SIZE else 0
+    row["party_count"] = count
+    party = np.frombuffer(field(S_PARTY_MONS), dtype=np.uint8).reshape(_PARTY_SIZE, _PARTY_MON_BYTES)[:count]
+    nicknames = field(S_PARTY_NICKNAMES)
+    row["party_species"][:count] = party[:, 0]
+    row["party_dex"][:count] = [POKEMON_ROM_ID_TO_PKDX_ID.get(int(s), 0) for s in party[:, 0]]
+    row["party_levels"][:count] = party[:, 33]
+    row["party_nicknames"][:count] = [decode_pkm_name(nicknames[11 * i:11 * (i + 1)]) for i in range(count)]
+
+    mons = read_sram_boxes(sram).mons
+    row["stored"] = len(mons)
+    return row, mons
+
+
+def analyze_file(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Memory-map ``path`` and decode it (see :func:`decode_sram`)."""
+    with open(path, "rb") as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as sram:
+            return decode_sram(sram)
+
+
+# ----------------------------------------------------------------------
+# Directories
+# ----------------------------------------------------------------------
+@dataclass
+class SaveDataset:
+    """
+    Columnar result of :func:`analyze_paths`: ``saves[i]`` describes
+    ``paths[i]``; ``mons`` holds every stored Pokémon and ``mon_save`` the
+    index of the save it belongs to.  Files that failed to decode are in
+    ``errors``.
+    """
+
+    paths: np.ndarray
+    saves: np.ndarray
+    mons: np.ndarray
+    mon_save: np.ndarray
+    errors: List[Tuple[str, str]]
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, paths=self.paths, saves=self.saves, mons=self.mons, mon_save=self.mon_save)
+
+    @classmethod
+    def load(cls, path: str) -> "SaveDataset":
+        with np.load(path) as data:
+            return cls(data["paths"], data["saves"], data["mons"], data["mon_save"], [])
+
+
+def _analyze_safe(path: str):
+    try:
+        return analyze_file(path)
+    except (OSError, ValueError) as exc:
+        return str(exc)
+
+
+def find_saves(root: str, patterns: Sequence[str] = SAVE_PATTERNS) -> List[str]:
+    base = Path(root)
+    if base.is_file():
+        return [str(base)]
+    return sorted({str(p) for pattern in patterns for p in base.rglob(pattern)})
+
+
+def analyze_paths(paths: Iterable[str], *, workers: Optional[int] = None, chunksize: int = 64) -> SaveDataset:
+    """Decode ``paths`` with a process pool (``workers=1`` runs in-process)."""
+    paths = list(paths)
+    if workers == 1 or len(paths) <= 1:
+        results = list(map(_analyze_safe, paths))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_analyze_safe, paths, chunksize=chunksize))
+
+    ok_paths: List[str] = []
+    rows: List[np.ndarray] = []
+    mons: List[np.ndarray] = []
+    mon_save: List[np.ndarray] = []
+    errors: List[Tuple[str, str]] = []
+    for path, result in zip(paths, results):
+        if isinstance(result, str):
+            errors.append((path, result))
+            continue
+        row, stored = result
+        mon_save.append(np.full(len(stored), len(ok_paths), dtype=np.uint32))
+        ok_paths.append(path)
+        rows.append(row)
+        mons.append(stored)
+    return SaveDataset(
+        paths=np.array(ok_paths, dtype=str),
+        saves=np.array(rows, dtype=SAVE_DTYPE),
+        mons=np.concatenate(mons) if mons else np.zeros(0, dtype=BOX_DTYPE),
+        mon_save=np.concatenate(mon_save) if mon_save else np.zeros(0, dtype=np.uint32),
+        errors=errors,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="a .ram/.sav file or a directory searched recursively")
+    parser.add_argument("-o", "--output", help="write the dataset to this .npz file")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    dataset = analyze_paths(find_saves(args.root), workers=args.workers)
+    for path, save in zip(dataset.paths, dataset.saves):
+        print(
+            f"{path}: {'ok' if save['valid'] else 'bad checksum'}  {save['player_name'] or '-'}"
+            f"  badges {save['badge_count']}  party {save['party_count']}  stored {save['stored']}"
+        )
+    for path, error in dataset.errors:
+        print(f"{path}: {error}")
+    if args.output:
+        dataset.save(args.output)
+        print(f"{len(dataset.saves)} saves, {len(dataset.mons)} stored Pokémon -> {args.output}")
+
+
+__all__ = [
+    "SAVE_DTYPE",
+    "SRAM_BYTES",
+    "SaveDataset",
+    "analyze_file",
+    "analyze_paths",
+    "checksum",
+    "decode_sram",
+    "find_saves",
+    "verify_checksums",
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""Read WRAM/HRAM/SRAM straight out of PyBoy ``.state`` files, without a ``PyBoy``.
+
+A PyBoy state (format 15) is the concatenation of every component's
+``save_state``::
+
+    version, bootrom, key1, double_speed, cgb, [hdma], cpu, lcd, sound,
+    renderer, ram, timer (24), cartridge (4 + RAM banks), interaction (2),
+    serial (36)
+
+with ``ram`` = WRAM (8 KiB, 32 KiB on CGB) | 0x60 unused | I/O 0x4C |
+HRAM 0x7F | I/O 0x34.  The sections before ``ram`` vary in size, so the RAM
+is located by an invariant: Gen 1 copies its OAM DMA routine to HRAM
+0xFF80 at boot.  States saved before that fall back to the fixed size of
+the trailing sections (4 SRAM banks, no RTC).  Files written by
+:class:`~game.core.state.SaveStateManager` carry a header before the
+PyBoy payload (offsets are relative to the whole file) and may be
+compressed (then the decompressed payload is parsed instead).
+
+The French releases keep the Red/Blue (Yellow) layout but every WRAM
+variable from the end of ``wTileMapBackup2`` (0xCEE9) on sits
+:data:`FRENCH_WRAM_SHIFT` bytes later.  The language is not stored in the
+state, so :class:`StateImage` picks the shift under which the RAM passes
+:func:`is_plausible`; :func:`decode_memory` reports ``"valid": false``
+when nothing does instead of decoding garbage.
+
+:class:`StateImage` memory-maps a file and offers ``read_memory`` and
+``read_sram`` like :class:`~game.core.emulator.EmulatorSession`, so RAM
+decoders (boxes, the shared-memory state record...) run on it as is::
+
+    with StateImage.open("games/red_test.gb.state") as image:
+        summary = decode_state(image)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from game.core.shm_channel import pack_state, unpack_state
+from game.core.state import StateHeader, decode_payload, payload_offset
+from game.core.state_codecs import RAW_CODEC
+from game.data.boxes import SRAM_BANK_BYTES, read_boxes
+from game.data.ram_reader import InternalPokemonData, MainPokemonData, MemoryData
+from game.scenes.serializer import SCENE_BLOCK
+
+STATE_PATTERNS = ("*.state", "*.state.bak_*")
+
+WRAM_START, WRAM_BYTES, WRAM_BYTES_CGB = 0xC000, 0x2000, 0x8000
+IO_START, IO_BYTES = 0xFF00, 0x4C
+HRAM_START, HRAM_BYTES = 0xFF80, 0x7F
+IO2_START, IO2_BYTES = 0xFF4C, 0x34
+_UNUSED_BYTES = 0x60
+_SVBK = 0xFF70  # CGB WRAM bank for 0xD000-0xDFFF
+
+_TIMER_BYTES = 24
+_CARTRIDGE_HEADER_BYTES = 4
+_SRAM_BYTES = 4 * SRAM_BANK_BYTES
+_TRAILER_BYTES = 2 + 36  # interaction + serial
+
+# ld a, HIGH(wShadowOAM); ldh [rDMA], a; ld a, $28; .wait: dec a; jr nz, .wait; ret
+OAM_DMA_ROUTINE = bytes.fromhex("3EC3E0463E283D20FDC9")
+assert len(OAM_DMA_ROUTINE) == InternalPokemonData.OamDmaRoutine.size()
+
+MIN_STATE_VERSION = 8  # first version with the cgb flag in the header
+
+# French releases: WRAM from 0xCEE9 (Red/Blue/Yellow address) moved up 5 bytes
+FRENCH_WRAM_SHIFT = 5
+_FRENCH_SHIFT_FROM = 0xCEE9
+WRAM_SHIFTS = (0, FRENCH_WRAM_SHIFT)
+
+_PARTY_SPECIES = MemoryData(0xD164, 0xD16A, "Party species list (up to 6) + 0xFF terminator")
+_BATTLE_TYPES = (0, 1, 2, 0xFF)  # none, wild, trainer, lost
+
+
+@dataclass(frozen=True)
+class StateLayout:
+    """Byte offsets of the memory sections inside one state file."""
+
+    version: int
+    cgb: bool
+    wram: int
+    wram_bytes: int
+    io: int
+    hram: int
+    io2: int
+    sram: Optional[int]   # None when the cartridge section does not match 4 banks
+    initialised: bool     # the game's HRAM routine was found (not a pre-boot state)
+
+
+def locate_sections(buf) -> StateLayout:
+    """Find WRAM/HRAM/SRAM in ``buf`` (``bytes`` or ``mmap``) of a PyBoy state."""
+    base = payload_offset(buf)
+    if len(buf) < base + 5 + WRAM_BYTES + _SRAM_BYTES:
+        raise ValueError(f"State file too small ({len(buf)} bytes)")
+    version, cgb = buf[base], bool(buf[base + 4])
+    if version < MIN_STATE_VERSION:
+        raise ValueError(f"Unsupported PyBoy state version {version}")
+
+    ram_tail = HRAM_BYTES + IO2_BYTES
+    trailer = _TIMER_BYTES + _CARTRIDGE_HEADER_BYTES + _SRAM_BYTES + _TRAILER_BYTES
+    hram = buf.rfind(OAM_DMA_ROUTINE, 0, len(buf) - _SRAM_BYTES)
+    initialised = hram >= 0
+    if not initialised:
+        hram = len(buf) - trailer - ram_tail
+
+    io = hram - IO_BYTES
+    wram_bytes = WRAM_BYTES_CGB if cgb else WRAM_BYTES
+    wram = io - _UNUSED_BYTES - wram_bytes
+    if wram < base + 5:
+        raise ValueError("Could not locate the RAM section")
+    sram = hram + ram_tail + _TIMER_BYTES + _CARTRIDGE_HEADER_BYTES
+    if sram + _SRAM_BYTES + _TRAILER_BYTES != len(buf):
+        sram = None
+    return StateLayout(version, cgb, wram, wram_bytes, io, hram, hram + HRAM_BYTES, sram, initialised)
+
+
+class StateImage:
+    """
+    Read-only memory view of a state file.
+
+    Addresses are Red/Blue ones; ``is_yellow`` (default: the state ran in
+    CGB mode, which in this repo means Yellow) applies the same shift as
+    :meth:`MemoryData.get_pkm_yellow_addresses`, and ``wram_shift`` the
+    language one (default: detected, see :func:`detect_wram_shift`).
+    """
+
+    def __init__(
+        self,
+        buf,
+        *,
+        is_yellow: Optional[bool] = None,
+        wram_shift: Optional[int] = None,
+        path: Optional[str] = None,
+    ):
+        header = StateHeader.unpack(buf)
+        if header is not None and header.codec != RAW_CODEC.id:
+            buf = decode_payload(buf)  # compressed: parse the decompressed copy
+        self.buf = buf
+        self.path = path
+        self.layout = locate_sections(buf)
+        self.is_yellow = self.layout.cgb if is_yellow is None else is_yellow
+        self.wram_shift = 0
+        if wram_shift is not None:
+            self.wram_shift = wram_shift
+        elif self.layout.initialised:
+            self.wram_shift = detect_wram_shift(self)
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None  # owned by open(); self.buf may be a decompressed copy
+
+    @classmethod
+    def open(
+        cls, path: str, *, is_yellow: Optional[bool] = None, wram_shift: Optional[int] = None
+    ) -> "StateImage":
+        fh = open(path, "rb")
+        try:
+            buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            fh.close()
+            raise
+        try:
+            image = cls(buf, is_yellow=is_yellow, wram_shift=wram_shift, path=path)
+        except Exception:
+            buf.close()
+            fh.close()
+            raise
+        image._file = fh
+        image._mmap = buf
+        return image
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._mmap.close()
+            self._file.close()
+            self._file = None
+            self._mmap = None
+
+    def __enter__(self) -> "StateImage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    def _offset(self, address: int, size: int) -> int:
+        layout = self.layout
+        end = address + size
+        if WRAM_START <= address and end <= WRAM_START + WRAM_BYTES:
+            offset = layout.wram + address - WRAM_START
+            if layout.cgb and end > 0xD000:
+                bank = (self.buf[layout.io2 + _SVBK - IO2_START] & 0x07) or 1
+                if bank != 1 and address < 0xD000:
+                    raise ValueError(f"Read across the CGB WRAM bank boundary at {address:#06x}")
+                offset += (bank - 1) * 0x1000
+            return offset
+        if HRAM_START <= address and end <= HRAM_START + HRAM_BYTES:
+            return layout.hram + address - HRAM_START
+        if IO_START <= address and end <= IO_START + IO_BYTES:
+            return layout.io + address - IO_START
+        if IO2_START <= address and end <= IO2_START + IO2_BYTES:
+            return layout.io2 + address - IO2_START
+        raise ValueError(f"Address range {address:#06x}..{end - 1:#06x} is not stored as one section")
+
+    def read_memory(self, elem: MemoryData) -> bytes:
+        if self.is_yellow:
+            elem = MemoryData.shift_for_yellow(elem)
+        if self.wram_shift:
+            elem = _shift_language(elem, self.wram_shift)
+        offset = self._offset(elem.start_address, elem.size())
+        return bytes(self.buf[offset:offset + elem.size()])
+
+    def read_sram(self, bank: int, elem: MemoryData) -> bytes:
+        if self.layout.sram is None:
+            raise ValueError("Cartridge RAM not found in this state")
+        start = self.layout.sram + bank * SRAM_BANK_BYTES + elem.start_address - 0xA000
+        return bytes(self.buf[start:start + elem.size()])
+
+
+def _shift_language(data: MemoryData, shift: int) -> MemoryData:
+    """``data`` moved by ``shift`` from 0xCEE9 on (applied after the Yellow shift)."""
+    shift_start = shift if data.start_address >= _FRENCH_SHIFT_FROM else 0
+    shift_end = shift if data.end_address >= _FRENCH_SHIFT_FROM else 0
+    return MemoryData(data.start_address + shift_start, data.end_address + shift_end, data.description)
+
+
+# ----------------------------------------------------------------------
+# Decoders
+# ----------------------------------------------------------------------
+def _u8(memory, md: MemoryData) -> int:
+    return memory.read_memory(md)[0]
+
+
+def is_plausible(memory) -> bool:
+    """
+    Whether the RAM reads as an initialised Gen 1 game at these addresses:
+    at most 6 party Pokémon, a species list ending with 0xFF right after
+    them, and a battle type of none, wild, trainer or lost.
+    """
+    count = _u8(memory, MainPokemonData.PartyCount)
+    if count > 6:
+        return False
+    species = memory.read_memory(_PARTY_SPECIES)
+    if species[count] != 0xFF or 0xFF in species[:count]:
+        return False
+    return _u8(memory, MainPokemonData.BattleTypeID) in _BATTLE_TYPES
+
+
+def detect_wram_shift(image: "StateImage") -> int:
+    """First of :data:`WRAM_SHIFTS` under which ``image`` is plausible (0 if none)."""
+    for shift in WRAM_SHIFTS:
+        image.wram_shift = shift
+        if is_plausible(image):
+            return shift
+    image.wram_shift = 0
+    return 0
+
+
+def decode_memory(memory, *, boxes: bool = True) -> Dict[str, Any]:
+    """
+    Map, badges, battle and party/enemy records (JSON friendly) from anything
+    with ``read_memory`` (and ``read_sram`` when ``boxes``): a
+    :class:`StateImage` or a live :class:`~game.core.emulator.EmulatorSession`.
+    Only ``{"valid": False}`` when the RAM fails :func:`is_plausible`.
+    """
+    if not is_plausible(memory):
+        return {"valid": False}
+    badges = _u8(memory, MainPokemonData.Badges)
+    count = _u8(memory, MainPokemonData.PartyCount)
+    summary: Dict[str, Any] = {
+        "valid": True,
+        "map": _u8(memory, MainPokemonData.CurrentMapNumber),
+        "x": _u8(memory, MainPokemonData.PlayerXPos),
+        "y": _u8(memory, MainPokemonData.PlayerYPos),
+        "badges": badges,
+        "badge_count": bin(badges).count("1"),
+        "battle_type": _u8(memory, MainPokemonData.BattleTypeID),
+        "party_count": count,
+    }
+    # same record layout as the shared-memory channel: enemy, active, party 1-6
+    (_, _, turn, _), records = unpack_state(
+        pack_state(0, memory.read_memory(SCENE_BLOCK), _u8(memory, MainPokemonData.BattleTurnCounter))
+    )
+    keys = ("dex", "level", "hp", "max_hp", "type1", "type2", "status")
+    pokemon = [dict(zip(keys, r[:7]), moves=list(r[7:11]), pp=list(r[11:15])) for r in records]
+    summary["turn"] = turn
+    summary["enemy"], summary["active"] = pokemon[0], pokemon[1]
+    summary["party"] = pokemon[2:2 + count] if count <= 6 else []
+    if boxes:
+        summary["stored"] = len(read_boxes(memory))
+    return summary
+
+
+def decode_state(image: StateImage) -> Dict[str, Any]:
+    """:func:`decode_memory` of a state file, plus its format details."""
+    layout = image.layout
+    summary: Dict[str, Any] = {
+        "version": layout.version,
+        "cgb": layout.cgb,
+        "initialised": layout.initialised,
+        "wram_shift": image.wram_shift,
+    }
+    if layout.initialised:
+        summary.update(decode_memory(image, boxes=layout.sram is not None))
+    return summary
+
+
+def scan_file(path: str) -> Tuple[str, Dict[str, Any]]:
+    try:
+        with StateImage.open(path) as image:
+            return path, decode_state(image)
+    except (OSError, ValueError) as exc:
+        return path, {"error": str(exc)}
+
+
+def find_states(root: str, patterns: Sequence[str] = STATE_PATTERNS) -> List[str]:
+    base = Path(root)
+    if base.is_file():
+        return [str(base)]
+    return sorted({str(p) for pattern in patterns for p in base.rglob(pattern)})
+
+
+def scan_states(
+    paths: Sequence[str], *, workers: Optional[int] = None, chunksize: int = 32
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(path, summary)`` for every state, in order (``workers=1`` runs in-process)."""
+    if workers == 1 or len(paths) <= 1:
+        yield from map(scan_file, paths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(scan_file, paths, chunksize=chunksize)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", help="a .state file or a directory searched recursively")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+    for path, summary in scan_states(find_states(args.root), workers=args.workers):
+        print(json.dumps({"path": path, **summary}, ensure_ascii=False))
+
+
+__all__ = [
+    "FRENCH_WRAM_SHIFT",
+    "OAM_DMA_ROUTINE",
+    "StateImage",
+    "StateLayout",
+    "decode_memory",
+    "decode_state",
+    "detect_wram_shift",
+    "find_states",
+    "is_plausible",
+    "locate_sections",
+    "scan_file",
+    "scan_states",
+    "WRAM_SHIFTS",
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,8 @@ from game.data.helpers import read_u8
 from game.data.menu import MenuState as MenuDumpState, get_menu_state
 from game.data.pokemon import EnemyPokemon, PartyPokemon, PlayerPokemonBattle
 from game.data.ram_reader import MainPokemonData
-from game.scenes.commands import BattleCommand
+from game.data.screen_text import ScreenText, get_screen_text
+from game.scenes.commands import COMMAND_STATUS, BattleCommand
 from game.scenes.scene import Scene
 
 
@@ -44,6 +45,12 @@ class BattleScene(Scene):
 
         # last menu dump from RAM
         self._menu_state: Optional[MenuDumpState] = None
+        # last decoded tile buffer (on-screen text)
+        self._screen: Optional[ScreenText] = None
+        # text box we last pressed B on, and when (re-press if it never changes)
+        self._advanced_box_hash: Optional[int] = None
+        self._advanced_at: float = 0.0
+        self._stale_box_timeout: float = 1.0  # seconds
 
         # high-level commands coming from BattleService (thread-safe)
         self._commands: ThreadSafeQueue[BattleCommand] = ThreadSafeQueue()
@@ -60,8 +67,18 @@ class BattleScene(Scene):
     # API used by BattleService
     # ------------------------------------------------------------------
     def enqueue_command(self, cmd: BattleCommand) -> None:
+        cmd.notify(COMMAND_STATUS.ACCEPTED)  # before append: the scene may start it right away
         self._commands.append(cmd)
 
+    def abort_commands(self, reason: str) -> None:
+        """Fail the active and queued commands (e.g. the battle ended before they ran)."""
+        pending = [self._active_cmd] if self._active_cmd is not None else []
+        self._active_cmd = None
+        while (cmd := self._commands.pop()) is not None:
+            pending.append(cmd)
+        for cmd in pending:
+            cmd.notify(COMMAND_STATUS.FAILED, reason)
+
     # ------------------------------------------------------------------
     # Main loop hook (SceneManagerService calls update(); we accept now optionally)
     # ------------------------------------------------------------------
@@ -71,6 +88,7 @@ class BattleScene(Scene):
 
         # 1) Refresh RAM-derived state
         self._menu_state = get_menu_state()
+        self._screen = get_screen_text()
         self._refresh()  # subclass-only data refresh (pokemon stats etc.)
 
         # 2) If no active command, keep the UI stable at "ready main menu"
@@ -113,6 +131,29 @@ class BattleScene(Scene):
         # This is the ambiguous area: move list OR post-move messages
         return self.menu_top == MenuLocation.MOVES_OR_TEXT.value
 
+    # ------------------------------------------------------------------
+    # Screen text helpers (tile buffer): disambiguate MOVES_OR_TEXT
+    # ------------------------------------------------------------------
+    @property
+    def is_move_menu_visible(self) -> Optional[bool]:
+        """``True``/``False`` from the screen, ``None`` if the tile buffer could not be read."""
+        return None if self._screen is None else self._screen.is_move_menu
+
+    @property
+    def dialogue(self) -> str:
+        return "" if self._screen is None else self._screen.dialogue
+
+    def _should_advance_dialogue(self, now: float) -> bool:
+        """Press once per new text box; wait while the box is empty (animations)."""
+        if self._screen is None:
+            return True  # no screen data: old cooldown-driven behaviour
+        if not self.dialogue:
+            return False
+        return (
+            self._screen.text_box_hash != self._advanced_box_hash
+            or now - self._advanced_at >= self._stale_box_timeout
+        )
+
     # ------------------------------------------------------------------
     # Input gating: enqueue at most 1 button when allowed
     # ------------------------------------------------------------------
@@ -176,6 +217,7 @@ class BattleScene(Scene):
             if self._active_cmd is not None:
                 # reset phase for new command
                 self._phase = self._PHASE_IDLE
+                self._active_cmd.notify(COMMAND_STATUS.STARTED)
 
         if self._active_cmd is None:
             return
@@ -187,11 +229,16 @@ class BattleScene(Scene):
             if done:
                 self._active_cmd = None
                 self._phase = self._PHASE_IDLE
+                if 1 <= cmd.move_index <= 4:
+                    cmd.notify(COMMAND_STATUS.COMPLETED)
+                else:
+                    cmd.notify(COMMAND_STATUS.FAILED, "invalid move_index")
             return
 
         self.logger.warning("Unsupported command kind: {}", cmd.kind)
         self._active_cmd = None
         self._phase = self._PHASE_IDLE
+        cmd.notify(COMMAND_STATUS.FAILED, f"unsupported command kind: {cmd.kind}")
 
     def _execute_move(self, now: float, move_index: int) -> bool:
         """
@@ -219,8 +266,13 @@ class BattleScene(Scene):
                     self._enqueue_input(now, GBAButton.A)  # open move list
                 return False
 
-            # We are in moves/text menu.
-            # In THIS phase, we treat menu_id as move cursor (0..3).
+            # We are in moves/text menu: a leftover dialogue is not the move list.
+            if self.is_move_menu_visible is False:
+                if self.dialogue and self._can_enqueue_input(now):
+                    self._enqueue_input(now, GBAButton.B)
+                return False
+
+            # The move list is shown: menu_id is the move cursor.
             cur = self.menu_id
             if cur is None:
                 return False
@@ -251,10 +303,18 @@ class BattleScene(Scene):
             if self.is_ready_main_menu:
                 return True
 
-            # While not back to main menu, press A to advance text/animations.
-            # This covers your case where (5,12) persists during dialogue.
-            if self._can_enqueue_input(now):
-                self._enqueue_input(now, GBAButton.B) # To avoid entering sub-menus, use B here.    
+            # The confirm press was lost (no input pending, list still shown): select again,
+            # B would close the list.
+            if self.is_move_menu_visible and self._can_enqueue_input(now):
+                self._phase = self._PHASE_SELECT_MOVE
+                return False
+
+            # Advance each new dialogue box once; wait through animations (empty box).
+            if self._should_advance_dialogue(now) and self._can_enqueue_input(now):
+                self._enqueue_input(now, GBAButton.B) # To avoid entering sub-menus, use B here.
+                if self._screen is not None:
+                    self._advanced_box_hash = self._screen.text_box_hash
+                    self._advanced_at = now
             return False
 
         # fallback
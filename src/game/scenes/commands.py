@@ -1,5 +1,18 @@
-from dataclasses import dataclass
-from typing import Literal, Optional
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Literal, Optional
+
+
+class COMMAND_STATUS(str, Enum):
+    ACCEPTED = "accepted"    # parsed and queued on the battle scene
+    STARTED = "started"      # the scene began driving inputs for it
+    COMPLETED = "completed"  # back to the ready main menu after the turn
+    FAILED = "failed"        # rejected, invalid or dropped (see "error")
+
+
+# listener(command, status, error)
+CommandListener = Callable[["BattleCommand", COMMAND_STATUS, Optional[str]], None]
+
 
 @dataclass(frozen=True)
 class BattleCommand:
@@ -7,3 +20,8 @@ class BattleCommand:
     move_index: int
     request_id: Optional[str] = None
     created_at: float = 0.0
+    listener: Optional[CommandListener] = field(default=None, compare=False, repr=False)
+
+    def notify(self, status: COMMAND_STATUS, error: Optional[str] = None) -> None:
+        if self.listener is not None:
+            self.listener(self, status, error)
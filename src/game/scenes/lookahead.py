@@ -0,0 +1,213 @@
+"""Speculative lookahead: play each candidate move on a copy of the battle.
+
+:class:`Lookahead` keeps a process pool of headless
+:class:`~game.core.emulator.EmulatorSession` workers (no window, no sound,
+one per process, created once).  For a battle snapshot
+(:meth:`EmulatorSession.snapshot`) every legal move is sent to a worker,
+which loads the snapshot, drives a :class:`~game.scenes.battle_scene.NormalBattle`
+with that :class:`~game.scenes.commands.BattleCommand` exactly as the live
+loop would (scene updates every ``scene_every`` frames, simulated clock,
+rendering off) until the turn completes, the battle ends or ``max_frames``
+elapse, then reads HP, status and faints from RAM.
+
+Results are ordered best first by :attr:`LookaheadResult.score`::
+
+    lookahead = Lookahead(session.version, workers=4)
+    best = lookahead.evaluate_session(session)[0]
+    scene.enqueue_command(BattleCommand("move", best.move_index))
+"""
+from __future__ import annotations
+
+import atexit
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from game.core.emulator import EmulatorSession
+from game.core.version import GameVersion
+from game.data.ram_reader import MainPokemonData
+from game.offline.state_file import decode_memory
+from game.scenes.battle_scene import create_battle_scene
+from game.scenes.commands import COMMAND_STATUS, BattleCommand
+from game.utils.metrics import REGISTRY
+
+FPS = 60
+
+_LOOKAHEAD_SECONDS = REGISTRY.histogram(
+    "pkm_lookahead_seconds",
+    "Wall time to simulate every candidate move of one lookahead",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+@dataclass(frozen=True)
+class LookaheadResult:
+    move_index: int          # 1..4, as in BattleCommand
+    frames: int              # frames emulated before stopping
+    completed: bool          # the command ran and the UI is back to the ready main menu
+    battle_over: bool
+    enemy_hp: int
+    enemy_max_hp: int
+    enemy_status: int
+    enemy_fainted: bool
+    player_hp: int
+    player_max_hp: int
+    player_status: int
+    player_fainted: bool
+    damage_dealt: float      # fraction of the enemy's max HP
+    damage_taken: float      # fraction of the active Pokémon's max HP
+    score: float
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def legal_moves(summary: Dict[str, Any]) -> List[int]:
+    """1-based indices of the active Pokémon's moves that exist and have PP left."""
+    active = summary["active"]
+    return [i for i, (move, pp) in enumerate(zip(active["moves"], active["pp"]), start=1) if move and pp]
+
+
+def score_outcome(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """HP/status deltas between two :func:`~game.offline.state_file.decode_memory` summaries."""
+    enemy0, enemy1 = before["enemy"], after["enemy"]
+    player0, player1 = before["active"], after["active"]
+    battle_over = after["battle_type"] == 0
+    # a fainted enemy may already be replaced by the trainer's next Pokémon
+    enemy_replaced = (enemy1["dex"], enemy1["level"]) != (enemy0["dex"], enemy0["level"])
+    enemy_fainted = enemy1["hp"] == 0 or (enemy_replaced and not battle_over)
+    player_fainted = player1["hp"] == 0
+    dealt = 1.0 if enemy_fainted else (enemy0["hp"] - enemy1["hp"]) / max(1, enemy0["max_hp"])
+    taken = (player0["hp"] - player1["hp"]) / max(1, player0["max_hp"])
+    inflicted_status = bool(enemy1["status"] and not enemy0["status"])
+    return {
+        "battle_over": battle_over,
+        "enemy_hp": enemy1["hp"],
+        "enemy_max_hp": enemy1["max_hp"],
+        "enemy_status": enemy1["status"],
+        "enemy_fainted": enemy_fainted,
+        "player_hp": player1["hp"],
+        "player_max_hp": player1["max_hp"],
+        "player_status": player1["status"],
+        "player_fainted": player_fainted,
+        "damage_dealt": dealt,
+        "damage_taken": taken,
+        "score": dealt - taken + float(enemy_fainted) - float(player_fainted) + 0.25 * inflicted_status,
+    }
+
+
+# ----------------------------------------------------------------------
+# Worker process
+# ----------------------------------------------------------------------
+_WORKER: Optional[EmulatorSession] = None
+
+
+def _init_worker(version: GameVersion) -> None:
+    global _WORKER
+    _WORKER = EmulatorSession(version, window="null", sound_emulated=False)
+    atexit.register(_WORKER.stop, False)
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def _simulate(state: bytes, move_index: int, max_frames: int, scene_every: int) -> LookaheadResult:
+    session = _WORKER
+    session.load_state(io.BytesIO(state))
+    session.clear_buttons()
+    before = decode_memory(session, boxes=False)
+
+    outcome: List[Optional[str]] = []
+
+    def on_status(cmd: BattleCommand, status: COMMAND_STATUS, error: Optional[str]) -> None:
+        if status in (COMMAND_STATUS.COMPLETED, COMMAND_STATUS.FAILED):
+            outcome.append(error if status is COMMAND_STATUS.FAILED else None)
+
+    scene = create_battle_scene(session, 0)
+    scene.enqueue_command(BattleCommand("move", move_index, listener=on_status))
+    frame = 0
+    while frame < max_frames and not outcome:
+        scene.update(frame / FPS)
+        button = session.pop_button()
+        if button is not None:
+            session.press_button(button)
+        session.tick(scene_every, False)
+        frame += scene_every
+        if session.read_memory(MainPokemonData.BattleTypeID)[0] == 0:
+            break
+
+    after = decode_memory(session, boxes=False)
+    error = outcome[0] if outcome else None
+    completed = bool(outcome) and error is None
+    if not outcome and frame >= max_frames:
+        error = "timeout"
+    return LookaheadResult(move_index, frame, completed, error=error, **score_outcome(before, after))
+
+
+# ----------------------------------------------------------------------
+# Pool
+# ----------------------------------------------------------------------
+class Lookahead:
+    """
+    Process pool evaluating candidate moves in parallel.
+
+    Workers are spawned (not forked: the parent runs SDL and threads) and
+    each loads the ROM once; call :meth:`warm_up` at start so the first
+    lookahead does not pay for it.
+    """
+
+    def __init__(
+        self,
+        version: GameVersion,
+        *,
+        workers: Optional[int] = None,
+        max_frames: int = 60 * FPS,
+        scene_every: int = 6,
+    ) -> None:
+        self.version = version
+        self.workers = workers or os.cpu_count() or 1
+        self.max_frames = max_frames
+        self.scene_every = scene_every
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(version,),
+        )
+
+    def warm_up(self) -> None:
+        """Start every worker (ROM load, PyBoy init) and wait for them."""
+        for future in [self._pool.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+
+    def evaluate(
+        self, state: bytes, moves: Sequence[int], *, max_frames: Optional[int] = None
+    ) -> List[LookaheadResult]:
+        """Simulate every move in ``moves`` from ``state``; best first."""
+        started = perf_counter()
+        frames = self.max_frames if max_frames is None else max_frames
+        futures = [self._pool.submit(_simulate, state, move, frames, self.scene_every) for move in moves]
+        results = [future.result() for future in futures]
+        _LOOKAHEAD_SECONDS.observe(perf_counter() - started)
+        return sorted(results, key=lambda r: (r.completed or r.battle_over, r.score), reverse=True)
+
+    def evaluate_session(
+        self, session: EmulatorSession, moves: Optional[Sequence[int]] = None, **kwargs
+    ) -> List[LookaheadResult]:
+        """Snapshot ``session`` and evaluate ``moves`` (default: :func:`legal_moves`)."""
+        state = session.snapshot()
+        if moves is None:
+            moves = legal_moves(decode_memory(session, boxes=False))
+        return self.evaluate(state, moves, **kwargs)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+__all__ = ["FPS", "Lookahead", "LookaheadResult", "legal_moves", "score_outcome"]
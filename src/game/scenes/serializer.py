@@ -0,0 +1,310 @@
+"""Schema-compiled serializer for the battle scene.
+
+``NormalBattle.to_dict()`` rebuilds a tree of dicts (and re-resolves every
+move through :class:`Move`) on each publish before :func:`to_json` walks it
+again.  This module compiles the scene layout once into per-record readers
+working on a single RAM slice (``0xCFE5..0xD272``: enemy, active Pokémon,
+party) and writes JSON text straight into a reusable buffer.  Everything
+static is rendered once and cached:
+
+* move fragments (name, effect, power, type, accuracy, max PP) per move id
+* ``"dex"/"name"`` fragments per species id
+* ``"types"`` fragments per (type1, type2) pair and ``"status"`` per byte
+
+The output is byte-for-byte what ``to_json(scene.to_dict())`` produces.
+The same decoded records double as a cheap baseline for delta publishing:
+:meth:`SceneSerializer.diff` compares two snapshots field by field and only
+builds the values of the fields that changed.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from game.data.data import POKDX_ID_TO_NAME, POKEMON_ROM_ID_TO_PKDX_ID, POKEMON_TYPES
+from game.data.decoder import decode_pkm_name
+from game.data.move import Move
+from game.data.pokemon import parse_status
+from game.data.ram_reader import MemoryData
+from game.scenes.battle_scene import NormalBattle
+
+# One contiguous read covering every record used by the scene.
+SCENE_BLOCK = MemoryData(0xCFE5, 0xD272, "Enemy battle struct .. party structs (scene serializer window)")
+_BASE = 0xCFE5
+
+# Flat record: (dex, name, level, hp, max_hp, type1, type2, status, (move_id, pp_left) * 4)
+Record = Tuple[Any, ...]
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+@dataclass(frozen=True)
+class RecordSchema:
+    """Byte offsets (relative to the record start) of the fields used by the scene."""
+
+    address: int
+    species: int
+    level: int
+    hp: int
+    max_hp: int
+    status: int
+    type1: int
+    type2: int
+    moves: int
+    pp: int
+    name: Optional[int] = None  # RAM nickname (player battle struct); else Pokédex name
+
+
+ENEMY_SCHEMA = RecordSchema(0xCFE5, species=0, hp=1, status=4, type1=5, type2=6, moves=8, level=14, max_hp=15, pp=25)
+PLAYER_BATTLE_SCHEMA = RecordSchema(
+    0xD009, name=0, species=11, hp=12, status=15, type1=16, type2=17, moves=19, level=25, max_hp=26, pp=36
+)
+PARTY_SCHEMAS = tuple(
+    RecordSchema(0xD16B + 44 * i, species=0, hp=1, status=4, type1=5, type2=6, moves=8, pp=29, level=33, max_hp=34)
+    for i in range(6)
+)
+
+
+# ----------------------------------------------------------------------
+# Static fragment caches (shared by every serializer instance)
+# ----------------------------------------------------------------------
+class FragmentCache:
+    """Memoised JSON fragments and values for everything that only depends on ROM data."""
+
+    def __init__(self) -> None:
+        self._moves: Dict[int, Tuple[str, int, Dict[str, Any]]] = {}
+        self._species: Dict[int, Tuple[int, str]] = {}
+        self._types: Dict[Tuple[int, int], str] = {}
+        self._status: Dict[int, str] = {}
+
+    def move(self, move_id: int) -> Tuple[str, int, Dict[str, Any]]:
+        """Return ``(json prefix up to '"pp": [', max pp, dict without pp)`` for ``move_id``."""
+        entry = self._moves.get(move_id)
+        if entry is None:
+            move = Move.load_from_id(None, move_id)
+            static = move.to_dict()
+            del static["pp"]
+            prefix = _dumps(static)[:-1] + ', "pp": ['
+            entry = (prefix, move.pp, static)
+            self._moves[move_id] = entry
+        return entry
+
+    def species(self, species_id: int) -> Tuple[int, str]:
+        entry = self._species.get(species_id)
+        if entry is None:
+            dex = POKEMON_ROM_ID_TO_PKDX_ID.get(species_id, 0)
+            entry = (dex, POKDX_ID_TO_NAME.get(dex, {"en": "Unknown"}).get("en", "Unknown"))
+            self._species[species_id] = entry
+        return entry
+
+    def types(self, t1: int, t2: int) -> str:
+        key = (t1, t2)
+        frag = self._types.get(key)
+        if frag is None:
+            frag = _dumps([POKEMON_TYPES.get(t1, "Unknown"), POKEMON_TYPES.get(t2, "Unknown")])
+            self._types[key] = frag
+        return frag
+
+    def status(self, b: int) -> str:
+        frag = self._status.get(b)
+        if frag is None:
+            frag = _dumps(parse_status(b))
+            self._status[b] = frag
+        return frag
+
+
+FRAGMENTS = FragmentCache()
+
+
+def _remaining_pp(raw_pp: int, max_pp: int) -> int:
+    # mirrors Move.set_remaining_pp
+    if raw_pp > max_pp:
+        raw_pp = max_pp
+    return raw_pp if raw_pp > 0 else 0
+
+
+def compile_record(schema: RecordSchema, cache: FragmentCache = FRAGMENTS) -> Callable[[List[int]], Record]:
+    """Build a reader turning the scene RAM slice into a flat :data:`Record`."""
+    start = schema.address - _BASE
+    species_at = start + schema.species
+    level_at = start + schema.level
+    hp_at = start + schema.hp
+    max_hp_at = start + schema.max_hp
+    status_at = start + schema.status
+    t1_at = start + schema.type1
+    t2_at = start + schema.type2
+    moves_at = start + schema.moves
+    pp_at = start + schema.pp
+    name_at = None if schema.name is None else start + schema.name
+    move_frag = cache.move
+    species = cache.species
+
+    def read(mem: List[int]) -> Record:
+        dex, dex_name = species(mem[species_at])
+        name = dex_name if name_at is None else decode_pkm_name(mem[name_at:name_at + 11])
+        out = [
+            dex,
+            name,
+            mem[level_at],
+            (mem[hp_at] << 8) | mem[hp_at + 1],
+            (mem[max_hp_at] << 8) | mem[max_hp_at + 1],
+            mem[t1_at],
+            mem[t2_at],
+            mem[status_at],
+        ]
+        for i in range(4):
+            move_id = mem[moves_at + i]
+            out.append(move_id)
+            out.append(_remaining_pp(mem[pp_at + i], move_frag(move_id)[1]))
+        return tuple(out)
+
+    return read
+
+
+# ----------------------------------------------------------------------
+# Scene serializer
+# ----------------------------------------------------------------------
+_MOVE_FIELDS = 8  # index of the first move id inside a Record
+
+
+class SceneSerializer:
+    """Serialises ``{"enemy", "on_battle", "party"}`` straight from RAM records."""
+
+    def __init__(self, read_block: Callable[[], List[int]], cache: FragmentCache = FRAGMENTS) -> None:
+        self._read_block = read_block
+        self._cache = cache
+        self._readers = (
+            ("enemy", compile_record(ENEMY_SCHEMA, cache)),
+            ("on_battle", compile_record(PLAYER_BATTLE_SCHEMA, cache)),
+        ) + tuple(("party", compile_record(s, cache)) for s in PARTY_SCHEMAS)
+        self._buf: List[str] = []
+
+    # ------------------------------------------------------------------
+    def snapshot(self) -> Tuple[Record, ...]:
+        """Read the scene window once and decode every record."""
+        mem = self._read_block()
+        return tuple(reader(mem) for _, reader in self._readers)
+
+    def to_json(self, records: Optional[Tuple[Record, ...]] = None) -> str:
+        """JSON for the scene, identical to ``to_json(NormalBattle.to_dict())``."""
+        if records is None:
+            records = self.snapshot()
+        buf = self._buf
+        buf.clear()
+        buf.append('{"enemy": ')
+        self._write_pokemon(buf, records[0])
+        buf.append(', "on_battle": ')
+        self._write_pokemon(buf, records[1])
+        buf.append(', "party": [')
+        for i, record in enumerate(records[2:]):
+            if i:
+                buf.append(", ")
+            self._write_pokemon(buf, record)
+        buf.append("]}")
+        return "".join(buf)
+
+    def to_dict(self, records: Optional[Tuple[Record, ...]] = None) -> Dict[str, Any]:
+        """Dict view of a snapshot, for codecs that need an object tree."""
+        if records is None:
+            records = self.snapshot()
+        return {
+            "enemy": self._pokemon_dict(records[0]),
+            "on_battle": self._pokemon_dict(records[1]),
+            "party": [self._pokemon_dict(r) for r in records[2:]],
+        }
+
+    def _write_pokemon(self, buf: List[str], r: Record) -> None:
+        cache = self._cache
+        buf.append(f'{{"dex": {r[0]}, "name": {_dumps(r[1])}, "level": {r[2]}, "hp": [{r[3]}, {r[4]}], "types": ')
+        buf.append(cache.types(r[5], r[6]))
+        buf.append(', "status": ')
+        buf.append(cache.status(r[7]))
+        buf.append(', "moves": [')
+        for i in range(4):
+            move_id = r[_MOVE_FIELDS + 2 * i]
+            prefix, max_pp, _ = cache.move(move_id)
+            if i:
+                buf.append(", ")
+            buf.append(prefix)
+            buf.append(f"{r[_MOVE_FIELDS + 2 * i + 1]}, {max_pp}]}}")
+        buf.append("]}")
+
+    # ------------------------------------------------------------------
+    # Field values (only built for changed fields / dict views)
+    # ------------------------------------------------------------------
+    def _move_dict(self, move_id: int, remaining: int) -> Dict[str, Any]:
+        _, max_pp, static = self._cache.move(move_id)
+        move = dict(static)
+        move["pp"] = [remaining, max_pp]
+        return move
+
+    def _pokemon_dict(self, r: Record) -> Dict[str, Any]:
+        return {
+            "dex": r[0],
+            "name": r[1],
+            "level": r[2],
+            "hp": [r[3], r[4]],
+            "types": [POKEMON_TYPES.get(r[5], "Unknown"), POKEMON_TYPES.get(r[6], "Unknown")],
+            "status": parse_status(r[7]),
+            "moves": [self._move_dict(r[_MOVE_FIELDS + 2 * i], r[_MOVE_FIELDS + 2 * i + 1]) for i in range(4)],
+        }
+
+    def _record_path(self, index: int) -> str:
+        if index == 0:
+            return "/enemy"
+        if index == 1:
+            return "/on_battle"
+        return f"/party/{index - 2}"
+
+    def diff(self, old: Tuple[Record, ...], new: Tuple[Record, ...], prefix: str = "") -> List[Dict[str, Any]]:
+        """JSON-patch ops between two snapshots (same document as :meth:`to_json`)."""
+        ops: List[Dict[str, Any]] = []
+        for index, (a, b) in enumerate(zip(old, new)):
+            if a == b:
+                continue
+            base = prefix + self._record_path(index)
+            if a[0] != b[0]:
+                ops.append({"op": "replace", "path": f"{base}/dex", "value": b[0]})
+            if a[1] != b[1]:
+                ops.append({"op": "replace", "path": f"{base}/name", "value": b[1]})
+            if a[2] != b[2]:
+                ops.append({"op": "replace", "path": f"{base}/level", "value": b[2]})
+            if a[3] != b[3]:
+                ops.append({"op": "replace", "path": f"{base}/hp/0", "value": b[3]})
+            if a[4] != b[4]:
+                ops.append({"op": "replace", "path": f"{base}/hp/1", "value": b[4]})
+            if a[5] != b[5]:
+                ops.append({"op": "replace", "path": f"{base}/types/0", "value": POKEMON_TYPES.get(b[5], "Unknown")})
+            if a[6] != b[6]:
+                ops.append({"op": "replace", "path": f"{base}/types/1", "value": POKEMON_TYPES.get(b[6], "Unknown")})
+            if a[7] != b[7]:
+                ops.append({"op": "replace", "path": f"{base}/status", "value": parse_status(b[7])})
+            for i in range(4):
+                at = _MOVE_FIELDS + 2 * i
+                if a[at] != b[at]:
+                    ops.append({"op": "replace", "path": f"{base}/moves/{i}", "value": self._move_dict(b[at], b[at + 1])})
+                elif a[at + 1] != b[at + 1]:
+                    ops.append({"op": "replace", "path": f"{base}/moves/{i}/pp/0", "value": b[at + 1]})
+        return ops
+
+
+def scene_serializer_for(scene) -> Optional[SceneSerializer]:
+    """Return a compiled serializer for ``scene`` if its layout is supported."""
+    if not isinstance(scene, NormalBattle):
+        return None
+    session = scene.session
+    return SceneSerializer(lambda: list(session.read_memory(SCENE_BLOCK)))
+
+
+__all__ = [
+    "RecordSchema",
+    "FragmentCache",
+    "FRAGMENTS",
+    "SceneSerializer",
+    "SCENE_BLOCK",
+    "compile_record",
+    "scene_serializer_for",
+]
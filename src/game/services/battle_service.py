@@ -3,13 +3,16 @@ from __future__ import annotations
 
 import json
 import time
-from typing import Any, Optional
+import uuid
+from typing import Any, Dict, Optional, Tuple
 
 from game.mqtt.client import MQTTClient
-from game.mqtt.topics import BATTLE_MOVE_TOPIC
+from game.mqtt.codecs import JSON_CODEC, Codec, codec_topic
+from game.mqtt.topics import BATTLE_MOVE_TOPIC, BATTLE_RESULT_TOPIC
 from game.scenes.common import BATTLE_ACTION, str_to_battle_action
-from game.scenes.commands import BattleCommand
+from game.scenes.commands import COMMAND_STATUS, BattleCommand
 from game.services.service import Service
+from game.utils.executor import KeyedExecutor
 
 
 class BattleService(Service):
@@ -20,64 +23,188 @@ class BattleService(Service):
     Expected payload (example):
     {
       "action": "move",
-      "choice": 2
+      "choice": 2,
+      "request_id": "a1b2"    # optional, generated when missing
     }
+
+    Every command's progress is published on ``battle/result``:
+    ``accepted`` (queued on the scene), ``started``, ``completed`` or
+    ``failed`` (with ``"error"``), each with its ``request_id`` and timings
+    in ms (``latency_ms`` since receipt, ``queue_ms`` accepted -> started,
+    ``run_ms`` started -> completed/failed), so clients can pipeline
+    commands instead of polling ``battle/info``.
+
+    With a non-JSON ``codec`` the same object is expected, encoded with that
+    codec, on ``battle/move/<codec name>``.
+
+    The MQTT callback only hands the payload to a :class:`KeyedExecutor`;
+    parsing and enqueueing run on its workers, in arrival order per topic.
+    When ``max_pending`` commands are already waiting new ones are rejected
+    (``pkm_executor_rejected_total{executor="battle-commands"}``).
+
+    A command still accepted/started after ``status_timeout`` seconds is
+    reported ``failed`` (``"status timeout"``) and no longer tracked.
     """
 
-    def __init__(self, mqtt_client: MQTTClient, logger, scene_provider):
+    def __init__(
+        self,
+        mqtt_client: MQTTClient,
+        logger,
+        scene_provider,
+        *,
+        codec: Codec = JSON_CODEC,
+        workers: int = 1,
+        max_pending: int = 64,
+        status_timeout: float = 300.0,
+    ):
         self.mqtt = mqtt_client
         self.logger = logger
         self.scene_provider = scene_provider  # must expose .current_scene
+        self.codec = codec
+        self._move_topic = codec_topic(BATTLE_MOVE_TOPIC, codec)
+        self._result_topic = codec_topic(BATTLE_RESULT_TOPIC, codec)
+        # request_id -> (last status, time) while the command is in flight
+        self._status_times: Dict[str, Tuple[COMMAND_STATUS, float]] = {}
+        self.status_timeout = status_timeout
+        self._next_expiry_check = 0.0
+        self._executor = KeyedExecutor("battle-commands", workers=workers, max_pending=max_pending, logger=logger)
 
     def start(self) -> None:
-        self.logger.debug("BattleService starting - subscribing to {}", BATTLE_MOVE_TOPIC)
-        self.mqtt.subscribe(BATTLE_MOVE_TOPIC, handler=self._on_battle_message)
+        self.logger.debug("BattleService starting - subscribing to {}", self._move_topic)
+        self.mqtt.subscribe(self._move_topic, handler=self._on_battle_message, raw=self.codec.binary)
 
     def tick(self, now: float) -> None:
-        # Event-driven (MQTT callback); nothing to do per tick.
-        return
+        # Commands arrive through the MQTT callback; only expire stale statuses here.
+        wall = time.time()
+        if wall >= self._next_expiry_check:
+            self._next_expiry_check = wall + min(self.status_timeout, 10.0)
+            self._expire_statuses(wall)
+
+    def quit(self) -> None:
+        self._executor.shutdown()
 
     # ------------------------------------------------------------------
-    def _on_battle_message(self, topic: str, payload: str) -> None:
-        self.logger.info("Received battle command: {}", payload)
+    def _on_battle_message(self, topic: str, payload: str | bytes) -> None:
+        # Runs on the MQTT network thread: hand off and return immediately.
+        if not self._executor.submit(topic, self._handle_battle_message, topic, payload):
+            self.logger.warning("Battle command queue full, command dropped ({} pending)", self._executor.pending)
 
-        msg = self._parse_json(payload)
+    def _handle_battle_message(self, topic: str, payload: str | bytes) -> None:
+        received_at = time.time()
+        self.logger.info("Received battle command: {!r}", payload)
+
+        msg = self._parse_payload(payload)
         if msg is None:
             return
+        self.dispatch_command(msg, received_at)
+
+    def dispatch_command(self, msg: dict, received_at: Optional[float] = None) -> None:
+        """Validate a decoded command object and enqueue it on the active scene.
+
+        Entry point shared by every command source (MQTT, shared-memory ring).
+        """
+        if received_at is None:
+            received_at = time.time()
+        request_id = str(msg.get("request_id") or uuid.uuid4().hex)
 
         battle_action = self._parse_action(msg)
         if battle_action is None:
+            self._publish_failure(request_id, received_at, "invalid action")
             return
 
-        cmd = self._build_command(battle_action, msg)
+        cmd = self._build_command(battle_action, msg, request_id, received_at)
         if cmd is None:
+            self._publish_failure(request_id, received_at, "invalid command")
             return
 
         scene = self._get_current_scene()
         if scene is None:
             self.logger.warning("No active battle scene. Command ignored.")
+            self._publish_failure(request_id, received_at, "no active battle")
             return
 
         if not hasattr(scene, "enqueue_command"):
             self.logger.warning("Current scene does not support enqueue_command (type={})", type(scene))
+            self._publish_failure(request_id, received_at, "scene does not accept commands")
             return
 
         try:
             scene.enqueue_command(cmd)
-            self.logger.info("Enqueued battle command: {}", cmd)
         except Exception as exc:  # pragma: no cover
             self.logger.exception("Failed to enqueue battle command: {}", exc)
+            self._publish_failure(request_id, received_at, str(exc))
+            return
+        if self._get_current_scene() is not scene:
+            # The scene manager swapped scenes (and aborted the old one's
+            # commands) while we were enqueueing: nothing will run this one.
+            self.logger.warning("Battle scene changed while enqueueing {}, aborting", cmd)
+            scene.abort_commands("battle changed")
+            return
+        self.logger.info("Enqueued battle command: {}", cmd)
 
     # ------------------------------------------------------------------
-    def _parse_json(self, payload: str) -> Optional[dict]:
+    # Result stream
+    # ------------------------------------------------------------------
+    def _on_command_status(self, cmd: BattleCommand, status: COMMAND_STATUS, error: Optional[str]) -> None:
+        """Listener attached to every command; called by the scene (services thread) or here."""
+        now = time.time()
+        payload: Dict[str, Any] = {
+            "request_id": cmd.request_id,
+            "status": status.value,
+            "kind": cmd.kind,
+            "choice": cmd.move_index,
+            "timestamp": now,
+            "latency_ms": round((now - cmd.created_at) * 1000.0, 3),
+        }
+        previous = self._status_times.pop(cmd.request_id, None)
+        if previous is not None:
+            previous_status, previous_at = previous
+            elapsed_ms = round((now - previous_at) * 1000.0, 3)
+            if status is COMMAND_STATUS.STARTED:
+                payload["queue_ms"] = elapsed_ms
+            elif previous_status is COMMAND_STATUS.STARTED:
+                payload["run_ms"] = elapsed_ms
+        if status in (COMMAND_STATUS.ACCEPTED, COMMAND_STATUS.STARTED):
+            self._status_times[cmd.request_id] = (status, now)
+        if error:
+            payload["error"] = error
+        self._publish_result(payload)
+
+    def _expire_statuses(self, now: float) -> None:
+        for request_id, (status, at) in list(self._status_times.items()):
+            if now - at < self.status_timeout:
+                continue
+            if self._status_times.pop(request_id, None) is None:
+                continue  # completed meanwhile
+            self.logger.warning("Battle command {} still {} after {:.0f}s, dropped", request_id, status.value, now - at)
+            self._publish_failure(request_id, at, "status timeout")
+
+    def _publish_failure(self, request_id: str, received_at: float, error: str) -> None:
+        now = time.time()
+        self._publish_result({
+            "request_id": request_id,
+            "status": COMMAND_STATUS.FAILED.value,
+            "timestamp": now,
+            "latency_ms": round((now - received_at) * 1000.0, 3),
+            "error": error,
+        })
+
+    def _publish_result(self, payload: Dict[str, Any]) -> None:
+        self.mqtt.publish(self._result_topic, self.codec.encode(payload), retain=False)
+
+    # ------------------------------------------------------------------
+    def _parse_payload(self, payload: str | bytes) -> Optional[dict]:
         try:
-            msg = json.loads(payload)
+            msg = self.codec.decode(payload)
         except json.JSONDecodeError:
             self.logger.warning("Invalid JSON payload")
             return None
+        except Exception as exc:
+            self.logger.warning("Invalid {} payload: {}", self.codec.name, exc)
+            return None
 
         if not isinstance(msg, dict):
-            self.logger.warning("Battle command payload must be a JSON object")
+            self.logger.warning("Battle command payload must be an object")
             return None
 
         return msg
@@ -95,7 +222,9 @@ class BattleService(Service):
 
         return battle_action
 
-    def _build_command(self, battle_action: BATTLE_ACTION, msg: dict) -> Optional[BattleCommand]:
+    def _build_command(
+        self, battle_action: BATTLE_ACTION, msg: dict, request_id: str, received_at: float
+    ) -> Optional[BattleCommand]:
         """
         Converts parsed payload into a BattleCommand.
 
@@ -118,12 +247,18 @@ class BattleService(Service):
             self.logger.warning("Invalid move 'choice': {}", choice)
             return None
 
-        if move_index < 1:
-            self.logger.warning("Invalid move_index (<1): {}", move_index)
+        if move_index < 1 or move_index > 4:
+            self.logger.warning("Invalid move_index (expected 1..4): {}", move_index)
             return None
 
         # Your BattleScene converts 1-based to 0-based internally.
-        return BattleCommand(kind="move", move_index=move_index, created_at=time.time())
+        return BattleCommand(
+            kind="move",
+            move_index=move_index,
+            request_id=request_id,
+            created_at=received_at,
+            listener=self._on_command_status,
+        )
 
     def _get_current_scene(self):
         provider = self.scene_provider
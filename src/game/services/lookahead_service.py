@@ -0,0 +1,122 @@
+"""Service answering lookahead requests: which move would do best this turn."""
+from __future__ import annotations
+
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from game.core.emulator import EmulatorSession
+from game.data.ram_reader import MainPokemonData
+from game.mqtt.client import MQTTClient
+from game.mqtt.codecs import JSON_CODEC, Codec, codec_topic
+from game.mqtt.topics import BATTLE_LOOKAHEAD_RESULT_TOPIC, BATTLE_LOOKAHEAD_TOPIC
+from game.scenes.lookahead import Lookahead
+from game.services.service import Service
+from game.utils.executor import KeyedExecutor
+
+
+class LookaheadService(Service):
+    """
+    On ``battle/lookahead`` (``{"request_id": "...", "moves": [1, 3], "frames": 1800}``,
+    every field optional) snapshots the running battle, plays each move
+    (default: every move with PP left) in the :class:`Lookahead` pool and
+    publishes on ``battle/lookahead/result``::
+
+        {"request_id": ..., "status": "completed", "best": 3, "elapsed_ms": ...,
+         "results": [{"move_index": 3, "score": 1.4, "enemy_hp": 0, ...}, ...]}
+
+    The planner then sends the chosen move on ``battle/move`` as usual.
+    Requests are handled one at a time off the MQTT thread.
+    """
+
+    def __init__(
+        self,
+        session: EmulatorSession,
+        mqtt_client: MQTTClient,
+        logger,
+        *,
+        codec: Codec = JSON_CODEC,
+        workers: Optional[int] = None,
+        max_frames: int = 3600,
+        max_pending: int = 4,
+    ) -> None:
+        self.session = session
+        self.mqtt = mqtt_client
+        self.logger = logger
+        self.codec = codec
+        self._request_topic = codec_topic(BATTLE_LOOKAHEAD_TOPIC, codec)
+        self._result_topic = codec_topic(BATTLE_LOOKAHEAD_RESULT_TOPIC, codec)
+        self.lookahead = Lookahead(session.version, workers=workers, max_frames=max_frames)
+        self._executor = KeyedExecutor("lookahead", workers=1, max_pending=max_pending, logger=logger)
+
+    def start(self) -> None:
+        self._executor.submit("lookahead", self._warm_up)
+        self.mqtt.subscribe(self._request_topic, handler=self._on_request, raw=self.codec.binary)
+
+    def tick(self, now: float) -> None:
+        return
+
+    def quit(self) -> None:
+        self.mqtt.unsubscribe(self._request_topic)
+        self._executor.shutdown()
+        self.lookahead.close()
+
+    # ------------------------------------------------------------------
+    def _warm_up(self) -> None:
+        started = time.perf_counter()
+        self.lookahead.warm_up()
+        self.logger.info(
+            "Lookahead pool ready ({} workers) in {:.1f}s", self.lookahead.workers, time.perf_counter() - started
+        )
+
+    def _on_request(self, topic: str, payload: str | bytes) -> None:
+        if not self._executor.submit("lookahead", self._handle_request, payload):
+            self.logger.warning("Lookahead queue full, request dropped")
+
+    def _handle_request(self, payload: str | bytes) -> None:
+        try:
+            msg = self.codec.decode(payload) if payload else {}
+        except Exception as exc:
+            self.logger.warning("Invalid {} lookahead payload: {}", self.codec.name, exc)
+            return
+        if not isinstance(msg, dict):
+            msg = {}
+        request_id = str(msg.get("request_id") or uuid.uuid4().hex)
+
+        if self.session.read_memory(MainPokemonData.BattleTypeID)[0] == 0:
+            self._publish({"request_id": request_id, "status": "failed", "error": "no active battle"})
+            return
+        moves = msg.get("moves")
+        if moves is not None and not (
+            isinstance(moves, list) and all(isinstance(m, int) and 1 <= m <= 4 for m in moves)
+        ):
+            self._publish({"request_id": request_id, "status": "failed", "error": "invalid moves"})
+            return
+        frames = msg.get("frames")
+
+        started = time.perf_counter()
+        results = self.lookahead.evaluate_session(
+            self.session, moves, max_frames=int(frames) if frames else None
+        )
+        elapsed_ms = round((time.perf_counter() - started) * 1000.0, 3)
+        if not results:
+            self._publish({"request_id": request_id, "status": "failed", "error": "no legal move"})
+            return
+        self.logger.info(
+            "Lookahead {}: best move {} (score {:.2f}) in {} ms", request_id, results[0].move_index,
+            results[0].score, elapsed_ms,
+        )
+        self._publish({
+            "request_id": request_id,
+            "status": "completed",
+            "best": results[0].move_index,
+            "elapsed_ms": elapsed_ms,
+            "results": [r.to_dict() for r in results],
+        })
+
+    def _publish(self, payload: Dict[str, Any]) -> None:
+        payload["timestamp"] = time.time()
+        self.mqtt.publish(self._result_topic, self.codec.encode(payload), retain=False)
+
+
+__all__ = ["LookaheadService"]
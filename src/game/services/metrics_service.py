@@ -0,0 +1,62 @@
+"""Service exposing runtime metrics over HTTP and the MQTT status topic."""
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from game.mqtt.client import MQTTClient
+from game.mqtt.topics import STATUS_TOPIC
+from game.services.service import Service
+from game.utils.json_utils import to_json
+from game.utils.metrics import REGISTRY, MetricsHTTPServer, MetricsRegistry
+from game.utils.time_utils import has_expired, seconds_from_now
+
+
+class MetricsService(Service):
+    """
+    Starts the Prometheus ``/metrics`` endpoint and periodically publishes a
+    JSON snapshot of the registry on ``STATUS_TOPIC``.
+    """
+
+    def __init__(
+        self,
+        mqtt_client: Optional[MQTTClient],
+        logger,
+        *,
+        status_interval: float = 10.0,
+        http_host: str = "127.0.0.1",
+        http_port: Optional[int] = 9108,
+        registry: MetricsRegistry = REGISTRY,
+    ):
+        self.mqtt = mqtt_client
+        self.logger = logger
+        self.status_interval = status_interval
+        self.registry = registry
+        self._http = MetricsHTTPServer(registry, http_host, http_port) if http_port is not None else None
+        self._next_status_at = seconds_from_now(self.status_interval)
+
+    def start(self) -> None:
+        if self._http is not None:
+            try:
+                self._http.start()
+                self.logger.info("Metrics endpoint listening on http://{}:{}/metrics", self._http.host, self._http.port)
+            except OSError as exc:
+                self.logger.warning("Could not start metrics endpoint: {}", exc)
+                self._http = None
+        self._next_status_at = seconds_from_now(self.status_interval)
+
+    def tick(self, now: float) -> None:
+        if self.mqtt is None or not has_expired(self._next_status_at, clock=lambda: now):
+            return
+        try:
+            payload = {"timestamp": time.time(), "metrics": self.registry.snapshot()}
+            self.mqtt.publish(STATUS_TOPIC, to_json(payload), retain=True)
+        finally:
+            self._next_status_at = seconds_from_now(self.status_interval, clock=lambda: now)
+
+    def quit(self) -> None:
+        if self._http is not None:
+            self._http.stop()
+
+
+__all__ = ["MetricsService"]
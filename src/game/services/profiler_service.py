@@ -0,0 +1,82 @@
+"""Service toggling the sampling profiler from an MQTT command."""
+from __future__ import annotations
+
+import json
+
+from game.mqtt.client import MQTTClient
+from game.mqtt.topics import PROFILE_TOPIC
+from game.services.service import Service
+from game.utils.profiler import PROFILER, SamplingProfiler
+
+
+class ProfilerService(Service):
+    """
+    Starts/stops a bounded profiling window when a command is received.
+
+    Expected payload (all fields optional):
+    {
+      "action": "start",      # or "stop"
+      "duration": 30,         # seconds, capped by max_duration
+      "interval_ms": 5
+    }
+    """
+
+    def __init__(
+        self,
+        mqtt_client: MQTTClient,
+        logger,
+        profiler: SamplingProfiler = PROFILER,
+        *,
+        max_duration: float = 300.0,
+    ):
+        self.mqtt = mqtt_client
+        self.logger = logger
+        self.profiler = profiler
+        self.max_duration = max_duration
+
+    def start(self) -> None:
+        self.logger.debug("ProfilerService starting - subscribing to {}", PROFILE_TOPIC)
+        self.mqtt.subscribe(PROFILE_TOPIC, handler=self._on_profile_message)
+
+    def tick(self, now: float) -> None:
+        return
+
+    def quit(self) -> None:
+        if self.profiler.active:
+            self.profiler.stop()
+
+    # ------------------------------------------------------------------
+    def _on_profile_message(self, topic: str, payload: str) -> None:
+        try:
+            msg = json.loads(payload) if payload.strip() else {}
+        except json.JSONDecodeError:
+            self.logger.warning("Invalid profiler command payload")
+            return
+        if not isinstance(msg, dict):
+            self.logger.warning("Profiler command payload must be a JSON object")
+            return
+
+        if msg.get("action", "start") == "stop":
+            self.profiler.stop()
+            self.logger.info("Profiler stopped, output: {}", self.profiler.last_output)
+            return
+
+        try:
+            duration = min(float(msg.get("duration", 30.0)), self.max_duration)
+            interval = max(float(msg.get("interval_ms", 5.0)), 1.0) / 1000.0
+        except (TypeError, ValueError):
+            self.logger.warning("Invalid profiler parameters: {}", msg)
+            return
+        self.start_window(duration, interval)
+
+    def start_window(self, duration: float = 30.0, interval: float = 0.005) -> None:
+        if self.profiler.start(duration, interval):
+            self.logger.info(
+                "Sampling profiler started for {:.0f}s ({:.1f} ms interval) -> {}",
+                duration, interval * 1000, self.profiler.output_dir,
+            )
+        else:
+            self.logger.warning("Sampling profiler already running")
+
+
+__all__ = ["ProfilerService"]
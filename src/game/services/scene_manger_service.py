@@ -1,40 +1,74 @@
 """Service responsible for publishing scene updates over MQTT."""
 from __future__ import annotations
 
+import threading
 import time
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from game.core.emulator import EmulatorSession
 from game.data.ram_reader import MainPokemonData
 from game.mqtt.client import MQTTClient
-from game.mqtt.topics import BATTLE_INFO_TOPIC, START_TOPIC
+from game.mqtt.codecs import JSON_CODEC, Codec, codec_topic
+from game.mqtt.topics import BATTLE_DELTA_TOPIC, BATTLE_INFO_TOPIC, BATTLE_RESYNC_TOPIC, START_TOPIC
 from game.scenes.battle_scene import create_battle_scene, BattleScene
+from game.scenes.serializer import SceneSerializer, scene_serializer_for
 from game.services.service import Service
+from game.utils.json_patch import diff
 from game.utils.json_utils import to_json
 from game.utils.time_utils import has_expired, seconds_from_now
 
 
 class SceneManagerService(Service):
+    """
+    Polls the battle scene and publishes it over MQTT.
+
+    With ``delta_publishing`` enabled the battle is sent as one retained
+    keyframe on ``battle/info`` (full scene, ``"keyframe": true``) followed by
+    JSON-patch deltas on ``battle/delta``.  Every message carries a ``seq``
+    number; deltas also carry the ``base_seq`` they apply to, so a subscriber
+    that misses one publishes anything on ``battle/resync`` to get a fresh
+    keyframe.  A keyframe is also forced every ``keyframe_interval`` deltas.
+    """
+
     def __init__(
         self,
         session: EmulatorSession,
         mqtt_client: MQTTClient,
         logger,
         poll_interval: float = 0.5,
+        *,
+        delta_publishing: bool = True,
+        keyframe_interval: int = 50,
+        codec: Codec = JSON_CODEC,
     ):
         self.session = session
         self.mqtt = mqtt_client
         self.logger = logger
         self.poll_interval = poll_interval
+        self.delta_publishing = delta_publishing
+        self.keyframe_interval = keyframe_interval
+        self.codec = codec
+        self._info_topic = codec_topic(BATTLE_INFO_TOPIC, codec)
+        self._delta_topic = codec_topic(BATTLE_DELTA_TOPIC, codec)
 
         self._next_poll_at = seconds_from_now(self.poll_interval)
         self._scene: Optional[BattleScene] = None
         self._last_published_turn: int = -1
 
+        # delta protocol state
+        self._seq: int = 0
+        # last published scene: compiled records (see game.scenes.serializer) or a to_dict() tree
+        self._last_scene_state: Any = None
+        self._serializer: Optional[SceneSerializer] = None
+        self._deltas_since_keyframe: int = 0
+        self._resync_requested = threading.Event()
+
     def start(self) -> None:
         self.logger.debug("SceneManagerService starting")
         payload = to_json({"msg": "hello from PKM", "timestamp": time.time()})
         self.mqtt.publish(START_TOPIC, payload, retain=False)
+        if self.delta_publishing:
+            self.mqtt.subscribe(BATTLE_RESYNC_TOPIC, handler=self._on_resync_message)
         self._next_poll_at = seconds_from_now(self.poll_interval)
 
     def tick(self, now: float) -> None:
@@ -80,31 +114,115 @@ class SceneManagerService(Service):
     def _ensure_battle_scene(self, battle_id: int) -> None:
         if self._scene is None or self._scene.battle_id != battle_id:
             self.logger.info("Battle started (ID={})", battle_id)
+            previous = self._scene
+            # publish the new scene before aborting the old one: a command
+            # enqueued on the old scene after the abort then sees the swap
+            # (BattleService.dispatch_command re-checks current_scene)
             self._scene = create_battle_scene(self.session, battle_id)
+            self._serializer = scene_serializer_for(self._scene)
+            if previous is not None:
+                previous.abort_commands("battle changed")
             self._last_published_turn = -1
+            self._last_scene_state = None
 
+    # ------------------------------------------------------------------
+    # Scene capture / encoding
+    # ------------------------------------------------------------------
+    def _capture_scene(self) -> Any:
+        """Compiled RAM records when a serializer exists, else the ``to_dict()`` tree."""
+        if self._serializer is not None:
+            return self._serializer.snapshot()
+        return self._scene.to_dict()
+
+    def _encode_scene_payload(self, header: Dict[str, Any], state: Any) -> str | bytes:
+        """Encode ``header`` + ``"scene"``; JSON goes straight from records to text."""
+        if self._serializer is None:
+            return self.codec.encode({**header, "scene": state})
+        if self.codec.name == JSON_CODEC.name:
+            return f'{to_json(header)[:-1]}, "scene": {self._serializer.to_json(state)}}}'
+        return self.codec.encode({**header, "scene": self._serializer.to_dict(state)})
+
+    def _diff_scene(self, old: Any, new: Any) -> List[Dict[str, Any]]:
+        if self._serializer is not None:
+            return self._serializer.diff(old, new, "/scene")
+        return diff(old, new, "/scene")
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
     def _publish_if_needed(self, battle_id: int) -> None:
         assert self._scene is not None
         turn = int(self._scene.turn_counter)
+        resync = self._resync_requested.is_set()
 
-        if turn == self._last_published_turn:
+        if turn == self._last_published_turn and not resync:
             return
 
         self._last_published_turn = turn
+        state = self._capture_scene()
+
+        if not self.delta_publishing:
+            header = {"battle_id": battle_id, "turn": turn, "timestamp": time.time()}
+            self.mqtt.publish(self._info_topic, self._encode_scene_payload(header, state), retain=True)
+            self.logger.info("Published battle update (battle_id={}, turn={})", battle_id, turn)
+            return
+
+        if (
+            resync
+            or self._last_scene_state is None
+            or self._deltas_since_keyframe >= self.keyframe_interval
+        ):
+            self._resync_requested.clear()
+            self._publish_keyframe(battle_id, turn, state)
+        else:
+            self._publish_delta(battle_id, turn, state)
+        self._last_scene_state = state
+
+    def _publish_keyframe(self, battle_id: int, turn: int, state: Any) -> None:
+        self._seq += 1
+        self._deltas_since_keyframe = 0
+        header = {
+            "battle_id": battle_id,
+            "turn": turn,
+            "timestamp": time.time(),
+            "seq": self._seq,
+            "keyframe": True,
+        }
+        self.mqtt.publish(self._info_topic, self._encode_scene_payload(header, state), retain=True)
+        self.logger.info("Published battle keyframe (battle_id={}, turn={}, seq={})", battle_id, turn, self._seq)
+
+    def _publish_delta(self, battle_id: int, turn: int, state: Any) -> None:
+        ops = self._diff_scene(self._last_scene_state, state)
+        base_seq = self._seq
+        self._seq += 1
+        self._deltas_since_keyframe += 1
         payload = {
             "battle_id": battle_id,
             "turn": turn,
             "timestamp": time.time(),
-            "scene": self._scene.to_dict(),
+            "seq": self._seq,
+            "base_seq": base_seq,
+            "ops": ops,
         }
-        self.mqtt.publish(BATTLE_INFO_TOPIC, to_json(payload), retain=True)
-        self.logger.info("Published battle update (battle_id={}, turn={})", battle_id, turn)
+        self.mqtt.publish(self._delta_topic, self.codec.encode(payload), retain=False)
+        self.logger.info(
+            "Published battle delta (battle_id={}, turn={}, seq={}, ops={})", battle_id, turn, self._seq, len(ops)
+        )
+
+    def _on_resync_message(self, topic: str, payload: str) -> None:
+        # Runs on the MQTT network thread: only flag it, the next poll publishes.
+        self.logger.info("Battle keyframe resync requested")
+        self._resync_requested.set()
 
     def _end_battle_if_needed(self) -> None:
-        if self._scene is not None:
-            self.logger.info("Battle ended (ID={})", self._scene.battle_id)
+        previous = self._scene
         self._scene = None
+        self._serializer = None
         self._last_published_turn = -1
+        self._last_scene_state = None
+        if previous is not None:
+            self.logger.info("Battle ended (ID={})", previous.battle_id)
+            previous.abort_commands("battle ended")
 
     @property
     def current_scene(self) -> Optional[BattleScene]:
@@ -0,0 +1,199 @@
+"""Service streaming the emulator screen as tile deltas (MQTT and/or TCP)."""
+from __future__ import annotations
+
+import socket
+import struct
+import threading
+from time import perf_counter
+from typing import Callable, List, Optional
+
+from game.core.emulator import EmulatorSession
+from game.mqtt.client import MQTTClient
+from game.mqtt.topics import SCREEN_FRAME_TOPIC
+from game.services.service import Service
+from game.utils.frame_delta import FRAME_BYTES, KIND_KEY, FrameEncoder
+from game.utils.metrics import REGISTRY
+
+
+_CAPTURE_SECONDS = REGISTRY.histogram(
+    "pkm_screen_capture_seconds",
+    "Time spent on the emulator thread copying one screen frame",
+    buckets=(0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.001),
+)
+_ENCODE_SECONDS = REGISTRY.histogram("pkm_screen_encode_seconds", "Tile delta + zlib encoding time per frame")
+_FRAME_BYTES = REGISTRY.histogram(
+    "pkm_screen_frame_bytes",
+    "Encoded size of one streamed screen frame",
+    buckets=(64, 256, 1024, 4096, 16384, 65536),
+)
+_STREAM_BYTES = REGISTRY.counter("pkm_screen_stream_bytes_total", "Encoded screen bytes streamed", label_names=("kind",))
+_FRAMES_SKIPPED = REGISTRY.counter(
+    "pkm_screen_frames_skipped_total", "Captured frames replaced before the encoder could take them"
+)
+_STREAM_BYTES_KEY = _STREAM_BYTES.labels("key")
+_STREAM_BYTES_DELTA = _STREAM_BYTES.labels("delta")
+
+_LENGTH = struct.Struct("!I")
+
+
+class FrameSocketServer:
+    """Loopback TCP fan-out: every message is sent as ``u32 length`` + bytes to each client."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, *, on_client: Optional[Callable[[], None]] = None):
+        self.host = host
+        self.port = port
+        self.on_client = on_client
+        self._clients: List[socket.socket] = []
+        self._lock = threading.Lock()
+        self._server: Optional[socket.socket] = None
+
+    def start(self) -> None:
+        server = socket.create_server((self.host, self.port))
+        self.port = server.getsockname()[1]
+        self._server = server
+        threading.Thread(target=self._accept, name="screen-stream-accept", daemon=True).start()
+
+    def _accept(self) -> None:
+        while self._server is not None:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self._clients.append(client)
+            if self.on_client is not None:
+                self.on_client()  # new viewers need a keyframe
+
+    def send(self, message: bytes) -> None:
+        data = _LENGTH.pack(len(message)) + message
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.sendall(data)
+            except OSError:
+                with self._lock:
+                    if client in self._clients:
+                        self._clients.remove(client)
+                client.close()
+
+    def stop(self) -> None:
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+        with self._lock:
+            for client in self._clients:
+                client.close()
+            self._clients.clear()
+
+
+class ScreenStreamService(Service):
+    """
+    Copies PyBoy's screen buffer every ``every_n_frames`` frames on the
+    emulator thread (one 92 KB memcpy) and leaves diffing, compression and
+    sending to a background thread.  If the encoder is still busy the
+    waiting capture is replaced by the newer one (counted in
+    ``pkm_screen_frames_skipped_total``), so capture never blocks emulation.
+
+    Messages (see :mod:`game.utils.frame_delta`) go to ``screen/frame`` over
+    MQTT when ``publish_mqtt`` is set and to TCP clients of ``socket_port``
+    (``u32`` length-prefixed) when it is non-zero.
+    """
+
+    def __init__(
+        self,
+        session: EmulatorSession,
+        mqtt_client: Optional[MQTTClient],
+        logger,
+        *,
+        every_n_frames: int = 4,
+        keyframe_interval: int = 60,
+        compression_level: int = 1,
+        publish_mqtt: bool = True,
+        socket_host: str = "127.0.0.1",
+        socket_port: int = 0,
+    ):
+        self.session = session
+        self.mqtt = mqtt_client
+        self.logger = logger
+        self.every_n_frames = max(1, every_n_frames)
+        self.publish_mqtt = publish_mqtt and mqtt_client is not None
+        self.encoder = FrameEncoder(keyframe_interval=keyframe_interval, level=compression_level)
+        self.socket_server = (
+            FrameSocketServer(socket_host, socket_port, on_client=self.encoder.force_keyframe) if socket_port else None
+        )
+
+        self._cond = threading.Condition()
+        self._pending: Optional[tuple[bytes, int]] = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="screen-stream", daemon=True)
+
+    def start(self) -> None:
+        if self.socket_server is not None:
+            self.socket_server.start()
+            self.logger.info("Screen stream listening on {}:{}", self.socket_server.host, self.socket_server.port)
+        self._thread.start()
+        self.session.add_frame_listener(self._on_frame)
+
+    def tick(self, now: float) -> None:
+        return
+
+    def quit(self) -> None:
+        self.session.remove_frame_listener(self._on_frame)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join(timeout=2.0)
+        if self.socket_server is not None:
+            self.socket_server.stop()
+
+    # ------------------------------------------------------------------
+    # Emulator thread: copy only
+    # ------------------------------------------------------------------
+    def _on_frame(self, session: EmulatorSession) -> None:
+        frame = session.frame_count
+        if frame % self.every_n_frames:
+            return
+        started = perf_counter()
+        buffer = bytes(session.screen.raw_buffer)
+        with self._cond:
+            if self._pending is not None:
+                _FRAMES_SKIPPED.inc()
+            self._pending = (buffer, frame)
+            self._cond.notify()
+        _CAPTURE_SECONDS.observe(perf_counter() - started)
+
+    # ------------------------------------------------------------------
+    # Encoder thread
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                buffer, frame = self._pending
+                self._pending = None
+            if len(buffer) != FRAME_BYTES:
+                self.logger.warning("Unexpected screen buffer size {}, stream stopped", len(buffer))
+                return
+            try:
+                self._encode_and_send(buffer, frame)
+            except Exception as exc:  # pragma: no cover - keep streaming
+                self.logger.exception("Screen stream failed on frame {}: {}", frame, exc)
+
+    def _encode_and_send(self, buffer: bytes, frame: int) -> None:
+        started = perf_counter()
+        message, kind, _ = self.encoder.encode(buffer, frame)
+        _ENCODE_SECONDS.observe(perf_counter() - started)
+        _FRAME_BYTES.observe(len(message))
+        (_STREAM_BYTES_KEY if kind == KIND_KEY else _STREAM_BYTES_DELTA).inc(len(message))
+        if self.publish_mqtt:
+            self.mqtt.publish(SCREEN_FRAME_TOPIC, message, retain=False)
+        if self.socket_server is not None:
+            self.socket_server.send(message)
+
+
+__all__ = ["ScreenStreamService", "FrameSocketServer"]
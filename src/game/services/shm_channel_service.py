@@ -0,0 +1,115 @@
+"""Service exposing battle state and accepting commands through shared memory."""
+from __future__ import annotations
+
+import os
+from time import perf_counter
+from typing import Optional
+
+from game.core.emulator import EmulatorSession
+from game.core.shm_channel import (
+    COMMAND_RECORD,
+    STATE_RECORD,
+    ShmRing,
+    default_channel_dir,
+    pack_state,
+    unpack_command,
+)
+from game.data.ram_reader import MainPokemonData
+from game.scenes.common import BATTLE_ACTION
+from game.scenes.serializer import SCENE_BLOCK
+from game.services.service import Service
+from game.utils.metrics import REGISTRY
+
+
+_STATE_PUBLISH_SECONDS = REGISTRY.histogram(
+    "pkm_shm_state_publish_seconds",
+    "Time to read RAM and write one state record to the shared-memory ring",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025),
+)
+_COMMANDS_RECEIVED = REGISTRY.counter("pkm_shm_commands_total", "Commands read from the shared-memory ring")
+
+class ShmChannelService(Service):
+    """
+    Publishes the battle/party state to ``<dir>/<name>-state`` every
+    ``every_n_frames`` frames (from the emulator thread, right after the
+    tick) and executes commands found in ``<dir>/<name>-commands``.
+
+    The planner side only needs :mod:`game.core.shm_channel`::
+
+        state = ShmRing.open("/dev/shm/pkm-state")
+        seq, payload = state.latest()
+        header, pokemon = unpack_state(payload)
+        ShmRing.open("/dev/shm/pkm-commands").push(pack_command("req-1", BATTLE_ACTION.MOVE.value, 2))
+
+    Commands go through :meth:`BattleService.dispatch_command`, so their
+    progress is still reported on ``battle/result``.
+    """
+
+    def __init__(
+        self,
+        session: EmulatorSession,
+        logger,
+        battle_service,
+        *,
+        directory: Optional[str] = None,
+        name: str = "pkm",
+        every_n_frames: int = 1,
+        capacity: int = 64,
+        max_commands_per_tick: int = 16,
+    ):
+        self.session = session
+        self.logger = logger
+        self.battle_service = battle_service
+        self.directory = directory or default_channel_dir()
+        self.name = name
+        self.every_n_frames = max(1, every_n_frames)
+        self.capacity = capacity
+        self.max_commands_per_tick = max_commands_per_tick
+        self._state: Optional[ShmRing] = None
+        self._commands: Optional[ShmRing] = None
+
+    def start(self) -> None:
+        base = os.path.join(self.directory, self.name)
+        self._state = ShmRing.create(f"{base}-state", STATE_RECORD.size, self.capacity)
+        self._commands = ShmRing.create(f"{base}-commands", COMMAND_RECORD.size, self.capacity)
+        self.session.add_frame_listener(self._on_frame)
+        self.logger.info("Shared-memory channel ready: {}-state / {}-commands", base, base)
+
+    def tick(self, now: float) -> None:
+        if self._commands is None:
+            return
+        for _ in range(self.max_commands_per_tick):
+            payload = self._commands.pop()
+            if payload is None:
+                return
+            _COMMANDS_RECEIVED.inc()
+            request_id, action, choice = unpack_command(payload)
+            try:
+                action_name = BATTLE_ACTION(action).name.lower()
+            except ValueError:
+                self.logger.warning("Unknown battle action {} in shared-memory command", action)
+                continue
+            self.battle_service.dispatch_command(
+                {"action": action_name, "choice": choice, "request_id": request_id or None}
+            )
+
+    def quit(self) -> None:
+        self.session.remove_frame_listener(self._on_frame)
+        for ring in (self._state, self._commands):
+            if ring is not None:
+                ring.close(unlink=True)
+        self._state = self._commands = None
+
+    # ------------------------------------------------------------------
+    def _on_frame(self, session: EmulatorSession) -> None:
+        frame = session.frame_count
+        if frame % self.every_n_frames or self._state is None:
+            return
+        started = perf_counter()
+        mem = session.read_memory(SCENE_BLOCK)
+        turn = session.read_memory(MainPokemonData.BattleTurnCounter)
+        self._state.publish(pack_state(frame, mem, turn[0] if turn else 0))
+        _STATE_PUBLISH_SECONDS.observe(perf_counter() - started)
+
+
+__all__ = ["ShmChannelService"]
@@ -0,0 +1,91 @@
+"""Service keeping the save-state catalog up to date."""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Sequence
+
+from game.core.emulator import EmulatorSession
+from game.core.state_catalog import StateCatalog
+from game.offline.state_file import decode_memory
+from game.services.service import Service
+from game.utils.executor import KeyedExecutor
+from game.utils.metrics import REGISTRY
+
+
+_RECORD_SECONDS = REGISTRY.histogram(
+    "pkm_state_catalog_capture_seconds",
+    "Time spent on the emulator thread reading save-state metadata",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01),
+)
+_INDEXED = REGISTRY.counter("pkm_state_catalog_indexed_total", "State files added to or refreshed in the catalog")
+
+
+class StateCatalogService(Service):
+    """
+    Records every save in a :class:`~game.core.state_catalog.StateCatalog`.
+
+    The metadata is read from the live emulator right after the save (while
+    the tick lock is still held, so it matches the file); database writes
+    happen on a single background worker.  On start, ``scan_dirs`` are
+    indexed incrementally so states saved by other runs or copied in by hand
+    show up too.
+    """
+
+    def __init__(
+        self,
+        session: EmulatorSession,
+        logger,
+        *,
+        db_path: str,
+        scan_dirs: Sequence[str] = (),
+    ) -> None:
+        self.session = session
+        self.logger = logger
+        self.scan_dirs = list(scan_dirs)
+        self.catalog = StateCatalog(db_path)
+        self._executor = KeyedExecutor("state-catalog", workers=1, max_pending=64, logger=logger)
+
+    def start(self) -> None:
+        self.session.add_save_listener(self._on_save)
+        for root in self.scan_dirs:
+            self._executor.submit("index", self._index_directory, root)
+        self.logger.info("State catalog at {} ({} states)", self.catalog.db_path, len(self.catalog))
+
+    def tick(self, now: float) -> None:
+        pass
+
+    def quit(self) -> None:
+        self.session.remove_save_listener(self._on_save)
+        self._executor.shutdown()
+        self.catalog.close()
+
+    # ------------------------------------------------------------------
+    def _on_save(self, session: EmulatorSession, path: Path) -> None:
+        started = time.perf_counter()
+        summary = decode_memory(session)
+        frame, saved_at = session.frame_count, time.time()
+        _RECORD_SECONDS.observe(time.perf_counter() - started)
+        self._executor.submit("index", self._record, path, summary, frame, saved_at)
+
+    def _record(self, path: Path, summary, frame: int, saved_at: float) -> None:
+        # the backups just rotated: refresh them first so they inherit the
+        # frame/time of the rows whose content they now hold
+        backups = sorted(path.parent.glob(path.name + ".bak_*"))
+        _INDEXED.inc(self.catalog.index_paths(str(p) for p in backups))
+        self.catalog.record(str(path), summary, frame=frame, saved_at=saved_at)
+        _INDEXED.inc()
+        self.logger.debug("Catalogued {} (map {}, frame {})", path, summary.get("map"), frame)
+
+    def _index_directory(self, root: str) -> None:
+        started = time.perf_counter()
+        count = self.catalog.index_directory(root)
+        removed = self.catalog.prune()
+        _INDEXED.inc(count)
+        self.logger.info(
+            "Indexed {} new/changed states under {} ({} removed) in {:.2f}s",
+            count, root, removed, time.perf_counter() - started,
+        )
+
+
+__all__ = ["StateCatalogService"]
@@ -0,0 +1,135 @@
+"""Bounded worker pool preserving submission order per key.
+
+Used to take work off latency-sensitive threads (e.g. paho's network loop):
+``submit`` never blocks, tasks sharing a key (an MQTT topic) run one at a
+time in submission order, different keys run in parallel, and when
+``max_pending`` tasks are already waiting new ones are rejected and counted
+instead of queueing without bound.
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Set, Tuple
+
+from game.utils.metrics import REGISTRY
+
+
+_SUBMITTED = REGISTRY.counter(
+    "pkm_executor_submitted_total", "Tasks accepted by keyed executors", label_names=("executor",)
+)
+_REJECTED = REGISTRY.counter(
+    "pkm_executor_rejected_total", "Tasks rejected because the executor queue was full", label_names=("executor",)
+)
+_ERRORS = REGISTRY.counter(
+    "pkm_executor_errors_total", "Tasks that raised an exception", label_names=("executor",)
+)
+_PENDING = REGISTRY.gauge(
+    "pkm_executor_pending", "Tasks waiting in keyed executors", label_names=("executor",)
+)
+
+Task = Tuple[Callable[..., Any], Tuple[Any, ...]]
+
+
+class KeyedExecutor:
+    """``workers`` threads draining per-key FIFO queues, round-robin across keys."""
+
+    def __init__(self, name: str, *, workers: int = 2, max_pending: int = 256, logger=None) -> None:
+        self.name = name
+        self.max_pending = max_pending
+        self.logger = logger
+
+        self._cond = threading.Condition()
+        self._queues: Dict[Hashable, Deque[Task]] = {}
+        self._ready: Deque[Hashable] = deque()  # keys with queued tasks and no task running
+        self._running: Set[Hashable] = set()
+        self._pending = 0
+        self._closed = False
+
+        self._submitted = _SUBMITTED.labels(name)
+        self._rejected = _REJECTED.labels(name)
+        self._errors = _ERRORS.labels(name)
+        self._pending_gauge = _PENDING.labels(name)
+
+        self._threads: List[threading.Thread] = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True) for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> bool:
+        """Queue ``fn(*args)`` after the earlier tasks of ``key``; ``False`` if rejected."""
+        with self._cond:
+            if self._closed or self._pending >= self.max_pending:
+                self._rejected.inc()
+                return False
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = self._queues[key] = deque()
+                if key not in self._running:
+                    self._ready.append(key)
+            queue.append((fn, args))
+            self._pending += 1
+            self._pending_gauge.set(self._pending)
+            self._submitted.inc()
+            self._cond.notify()
+            return True
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+    def _next_task(self) -> Optional[Tuple[Hashable, Task]]:
+        with self._cond:
+            while not self._ready and not self._closed:
+                self._cond.wait()
+            if not self._ready:
+                return None
+            key = self._ready.popleft()
+            task = self._queues[key].popleft()
+            self._running.add(key)
+            self._pending -= 1
+            self._pending_gauge.set(self._pending)
+            return key, task
+
+    def _finish(self, key: Hashable) -> None:
+        with self._cond:
+            self._running.discard(key)
+            if self._queues[key]:
+                self._ready.append(key)
+                self._cond.notify()
+            else:
+                del self._queues[key]
+
+    def _run(self) -> None:
+        while True:
+            item = self._next_task()
+            if item is None:
+                return
+            key, (fn, args) = item
+            try:
+                fn(*args)
+            except Exception as exc:
+                self._errors.inc()
+                if self.logger is not None:
+                    self.logger.exception("Task for {} failed in {}: {}", key, self.name, exc)
+            finally:
+                self._finish(key)
+
+    # ------------------------------------------------------------------
+    def shutdown(self, timeout: float = 2.0) -> None:
+        """Reject new tasks, let workers drain the queue for up to ``timeout`` seconds."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+
+__all__ = ["KeyedExecutor"]
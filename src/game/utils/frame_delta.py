@@ -0,0 +1,118 @@
+"""Tile-delta + zlib encoding of Game Boy screen frames.
+
+A frame is PyBoy's raw screen buffer (144x160 RGBA, row-major).  The
+encoder compares it with the previous frame per 8x8 tile (18x20 tiles) and
+emits either a keyframe (whole buffer) or the changed tiles only, zlib
+compressed.  Wire format::
+
+    header  magic "PKMF", version u8, kind u8 (0 key, 1 delta), seq u32,
+            frame u32, tiles u16                                   (16 bytes)
+    body    zlib(key:   160*144*4 RGBA bytes
+                 delta: tiles x u16 tile index, then tiles x 8*8*4 RGBA bytes)
+
+A delta applies to the frame with ``seq - 1``; :class:`FrameDecoder` drops
+deltas after a gap until the next keyframe.
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import Optional, Tuple
+
+import numpy as np
+
+ROWS, COLS, TILE = 144, 160, 8
+TILE_ROWS, TILE_COLS = ROWS // TILE, COLS // TILE
+FRAME_BYTES = ROWS * COLS * 4
+
+KIND_KEY = 0
+KIND_DELTA = 1
+
+MAGIC = b"PKMF"
+VERSION = 1
+FRAME_HEADER = struct.Struct("<4sBBIIHxx")
+
+
+def _tiles(frame: np.ndarray) -> np.ndarray:
+    """(144, 160) uint32 pixels -> (18, 20, 8, 8) tile view."""
+    return frame.reshape(TILE_ROWS, TILE, TILE_COLS, TILE).swapaxes(1, 2)
+
+
+class FrameEncoder:
+    """Keeps the previous frame and produces key/delta messages."""
+
+    def __init__(self, *, keyframe_interval: int = 60, level: int = 1) -> None:
+        self.keyframe_interval = keyframe_interval
+        self.level = level
+        self._previous: Optional[np.ndarray] = None
+        self._seq = 0
+        self._since_key = 0
+
+    def force_keyframe(self) -> None:
+        self._previous = None
+
+    def encode(self, buffer: bytes | bytearray | memoryview, frame: int) -> Tuple[bytes, int, int]:
+        """Encode ``buffer``; returns ``(message, kind, changed tiles)``."""
+        current = np.frombuffer(buffer, dtype=np.uint32).reshape(ROWS, COLS)
+        self._seq += 1
+        previous = self._previous
+        if previous is None or self._since_key >= self.keyframe_interval:
+            return self._keyframe(current, frame)
+
+        changed = (_tiles(current) != _tiles(previous)).any(axis=(2, 3))
+        indices = np.flatnonzero(changed).astype("<u2")
+        # past ~half of the screen a keyframe is about as small and resets the chain
+        if len(indices) * 2 > TILE_ROWS * TILE_COLS:
+            return self._keyframe(current, frame)
+
+        body = indices.tobytes() + _tiles(current)[changed].tobytes()
+        self._previous = current.copy()
+        self._since_key += 1
+        header = FRAME_HEADER.pack(MAGIC, VERSION, KIND_DELTA, self._seq, frame & 0xFFFFFFFF, len(indices))
+        return header + zlib.compress(body, self.level), KIND_DELTA, len(indices)
+
+    def _keyframe(self, current: np.ndarray, frame: int) -> Tuple[bytes, int, int]:
+        self._previous = current.copy()
+        self._since_key = 0
+        header = FRAME_HEADER.pack(MAGIC, VERSION, KIND_KEY, self._seq, frame & 0xFFFFFFFF, 0)
+        return header + zlib.compress(current.tobytes(), self.level), KIND_KEY, TILE_ROWS * TILE_COLS
+
+
+class FrameDecoder:
+    """Rebuilds frames from encoder messages (for viewers and planners)."""
+
+    def __init__(self) -> None:
+        self.frame: Optional[np.ndarray] = None  # (144, 160, 4) uint8 RGBA
+        self._seq = 0
+
+    def decode(self, message: bytes) -> Optional[np.ndarray]:
+        """Apply ``message``; returns the current frame, or ``None`` while waiting for a keyframe."""
+        magic, version, kind, seq, _, count = FRAME_HEADER.unpack_from(message, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a screen frame message")
+        body = zlib.decompress(message[FRAME_HEADER.size:])
+        if kind == KIND_KEY:
+            self.frame = np.frombuffer(body, dtype=np.uint8).reshape(ROWS, COLS, 4).copy()
+        elif self.frame is None or seq != self._seq + 1:
+            self.frame = None  # gap: wait for the next keyframe
+            self._seq = seq
+            return None
+        else:
+            indices = np.frombuffer(body, dtype="<u2", count=count)
+            tiles = np.frombuffer(body, dtype=np.uint32, offset=2 * count).reshape(count, TILE, TILE)
+            pixels = self.frame.view(np.uint32).reshape(ROWS, COLS)
+            view = _tiles(pixels)
+            rows, cols = np.divmod(indices, TILE_COLS)
+            view[rows, cols] = tiles
+        self._seq = seq
+        return self.frame
+
+
+__all__ = [
+    "FrameEncoder",
+    "FrameDecoder",
+    "FRAME_HEADER",
+    "FRAME_BYTES",
+    "KIND_KEY",
+    "KIND_DELTA",
+]
@@ -0,0 +1,91 @@
+"""Minimal JSON-patch (RFC 6902 subset) helpers used for delta publishing.
+
+Only ``add``, ``remove`` and ``replace`` are produced.  Lists are compared
+index by index (tuples are treated as lists, which is what they become once
+serialised), so a changed HP value yields a single small ``replace`` op
+instead of the whole Pokémon.
+"""
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict, List
+
+Patch = List[Dict[str, Any]]
+
+
+def _escape(token: str) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def diff(old: Any, new: Any, path: str = "") -> Patch:
+    """Return the list of operations turning ``old`` into ``new``."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: Patch = []
+        for key, value in new.items():
+            sub = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": sub, "value": value})
+            else:
+                ops.extend(diff(old[key], value, sub))
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        return ops
+
+    if isinstance(old, (list, tuple)) and isinstance(new, (list, tuple)):
+        ops = []
+        common = min(len(old), len(new))
+        for i in range(common):
+            ops.extend(diff(old[i], new[i], f"{path}/{i}"))
+        for i in range(common, len(new)):
+            ops.append({"op": "add", "path": f"{path}/{i}", "value": new[i]})
+        # remove from the end so indices stay valid while applying
+        for i in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{i}"})
+        return ops
+
+    if old == new and type(old) is type(new):
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def apply_patch(doc: Any, ops: Patch, *, in_place: bool = False) -> Any:
+    """Apply ``ops`` to ``doc`` (the subscriber side of :func:`diff`)."""
+    if not in_place:
+        doc = copy.deepcopy(doc)
+    for op in ops:
+        path = op["path"]
+        if path == "":
+            if op["op"] == "remove":
+                doc = None
+            else:
+                doc = copy.deepcopy(op["value"])
+            continue
+
+        tokens = [_unescape(t) for t in path.lstrip("/").split("/")]
+        parent = doc
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if op["op"] == "add":
+                parent.insert(index, op["value"])
+            elif op["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = op["value"]
+        else:
+            if op["op"] == "remove":
+                del parent[last]
+            else:
+                parent[last] = op["value"]
+    return doc
+
+
+__all__ = ["Patch", "diff", "apply_patch"]
@@ -0,0 +1,314 @@
+"""Lightweight in-process metrics (counters, gauges, histograms).
+
+The hot paths (emulator tick, services tick, MQTT publish) record into the
+module level :data:`REGISTRY`.  Recording is a lock-protected add on a plain
+float so the overhead stays in the sub-microsecond range and the metrics can
+be left enabled in production.  The registry can be rendered in the
+Prometheus text exposition format or as a JSON friendly snapshot.
+"""
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Default buckets tuned for per-frame / per-tick timings (seconds).
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+
+def _format_labels(label_names: Tuple[str, ...], label_values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in zip(label_names, label_values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, label_names: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.label_names: Tuple[str, ...] = tuple(label_names)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+
+    def labels(self, *values: str) -> "_Metric":
+        """Return (and create on first use) the child metric for ``values``."""
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {values!r}")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+
+    def _new_child(self) -> "_Metric":
+        return type(self)(self.name, self.help)
+
+    def _series(self) -> Iterable[Tuple[Tuple[str, ...], "_Metric"]]:
+        if self.label_names:
+            return list(self._children.items())
+        return [((), self)]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, metric in self._series():
+            lines.extend(metric._render_samples(_format_labels(self.label_names, values), values))
+        return lines
+
+    def snapshot(self):
+        if self.label_names:
+            return {",".join(values): metric._snapshot_value() for values, metric in self._series()}
+        return self._snapshot_value()
+
+    def _render_samples(self, labels: str, values: Tuple[str, ...]) -> List[str]:
+        raise NotImplementedError
+
+    def _snapshot_value(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value, optionally read from an existing tally at scrape time."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Iterable[str] = ()) -> None:
+        super().__init__(name, help_text, label_names)
+        self._value = 0.0
+        self._fn: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Read the count from ``fn`` (which must never decrease) when the counter is read."""
+        self._fn = fn
+
+    @property
+    def value(self) -> float:
+        if self._fn is not None:
+            try:
+                return float(self._fn())
+            except Exception:
+                return float("nan")
+        return self._value
+
+    def _render_samples(self, labels: str, values: Tuple[str, ...]) -> List[str]:
+        return [f"{self.name}{labels} {self.value}"]
+
+    def _snapshot_value(self):
+        return self.value
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, optionally computed lazily at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, label_names: Iterable[str] = ()) -> None:
+        super().__init__(name, help_text, label_names)
+        self._value = 0.0
+        self._fn: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Compute the gauge from ``fn`` when it is read (zero cost on the hot path)."""
+        self._fn = fn
+
+    @property
+    def value(self) -> float:
+        if self._fn is not None:
+            try:
+                return float(self._fn())
+            except Exception:
+                return float("nan")
+        return self._value
+
+    def _render_samples(self, labels: str, values: Tuple[str, ...]) -> List[str]:
+        return [f"{self.name}{labels} {self.value}"]
+
+    def _snapshot_value(self):
+        return self.value
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; ``observe`` is a bisect plus two adds."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, label_names)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.help, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+            self._count += 1
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def _render_samples(self, labels: str, values: Tuple[str, ...]) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self._counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            bucket_labels = labels[:-1] + f',le="{le}"}}' if labels else f'{{le="{le}"}}'
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+        lines.append(f"{self.name}_sum{labels} {self._sum}")
+        lines.append(f"{self.name}_count{labels} {self._count}")
+        return lines
+
+    def _snapshot_value(self):
+        avg = self._sum / self._count if self._count else 0.0
+        return {"count": self._count, "sum": self._sum, "avg": avg}
+
+
+class MetricsRegistry:
+    """Get-or-create registry so modules can declare their metrics at import time."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, help_text, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise TypeError(f"Metric {name!r} already registered as {type(metric).__name__}")
+            return metric
+
+    def counter(self, name: str, help_text: str, label_names: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, label_names=label_names)
+
+    def gauge(self, name: str, help_text: str, label_names: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, label_names=label_names)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, label_names=label_names, buckets=buckets)
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format (v0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, object]:
+        """Return a JSON-serialisable view of all metrics (used by the status topic)."""
+        with self._lock:
+            metrics = list(self._metrics.items())
+        return {name: metric.snapshot() for name, metric in metrics}
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ----------------------------------------------------------------------
+# HTTP exposition
+# ----------------------------------------------------------------------
+class MetricsHTTPServer:
+    """Serve ``GET /metrics`` from a daemon thread."""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, host: str = "127.0.0.1", port: int = 9108) -> None:
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._server is not None:
+            return
+        registry = self.registry
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:  # silence per-request logs
+                return
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "MetricsHTTPServer",
+    "REGISTRY",
+    "DEFAULT_BUCKETS",
+]
@@ -0,0 +1,207 @@
+"""Low-overhead sampling profiler that can be switched on at runtime.
+
+A background thread periodically snapshots the Python stacks of the tagged
+threads (emulator loop, services loop) using :func:`sys._current_frames` and
+aggregates them as *folded stacks*, the format consumed by ``flamegraph.pl``,
+speedscope and inferno::
+
+    emulator;[frame];loop.py:run;emulator.py:tick_once;... 42
+
+Hot code only pays for :func:`set_thread_tag` (a dict store), so the hooks
+can stay in place permanently; sampling itself only happens inside a bounded
+window started with :meth:`SamplingProfiler.start`.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional
+
+# thread id -> (role, tag). Written by the hot loops, read by the sampler.
+_THREAD_ROLES: Dict[int, str] = {}
+_THREAD_TAGS: Dict[int, str] = {}
+
+# Coarse buckets used for the summary file: the innermost frame whose path
+# contains one of these directory sequences wins.
+_CATEGORIES = (
+    (("pyboy",), "pyboy"),
+    (("game", "data"), "ram_decoding"),
+    (("json",), "json"),
+    (("loguru",), "logging"),
+    (("logging",), "logging"),
+    (("paho",), "mqtt"),
+    (("game", "mqtt"), "mqtt"),
+)
+
+# PyBoy is a compiled extension: no Python frame exists while it emulates, so
+# a stack whose innermost frame is the caller of ``PyBoy.tick`` is PyBoy time.
+_NATIVE_CALLERS = {
+    ("emulator.py", "tick_once"): "pyboy",
+}
+
+# Blocking lock acquires have no Python frame either: the caller tags the
+# thread while it waits, and those samples go to this bucket instead.
+LOCK_WAIT_TAG = "tick-lock"
+
+
+def register_thread(role: str) -> None:
+    """Mark the calling thread as profiled under ``role`` (e.g. ``"emulator"``)."""
+    _THREAD_ROLES[threading.get_ident()] = role
+
+
+def unregister_thread() -> None:
+    ident = threading.get_ident()
+    _THREAD_ROLES.pop(ident, None)
+    _THREAD_TAGS.pop(ident, None)
+
+
+def set_thread_tag(tag: Optional[str]) -> Optional[str]:
+    """
+    Tag what the calling thread is currently doing (frame stage, service
+    name...); returns the previous tag so a nested stage can restore it.
+    """
+    ident = threading.get_ident()
+    previous = _THREAD_TAGS.get(ident)
+    if tag is None:
+        _THREAD_TAGS.pop(ident, None)
+    else:
+        _THREAD_TAGS[ident] = tag
+    return previous
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _path_dirs(filename: str) -> tuple:
+    return tuple(filename.replace("\\", "/").split("/")[:-1])
+
+
+def _contains(parts: tuple, needle: tuple) -> bool:
+    n = len(needle)
+    return any(parts[i:i + n] == needle for i in range(len(parts) - n + 1))
+
+
+def _categorise(frame, tag: Optional[str] = None) -> str:
+    """Return the category of the innermost frame that belongs to a known bucket."""
+    if tag == LOCK_WAIT_TAG:
+        return "tick_lock"
+    if frame is not None:
+        code = frame.f_code
+        native = _NATIVE_CALLERS.get((os.path.basename(code.co_filename), code.co_name))
+        if native is not None:
+            return native
+    while frame is not None:
+        dirs = _path_dirs(frame.f_code.co_filename)
+        for needle, category in _CATEGORIES:
+            if _contains(dirs, needle):
+                return category
+        frame = frame.f_back
+    return "other"
+
+
+class SamplingProfiler:
+    """Aggregate folded stacks of the registered threads for a bounded window."""
+
+    def __init__(self, output_dir: str | os.PathLike[str] = "profiles", *, max_depth: int = 64) -> None:
+        self.output_dir = Path(output_dir)
+        self.max_depth = max_depth
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.last_output: Optional[Path] = None
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration: float = 30.0, interval: float = 0.005) -> bool:
+        """Start sampling for ``duration`` seconds; returns ``False`` if already running."""
+        with self._lock:
+            if self.active:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(duration, interval), name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def stop(self) -> None:
+        """Stop an ongoing window early; the partial profile is still written."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+    # ------------------------------------------------------------------
+    def _run(self, duration: float, interval: float) -> None:
+        stacks: Counter[str] = Counter()
+        categories: Counter[str] = Counter()
+        own_ident = threading.get_ident()
+        started = time.monotonic()
+        deadline = started + duration
+        samples = 0
+
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == own_ident:
+                    continue
+                role = _THREAD_ROLES.get(ident)
+                if role is None:
+                    continue
+                tag = _THREAD_TAGS.get(ident)
+                stacks[self._fold(role, tag or "-", frame)] += 1
+                categories[f"{role};{_categorise(frame, tag)}"] += 1
+            samples += 1
+            del frames
+            self._stop.wait(interval)
+
+        self.last_output = self._dump(stacks, categories, samples, time.monotonic() - started, interval)
+
+    def _fold(self, role: str, tag: str, frame) -> str:
+        parts = []
+        while frame is not None and len(parts) < self.max_depth:
+            parts.append(_frame_label(frame))
+            frame = frame.f_back
+        parts.append(f"[{tag}]")
+        parts.append(role)
+        parts.reverse()
+        return ";".join(parts)
+
+    def _dump(self, stacks: Counter, categories: Counter, samples: int, elapsed: float, interval: float) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        folded = self.output_dir / f"profile_{stamp}.folded"
+        with folded.open("w", encoding="utf-8") as fh:
+            for stack, count in stacks.most_common():
+                fh.write(f"{stack} {count}\n")
+
+        summary = self.output_dir / f"profile_{stamp}.summary.txt"
+        with summary.open("w", encoding="utf-8") as fh:
+            fh.write(f"samples={samples} elapsed={elapsed:.2f}s interval={interval * 1000:.1f}ms\n")
+            per_role: Counter[str] = Counter()
+            for key, count in categories.items():
+                per_role[key.split(";", 1)[0]] += count
+            for key, count in sorted(categories.items(), key=lambda kv: (kv[0].split(";")[0], -kv[1])):
+                role = key.split(";", 1)[0]
+                fh.write(f"{key:<32} {count:>8} {100.0 * count / max(per_role[role], 1):6.1f}%\n")
+        return folded
+
+
+PROFILER = SamplingProfiler(os.getenv("PROFILE_OUTPUT_DIR", "profiles"))
+
+
+__all__ = [
+    "LOCK_WAIT_TAG",
+    "SamplingProfiler",
+    "PROFILER",
+    "register_thread",
+    "unregister_thread",
+    "set_thread_tag",
+]
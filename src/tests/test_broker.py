@@ -0,0 +1,26 @@
+"""LocalBroker routing (run from ``src/``: ``python -m pytest tests``)."""
+from __future__ import annotations
+
+from game.mqtt.broker import LocalBroker
+
+
+def test_overlapping_filters_deliver_once_per_subscriber():
+    broker = LocalBroker()
+    received = []
+    other = []
+
+    def subscriber(topic: str, payload: bytes, retain: bool) -> None:
+        received.append((topic, payload))
+
+    broker.subscribe("/s1/+/move", subscriber)
+    broker.subscribe("/s1/#", subscriber)
+    broker.subscribe("/s1/battle/move", lambda t, p, r: other.append(p))
+
+    assert broker.publish("/s1/battle/move", b"1") == 2
+    assert received == [("/s1/battle/move", b"1")]
+    assert other == [b"1"]
+
+    # still delivered through the remaining filter after unsubscribing one
+    broker.unsubscribe("/s1/+/move", subscriber)
+    broker.publish("/s1/battle/move", b"2")
+    assert received[-1] == ("/s1/battle/move", b"2") and len(received) == 2
@@ -0,0 +1,74 @@
+"""MQTTClient subscriptions (run from ``src/``: ``python -m pytest tests``)."""
+from __future__ import annotations
+
+from loguru import logger
+
+from game.mqtt.client import MQTTClient
+from game.mqtt.router import filter_covers, filters_overlap, merge_filters
+
+
+class _Connection:
+    """Records wire subscriptions; the test plays the broker (one copy per matching filter)."""
+
+    def __init__(self) -> None:
+        self.filters = []
+
+    def connect(self) -> None:
+        return
+
+    def subscribe(self, topic: str) -> None:
+        self.filters.append(topic)
+
+    def unsubscribe(self, topic: str) -> None:
+        self.filters.remove(topic)
+
+
+class _Manager:
+    def __init__(self) -> None:
+        self.connection = _Connection()
+
+    def acquire(self, session, **kwargs):
+        return self.connection
+
+    def release(self, session) -> None:
+        return
+
+
+def _broker_publish(client: MQTTClient, connection: _Connection, topic: str) -> None:
+    from game.mqtt.router import topic_matches
+
+    for topic_filter in connection.filters:
+        if topic_matches(topic_filter, topic):
+            client._dispatch(topic, topic.encode())
+
+
+def test_filter_relations():
+    assert filter_covers("/s1/#", "/s1/+/move")
+    assert filter_covers("a/#", "a")
+    assert not filter_covers("/s1/+/move", "/s1/#")
+    assert filters_overlap("a/+/c", "a/b/+")
+    assert not filters_overlap("a/+/c", "a/b/d")
+    assert merge_filters(["/s1/+/move", "/s1/#"]) == ["/s1/#"]
+    assert merge_filters(["a/+/c", "a/b/+", "x/y"]) == ["a/+/+", "x/y"]
+
+
+def test_overlapping_filters_run_each_handler_once():
+    manager = _Manager()
+    client = MQTTClient(host="", port=0, base_topic="/s1", logger=logger, manager=manager)
+    calls = []
+    client.subscribe("/s1/+/move", handler=lambda t, p: calls.append("move"))
+    client.subscribe("/s1/#", handler=lambda t, p: calls.append("all"))
+    assert manager.connection.filters == ["/s1/#"]
+
+    _broker_publish(client, manager.connection, "/s1/battle/move")
+    assert sorted(calls) == ["all", "move"]
+
+    calls.clear()
+    client.unsubscribe("/s1/#")
+    assert manager.connection.filters == ["/s1/+/move"]
+    _broker_publish(client, manager.connection, "/s1/battle/move")
+    _broker_publish(client, manager.connection, "/s1/battle/info")
+    assert calls == ["move"]
+
+    client.disconnect()
+    assert manager.connection.filters == []
@@ -0,0 +1,35 @@
+"""Sampling profiler buckets (run from ``src/``: ``python -m pytest tests``)."""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+
+from game.utils import profiler
+from game.utils.profiler import LOCK_WAIT_TAG, _categorise, set_thread_tag
+
+
+def test_tick_lock_wait_is_not_pyboy_time():
+    lock = threading.Lock()
+    samples = {}
+
+    def tick_once():  # same key as EmulatorSession.tick_once in _NATIVE_CALLERS
+        tag = set_thread_tag(LOCK_WAIT_TAG)
+        with lock:
+            set_thread_tag(tag)
+
+    tick_once.__code__ = tick_once.__code__.replace(co_filename="emulator.py")
+    lock.acquire()
+    worker = threading.Thread(target=lambda: (set_thread_tag("frame"), tick_once()))
+    worker.start()
+    try:
+        while profiler._THREAD_TAGS.get(worker.ident) != LOCK_WAIT_TAG:
+            time.sleep(0.001)
+        frame = sys._current_frames()[worker.ident]
+        samples["waiting"] = _categorise(frame, profiler._THREAD_TAGS.get(worker.ident))
+        samples["untagged"] = _categorise(frame)
+    finally:
+        lock.release()
+        worker.join()
+    assert samples == {"waiting": "tick_lock", "untagged": "pyboy"}
+    assert profiler._THREAD_TAGS.pop(worker.ident) == "frame"
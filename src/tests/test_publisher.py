@@ -0,0 +1,46 @@
+"""AsyncPublisher queueing (run from ``src/``: ``python -m pytest tests``)."""
+from __future__ import annotations
+
+import threading
+import time
+
+from game.mqtt.publisher import AsyncPublisher, OutboundMessage
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_overflow_on_topic_with_one_queued_message():
+    release = threading.Event()
+    sent = []
+
+    def send(message: OutboundMessage) -> None:
+        release.wait(2.0)
+        sent.append((message.topic, message.payload))
+
+    publisher = AsyncPublisher(send, max_pending=2)
+    try:
+        publisher.submit(OutboundMessage("busy", "0"))  # held by the sender thread
+        assert _wait_for(lambda: publisher.pending == 0)
+        assert publisher.submit(OutboundMessage("a", "1"))
+        assert publisher.submit(OutboundMessage("b", "1"))
+        # queue full: drops b/1 and leaves b's deque empty before appending b/2
+        assert publisher.submit(OutboundMessage("b", "2"))
+        assert list(publisher._ready) == ["a", "b"]
+
+        release.set()
+        assert _wait_for(lambda: len(sent) == 3)
+        assert sent == [("busy", "0"), ("a", "1"), ("b", "2")]
+        assert publisher._thread.is_alive()
+
+        assert publisher.submit(OutboundMessage("c", "1"))
+        assert _wait_for(lambda: len(sent) == 4)
+    finally:
+        release.set()
+        publisher.close()
@@ -0,0 +1,46 @@
+"""State catalog indexing and queries (run from ``src/``: ``python -m pytest tests``)."""
+from __future__ import annotations
+
+import shutil
+import sqlite3
+from pathlib import Path
+
+from game.core.state_catalog import SCHEMA_VERSION, StateCatalog
+
+GAMES = Path(__file__).resolve().parents[2] / "games"
+
+
+def test_invalid_summaries_are_stored_but_never_found(tmp_path):
+    state = tmp_path / "a.state"
+    shutil.copy(GAMES / "Rouge/PokemonRed.RivalBattle.gb.state", state)
+    catalog = StateCatalog(str(tmp_path / "states.sqlite3"))
+    try:
+        catalog.record(str(state), {"initialised": True, "valid": False})
+        assert len(catalog) == 1
+        assert catalog.find() == [] and catalog.find(in_battle=False) == []
+
+        catalog.record(str(state), {"initialised": True, "valid": True, "battle_type": 2, "badge_count": 1})
+        assert catalog.find(in_battle=True, min_badges=1) == [str(state)]
+    finally:
+        catalog.close()
+
+
+def test_rows_from_before_the_valid_column_are_parsed_again(tmp_path):
+    shutil.copy(GAMES / "Rouge/PokemonRouge.Carabaffe.gb.state", tmp_path / "fr.state")
+    db = str(tmp_path / "states.sqlite3")
+    catalog = StateCatalog(db)
+    assert catalog.index_directory(str(tmp_path)) == 1
+    catalog.close()
+    with sqlite3.connect(db) as conn:  # as written by the previous schema
+        conn.execute("PRAGMA user_version = 0")
+        conn.execute("ALTER TABLE states DROP COLUMN valid")
+        conn.execute("UPDATE states SET battle_type = 139")
+
+    catalog = StateCatalog(db)
+    try:
+        assert catalog._db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert catalog.index_directory(str(tmp_path)) == 1
+        assert catalog.find(battle_type=1) == [str(tmp_path / "fr.state")]
+        assert catalog.index_directory(str(tmp_path)) == 0
+    finally:
+        catalog.close()
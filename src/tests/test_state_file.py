@@ -0,0 +1,36 @@
+"""Offline state decoding (run from ``src/``: ``python -m pytest tests``)."""
+from __future__ import annotations
+
+from pathlib import Path
+
+from game.offline.state_file import FRENCH_WRAM_SHIFT, StateImage, decode_state
+
+GAMES = Path(__file__).resolve().parents[2] / "games"
+
+
+def _decode(name: str, **kwargs):
+    with StateImage.open(str(GAMES / name), **kwargs) as image:
+        return decode_state(image)
+
+
+def test_english_state():
+    summary = _decode("Rouge/PokemonRed.RivalBattle.gb.state")
+    assert summary["valid"] and summary["wram_shift"] == 0
+    assert (summary["party_count"], summary["battle_type"], summary["badge_count"]) == (6, 2, 1)
+
+
+def test_french_states_use_the_language_shift():
+    summary = _decode("Rouge/PokemonRouge.Carabaffe.gb.state")
+    assert summary["valid"] and summary["wram_shift"] == FRENCH_WRAM_SHIFT
+    assert (summary["map"], summary["party_count"], summary["battle_type"], summary["badges"]) == (59, 6, 1, 1)
+    assert summary["enemy"]["max_hp"] > 0
+
+    yellow = _decode("Jaune/PokemonJaune.gb.state")  # Yellow and French shifts combined
+    assert yellow["valid"] and yellow["wram_shift"] == FRENCH_WRAM_SHIFT
+    assert (yellow["party_count"], yellow["battle_type"]) == (3, 0)
+
+
+def test_implausible_ram_is_flagged():
+    summary = _decode("Rouge/PokemonRouge.Carabaffe.gb.state", wram_shift=0)
+    assert summary["valid"] is False
+    assert "party_count" not in summary and "battle_type" not in summary